@@ -4,11 +4,11 @@ MCP Auditor Local - Main Server
 FastMCP server that exposes web auditing tools for performance, SEO, accessibility, security, and responsiveness.
 """
 
+import atexit
 import logging
 import os
-import shutil
-import subprocess
 import sys
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -17,15 +17,37 @@ from fastmcp import FastMCP
 # Add tools directory to path
 sys.path.append(str(Path(__file__).parent))
 
+from tools.artifact_store import get_artifact_store
+from tools.audit_page import audit_page
 from tools.auth_helper import auto_login, get_available_test_users
 from tools.axe_playwright import scan_axe
-from tools.cdp_gateway import cdp_emulate, cdp_health, cdp_open, cdp_screenshot, cdp_trace
+from tools.batch_audit import audit_batch
+from tools.browser_pool import get_browser_pool
+from tools.cdp_gateway import (
+    cdp_close_session,
+    cdp_emulate,
+    cdp_health,
+    cdp_open,
+    cdp_screenshot,
+    cdp_trace,
+    get_chrome_mcp_client,
+    get_chrome_mcp_sessions,
+)
+from tools.change_detection import incremental_tool
+from tools.chrome_pool import get_chrome_pool
+from tools.http_client import get_http_clients
 from tools.lighthouse import audit_lighthouse
 from tools.lighthouse_fast import lighthouse_fast
+from tools.lighthouse_runner import close_lighthouse_workers, lighthouse_workers_status
+from tools.node_worker import get_node_worker
 from tools.quick_audit import quick_audit
 from tools.report_merge import report_merge
+from tools.report_store import report_slice
 from tools.responsive import responsive_audit
+from tools.result_cache import cached_tool, get_result_cache
+from tools.runner_registry import get_runner_registry
 from tools.security_headers import security_headers
+from tools.site_crawler import crawl_audit
 from tools.url_check import url_check
 from tools.wave_api import scan_wave
 from tools.webhint import webhint_scan
@@ -44,26 +66,43 @@ mcp = FastMCP("MCP Auditor Local")
 
 # Environment configuration
 CHROME_MCP_ENABLED = os.getenv("CHROME_MCP_ENABLED", "true").lower() == "true"
+BROWSER_POOL_PREWARM = os.getenv("BROWSER_POOL_PREWARM", "false").lower() == "true"
+LIGHTHOUSE_CHROME_PREWARM = os.getenv("LIGHTHOUSE_CHROME_PREWARM", "false").lower() == "true"
+CHROME_MCP_PREWARM = os.getenv("CHROME_MCP_PREWARM", "false").lower() == "true"
+RUNNER_PROBE_ON_STARTUP = os.getenv("RUNNER_PROBE_ON_STARTUP", "true").lower() == "true"
 
-def _check_dependency(command: str, version_flag: str = "--version") -> dict[str, Any]:
-    """Check if a command is available and get its version."""
-    if not shutil.which(command):
-        return {"installed": False}
+# Locations and versions of node, npx, lighthouse, hint... probed once per process
+runner_registry = get_runner_registry()
+
+# Warm Chromium pool shared by scan_axe, responsive_audit and security_headers
+browser_pool = get_browser_pool()
+atexit.register(browser_pool.shutdown)
+
+# Warm headless Chromes that Lighthouse attaches to with --port
+chrome_pool = get_chrome_pool()
+atexit.register(chrome_pool.shutdown)
+
+# Node workers dedicated to Lighthouse runs (one per Chrome pool slot at most)
+atexit.register(close_lighthouse_workers)
 
-    try:
-        result = subprocess.run(
-            [command, version_flag],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            version = result.stdout.strip().split('\n')[0]
-            return {"installed": True, "version": version}
-    except Exception:
-        pass
-
-    return {"installed": True, "version": "unknown"}
+# Persistent Node worker that serves the Playwright-based tools
+node_worker = get_node_worker()
+atexit.register(node_worker.close)
+
+# chrome-devtools-mcp children (one per session) behind the cdp_* tools
+chrome_mcp_sessions = get_chrome_mcp_sessions()
+atexit.register(chrome_mcp_sessions.close_all)
+
+# Keep-alive HTTP connections shared by the Python-side fetches
+http_clients = get_http_clients()
+atexit.register(http_clients.close)
+
+def _check_dependency(name: str) -> dict[str, Any]:
+    """Check if a runner is available and get its version (cached by the runner registry)."""
+    info = runner_registry.resolve(name)
+    if not info.path:
+        return {"installed": False}
+    return {"installed": True, "version": info.version or "unknown"}
 
 @mcp.tool()
 def health_check() -> dict[str, Any]:
@@ -72,12 +111,12 @@ def health_check() -> dict[str, Any]:
     Returns server status and dependency availability.
     """
     # Check critical dependencies
-    node_check = _check_dependency("node", "--version")
-    npm_check = _check_dependency("npm", "--version")
-    npx_check = _check_dependency("npx", "--version")
+    node_check = _check_dependency("node")
+    npm_check = _check_dependency("npm")
+    npx_check = _check_dependency("npx")
 
     # Check optional tools (will be auto-installed by npx if needed)
-    python_check = _check_dependency("python", "--version")
+    python_check = _check_dependency("python")
 
     dependencies = {
         "node": node_check,
@@ -101,6 +140,15 @@ def health_check() -> dict[str, Any]:
         "chrome_mcp_enabled": CHROME_MCP_ENABLED,
         "artifacts_dir": str(ARTIFACTS_DIR),
         "dependencies": dependencies,
+        "browser_pool": browser_pool.health_check(),
+        "lighthouse_chrome_pool": chrome_pool.health_check(),
+        "node_worker": node_worker.status(),
+        "lighthouse_workers": lighthouse_workers_status(),
+        "result_cache": get_result_cache().stats(),
+        "artifact_store": get_artifact_store().stats(),
+        "http_client": http_clients.stats(),
+        "chrome_mcp_sessions": chrome_mcp_sessions.stats(),
+        "runner_registry": runner_registry.describe(),
         "tools_status": {
             "lighthouse": {"status": lighthouse_note, "requires": ["npx"]},
             "webhint": {"status": webhint_note, "requires": ["npx"]},
@@ -113,18 +161,22 @@ def health_check() -> dict[str, Any]:
         }
     }
 
-# Register all audit tools
-mcp.tool()(audit_lighthouse)
-mcp.tool()(scan_axe)
-mcp.tool()(webhint_scan)
-mcp.tool()(security_headers)
-mcp.tool()(responsive_audit)
-mcp.tool()(zap_baseline_simple)
-mcp.tool()(scan_wave)
+# Register all audit tools (cached: repeat calls reuse results unless force_refresh=True)
+mcp.tool()(cached_tool(incremental_tool('audit_lighthouse', audit_lighthouse)))
+mcp.tool()(cached_tool(incremental_tool('scan_axe', scan_axe)))
+mcp.tool()(cached_tool(incremental_tool('webhint_scan', webhint_scan)))
+mcp.tool()(cached_tool(security_headers))
+mcp.tool()(cached_tool(responsive_audit))
+mcp.tool()(cached_tool(zap_baseline_simple))
+mcp.tool()(cached_tool(scan_wave))
 mcp.tool()(report_merge)
-mcp.tool()(quick_audit)
-mcp.tool()(lighthouse_fast)
+mcp.tool()(report_slice)
+mcp.tool()(cached_tool(quick_audit))
+mcp.tool()(cached_tool(incremental_tool('lighthouse_fast', lighthouse_fast)))
 mcp.tool()(url_check)
+mcp.tool()(cached_tool(audit_page))
+mcp.tool()(audit_batch)
+mcp.tool()(crawl_audit)
 
 # Register authentication and test user tools
 mcp.tool()(auto_login)
@@ -137,12 +189,34 @@ if CHROME_MCP_ENABLED:
     mcp.tool()(cdp_screenshot)
     mcp.tool()(cdp_trace)
     mcp.tool()(cdp_emulate)
+    mcp.tool()(cdp_close_session)
 
 if __name__ == "__main__":
     logger.info("Starting MCP Auditor Local server...")
     logger.info(f"Chrome MCP Gateway: {'Enabled' if CHROME_MCP_ENABLED else 'Disabled'}")
     logger.info(f"Artifacts directory: {ARTIFACTS_DIR}")
 
+    if BROWSER_POOL_PREWARM:
+        logger.info("Pre-warming browser pool...")
+        browser_pool.warm()
+
+    # Apply artifact retention (size/age limits) without delaying startup
+    threading.Thread(target=get_artifact_store().enforce_retention, name="artifact-retention", daemon=True).start()
+
+    if RUNNER_PROBE_ON_STARTUP:
+        # Probe in the background so slow npx lookups never delay startup
+        threading.Thread(target=runner_registry.probe_all, name="runner-probe", daemon=True).start()
+
+    if LIGHTHOUSE_CHROME_PREWARM:
+        logger.info("Pre-warming Lighthouse Chrome pool...")
+        chrome_pool.warm()
+
+    if CHROME_MCP_ENABLED and CHROME_MCP_PREWARM:
+        # Handshake in the background; the first cdp_* call waits for it if still running.
+        # Only the default session is pre-warmed; named sessions start on first use.
+        logger.info("Pre-warming chrome-devtools-mcp...")
+        threading.Thread(target=get_chrome_mcp_client().start, name="chrome-mcp-prewarm", daemon=True).start()
+
     # Check for HTTP mode override
     force_http = os.getenv("MCP_TRANSPORT", "").lower() == "http"
     in_docker = os.path.exists('/.dockerenv')
@@ -0,0 +1,277 @@
+"""
+Content-addressed store for audit artifacts (screenshots, JSON and HTML reports).
+
+Artifacts are named by the SHA-256 of their content and sharded two levels
+deep (objects/ab/cd/<sha256>.<ext>), so identical screenshots are stored
+once and concurrent runs never collide. JSON is gzip-compressed. Every write
+appends a line to manifest.jsonl (the Node tools append to the same file,
+see node-tools/lib/artifacts.js); retention removes the least recently
+written objects beyond a size cap or age limit and compacts the manifest.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent.parent / "artifacts" / "store"
+
+# Retention runs at most this often on writes
+RETENTION_INTERVAL = 300.0
+
+
+@dataclass
+class ArtifactStoreConfig:
+    """Artifact store location and retention limits."""
+    directory: Path = field(default_factory=lambda: DEFAULT_STORE_DIR)
+    max_bytes: int = 500 * 1024 * 1024
+    max_age_days: float = 14.0
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStoreConfig":
+        """Build a config from ARTIFACT_STORE_* environment variables."""
+        return cls(
+            directory=Path(os.getenv("ARTIFACT_STORE_DIR", str(DEFAULT_STORE_DIR))),
+            max_bytes=int(float(os.getenv("ARTIFACT_STORE_MAX_MB", "500")) * 1024 * 1024),
+            max_age_days=float(os.getenv("ARTIFACT_STORE_MAX_AGE_DAYS", "14"))
+        )
+
+
+class ArtifactStore:
+    """Writes artifacts by content hash and keeps the manifest index."""
+
+    def __init__(self, config: ArtifactStoreConfig | None = None):
+        self.config = config or ArtifactStoreConfig.from_env()
+        self.root = Path(self.config.directory)
+        self.objects_dir = self.root / "objects"
+        self.manifest_path = self.root / "manifest.jsonl"
+        self._lock = threading.Lock()
+        self._last_retention = 0.0
+        self._stats = {'writes': 0, 'deduplicated': 0, 'removed': 0}
+
+    def put_bytes(
+        self,
+        data: bytes,
+        kind: str,
+        ext: str,
+        name: str | None = None,
+        meta: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """
+        Store raw bytes.
+
+        Args:
+            data: Content to store
+            kind: Artifact kind, e.g. "screenshot" or "wave"
+            ext: File extension without dot ("png", "html", "json.gz")
+            name: Optional lookup alias (e.g. a report id)
+            meta: Extra fields for the manifest entry
+
+        Returns:
+            Artifact reference with id, path and sizes
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest, ext)
+        deduplicated = path.exists()
+        if deduplicated:
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, path)
+        return self._record(digest, path, kind, name, len(data), deduplicated, meta)
+
+    def put_json(
+        self,
+        data: Any,
+        kind: str,
+        name: str | None = None,
+        meta: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Store a JSON document gzip-compressed (mtime zeroed so equal documents dedupe)."""
+        raw = json.dumps(data, indent=2, default=str).encode('utf-8')
+        ref = self.put_bytes(gzip.compress(raw, compresslevel=6, mtime=0), kind, "json.gz", name, meta)
+        ref['bytes'] = len(raw)
+        return ref
+
+    def put_text(self, text: str, kind: str, ext: str, name: str | None = None) -> dict[str, Any]:
+        """Store a text artifact (e.g. an HTML report) uncompressed so it opens directly."""
+        return self.put_bytes(text.encode('utf-8'), kind, ext, name)
+
+    def put_file(
+        self,
+        source: str | Path,
+        kind: str,
+        ext: str,
+        name: str | None = None,
+        meta: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Move an existing file into the store, hashing it in chunks."""
+        source = Path(source)
+        sha = hashlib.sha256()
+        with open(source, 'rb') as f:
+            while chunk := f.read(1024 * 1024):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        size = source.stat().st_size
+
+        path = self._object_path(digest, ext)
+        deduplicated = path.exists()
+        if deduplicated:
+            os.utime(path)
+            source.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), path)
+        return self._record(digest, path, kind, name, size, deduplicated, meta)
+
+    def temp_path(self, suffix: str = "") -> Path:
+        """Scratch path inside the store for writers that need a file first."""
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=tmp_dir, suffix=suffix)
+        os.close(fd)
+        return Path(path)
+
+    def locate(self, ref: str) -> Path | None:
+        """Find an artifact by content id or name alias (newest entry wins)."""
+        for entry in reversed(self.entries()):
+            if ref in (entry.get('id'), entry.get('name')):
+                path = self.root / entry['path']
+                return path if path.exists() else None
+        return None
+
+    def read(self, ref: str) -> bytes:
+        """Content of an artifact, decompressed when stored as gzip."""
+        path = self.locate(ref)
+        if path is None:
+            raise FileNotFoundError(f"Artifact not found: {ref}")
+        data = path.read_bytes()
+        return gzip.decompress(data) if path.name.endswith('.gz') else data
+
+    def entries(self) -> list[dict[str, Any]]:
+        """All manifest entries in write order."""
+        if not self.manifest_path.exists():
+            return []
+        entries = []
+        with open(self.manifest_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def enforce_retention(self) -> dict[str, Any]:
+        """Delete objects past the age limit, then the oldest beyond the size cap."""
+        with self._lock:
+            self._last_retention = time.monotonic()
+            objects = []
+            for path in self.objects_dir.glob("*/*/*"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, path))
+            objects.sort()
+
+            cutoff = time.time() - self.config.max_age_days * 86400
+            total = sum(size for _, size, _ in objects)
+            removed = 0
+            for mtime, size, path in objects:
+                if mtime >= cutoff and total <= self.config.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+            if removed:
+                self._compact_manifest()
+            self._stats['removed'] += removed
+            return {'removed': removed, 'bytes': total, 'objects': len(objects) - removed}
+
+    def stats(self) -> dict[str, Any]:
+        """Store counters for health_check (no directory walk)."""
+        return {
+            'directory': str(self.root),
+            'maxBytes': self.config.max_bytes,
+            'maxAgeDays': self.config.max_age_days,
+            **self._stats
+        }
+
+    def _object_path(self, digest: str, ext: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:4] / f"{digest}.{ext}"
+
+    def _record(
+        self,
+        digest: str,
+        path: Path,
+        kind: str,
+        name: str | None,
+        size: int,
+        deduplicated: bool,
+        meta: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        stored = path.stat().st_size
+        entry = {
+            'id': digest,
+            'kind': kind,
+            'name': name,
+            'path': path.relative_to(self.root).as_posix(),
+            'bytes': size,
+            'storedBytes': stored,
+            'createdAt': datetime.now().isoformat(),
+            **(meta or {})
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+            self._stats['writes'] += 1
+            if deduplicated:
+                self._stats['deduplicated'] += 1
+
+        if time.monotonic() - self._last_retention > RETENTION_INTERVAL:
+            self.enforce_retention()
+
+        return {
+            'id': digest,
+            'path': str(path),
+            'bytes': size,
+            'storedBytes': stored,
+            'deduplicated': deduplicated
+        }
+
+    def _compact_manifest(self):
+        """Rewrite the manifest without entries whose object was removed."""
+        kept = [entry for entry in self.entries() if (self.root / entry['path']).exists()]
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in kept:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.manifest_path)
+
+
+_store: ArtifactStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the process-wide artifact store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
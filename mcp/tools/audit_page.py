@@ -0,0 +1,160 @@
+"""
+Single-navigation page audit.
+
+Loads the page once per viewport and runs security headers, axe and
+responsive checks against that one load instead of one browser per tool.
+"""
+
+import json
+import logging
+import subprocess
+from typing import Any, Literal
+
+from .axe_playwright import _summarize_axe
+from .navigation import (
+    InterceptionProfile,
+    WaitStrategy,
+    total_request_counts,
+    validate_interception_profile,
+)
+from .node_runner import NodeToolError, run_node_tool
+from .responsive import _summarize_responsive
+from .security_headers import _summarize_security_headers
+
+logger = logging.getLogger(__name__)
+
+# Tool name -> check name understood by node-tools/audit-page.js
+PAGE_CHECKS = {
+    'security_headers': 'headers',
+    'scan_axe': 'axe',
+    'responsive_audit': 'responsive'
+}
+
+DEFAULT_VIEWPORTS = ["360x640", "768x1024", "1280x800"]
+
+
+def audit_page(
+    url: str,
+    tools: list[str] | None = None,
+    viewports: list[str] | None = None,
+    device: Literal["mobile", "desktop"] = "mobile",
+    wait_for: WaitStrategy | None = None,
+    interception_profile: InterceptionProfile | None = None
+) -> dict[str, Any]:
+    """
+    Run several audits against a single page load per viewport.
+
+    Args:
+        url: The URL to audit
+        tools: Audits to run: security_headers, scan_axe, responsive_audit (default: all)
+        viewports: Viewport sizes (e.g., ["360x640", "1280x800"]); defaults to the
+            responsive_audit viewports, or the device viewport when responsive is not requested
+        device: Device profile used for the axe scan
+        wait_for: Navigation wait strategy: load, domcontentloaded, networkidle,
+            lcp or dom-quiet (default NAVIGATION_WAIT)
+        interception_profile: Request interception profile: full, layout,
+            a11y-minimal or headers-only (default: the lightest profile that
+            serves every requested tool)
+
+    Returns:
+        Dict with per-tool results keyed by tool name. Each result has the same
+        format as the standalone tool, so the values can be passed to report_merge.
+    """
+    try:
+        if not url.startswith(('http://', 'https://')):
+            raise ValueError("URL must start with http:// or https://")
+
+        if tools is None:
+            tools = list(PAGE_CHECKS)
+
+        unknown = [tool for tool in tools if tool not in PAGE_CHECKS]
+        if unknown:
+            raise ValueError(f"Unsupported tools for audit_page: {unknown}. Use: {list(PAGE_CHECKS)}")
+        validate_interception_profile(interception_profile)
+
+        if viewports is None and 'responsive_audit' in tools:
+            viewports = DEFAULT_VIEWPORTS
+        viewports = viewports or []
+
+        checks = [PAGE_CHECKS[tool] for tool in tools]
+        args = [url, f"--checks={','.join(checks)}", f"--device={device}"] + viewports
+        params = {
+            "url": url,
+            "viewports": viewports,
+            "checks": checks,
+            "device": device,
+            "waitFor": wait_for,
+            "interception": interception_profile
+        }
+        if wait_for:
+            args.append(f"--wait-for={wait_for}")
+        if interception_profile:
+            args.append(f"--interception={interception_profile}")
+
+        # One navigation per viewport, plus time for axe on one of them
+        timeout = 60 + 30 * max(1, len(viewports))
+
+        logger.info(f"Running page audit for {url} ({', '.join(tools)}) across {len(viewports) or 1} viewport(s)")
+        raw_data = run_node_tool("auditPage", "audit-page.js", args, params, timeout=timeout)
+
+        results: dict[str, Any] = {}
+        navigation_errors = [nav['error'] for nav in raw_data.get('navigations', []) if nav.get('error')]
+        failure = navigation_errors[0] if navigation_errors else 'Page did not load'
+
+        if 'security_headers' in tools:
+            headers_raw = raw_data.get('securityHeaders')
+            results['security_headers'] = (
+                _summarize_security_headers(headers_raw, url) if headers_raw
+                else {'status': 'error', 'error': failure}
+            )
+
+        if 'scan_axe' in tools:
+            axe_raw = raw_data.get('axe')
+            results['scan_axe'] = (
+                _summarize_axe(axe_raw, url, device) if axe_raw
+                else {'status': 'error', 'error': failure}
+            )
+
+        if 'responsive_audit' in tools:
+            results['responsive_audit'] = _summarize_responsive(
+                raw_data.get('responsive', {}), url, viewports
+            )
+
+        return {
+            'status': 'ok',
+            'url': url,
+            'device': device,
+            'tools_used': tools,
+            'navigations': raw_data.get('navigations', []),
+            'interception': raw_data.get('interception'),
+            'requests': total_request_counts([nav.get('requests') for nav in raw_data.get('navigations', [])]),
+            'results': results
+        }
+
+    except (subprocess.TimeoutExpired, TimeoutError):
+        return {
+            'status': 'error',
+            'error': 'Page audit timed out',
+            'url': url,
+            'suggestion': 'Audit fewer viewports or run the tools individually'
+        }
+    except NodeToolError as e:
+        logger.error(f"Page audit failed: {e}")
+        return {
+            'status': 'error',
+            'error': f'Page audit failed: {e}',
+            'url': url,
+            'details': e.details
+        }
+    except json.JSONDecodeError as e:
+        return {
+            'status': 'error',
+            'error': f'Failed to parse page audit output: {e}'
+        }
+    except Exception as e:
+        logger.error(f"Page audit failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+            'tool': 'audit_page'
+        }
@@ -5,12 +5,13 @@ Handles authentication flows with test credentials.
 
 import asyncio
 import logging
-from pathlib import Path
 from typing import Any
 
 from playwright.async_api import async_playwright
 
+from .artifact_store import get_artifact_store
 from .credentials import get_test_credentials
+from .navigation import WaitStrategy, navigate
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,8 @@ async def login_with_playwright(
     submit_selector: str = 'button[type="submit"]',
     success_selector: str = '.dashboard',
     headless: bool = True,
-    screenshot_path: str | None = None
+    screenshot_path: str | None = None,
+    wait_for: WaitStrategy | None = None
 ) -> dict[str, Any]:
     """
     Perform automated login using Playwright.
@@ -37,6 +39,7 @@ async def login_with_playwright(
         success_selector: CSS selector to verify successful login
         headless: Run browser in headless mode
         screenshot_path: Optional path to save screenshot after login
+        wait_for: Navigation wait strategy for the login page (default NAVIGATION_WAIT)
 
     Returns:
         Dictionary with login result and details
@@ -56,7 +59,7 @@ async def login_with_playwright(
             page = await context.new_page()
 
             # Navigate to login page
-            await page.goto(url, wait_until='networkidle')
+            _, navigation = await navigate(page, url, wait_for=wait_for)
 
             # Fill credentials
             await page.fill(username_selector, creds['username'])
@@ -76,16 +79,14 @@ async def login_with_playwright(
 
             # Take screenshot if requested
             screenshot_data = None
-            if screenshot_path or not login_success:
-                artifacts_dir = Path(__file__).parent.parent.parent / "artifacts"
-                artifacts_dir.mkdir(exist_ok=True)
-
-                if not screenshot_path:
-                    import time
-                    screenshot_path = str(artifacts_dir / f"login-{role}-{int(time.time())}.png")
-
+            if screenshot_path:
                 await page.screenshot(path=screenshot_path, full_page=True)
                 screenshot_data = screenshot_path
+            elif not login_success:
+                screenshot = get_artifact_store().put_bytes(
+                    await page.screenshot(full_page=True), kind="login", ext="png", meta={'role': role}
+                )
+                screenshot_data = screenshot['path']
 
             # Get current URL and title
             current_url = page.url
@@ -108,7 +109,8 @@ async def login_with_playwright(
                 'page_title': title,
                 'screenshot': screenshot_data,
                 'cookies': cookies,
-                'session_ready': login_success
+                'session_ready': login_success,
+                'navigation': navigation
             }
 
     except Exception as e:
@@ -127,7 +129,8 @@ def auto_login(
     password_selector: str = '#password',
     submit_selector: str = 'button[type="submit"]',
     success_selector: str = '.dashboard',
-    headless: bool = True
+    headless: bool = True,
+    wait_for: WaitStrategy | None = None
 ) -> dict[str, Any]:
     """
     Synchronous wrapper for automated login.
@@ -140,6 +143,8 @@ def auto_login(
         submit_selector: CSS selector for submit button
         success_selector: CSS selector to verify login success
         headless: Run browser in headless mode
+        wait_for: Navigation wait strategy: load, domcontentloaded, networkidle,
+            lcp or dom-quiet (default NAVIGATION_WAIT)
 
     Returns:
         Dictionary with login result
@@ -151,7 +156,8 @@ def auto_login(
         password_selector=password_selector,
         submit_selector=submit_selector,
         success_selector=success_selector,
-        headless=headless
+        headless=headless,
+        wait_for=wait_for
     ))
 
 
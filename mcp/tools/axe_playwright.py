@@ -5,18 +5,29 @@ Axe accessibility scanning using Playwright.
 import json
 import logging
 import subprocess
-from pathlib import Path
 from typing import Any, Literal
 
+from .navigation import InterceptionProfile, WaitStrategy, validate_interception_profile
+from .node_runner import NodeToolError, run_node_tool
+
 logger = logging.getLogger(__name__)
 
-def scan_axe(url: str, device: Literal["mobile", "desktop"] = "mobile") -> dict[str, Any]:
+def scan_axe(
+    url: str,
+    device: Literal["mobile", "desktop"] = "mobile",
+    wait_for: WaitStrategy | None = None,
+    interception_profile: InterceptionProfile | None = None
+) -> dict[str, Any]:
     """
     Run axe accessibility scan using Playwright.
 
     Args:
         url: The URL to scan
         device: Device type for viewport simulation
+        wait_for: Navigation wait strategy: load, domcontentloaded, networkidle,
+            lcp or dom-quiet (default NAVIGATION_WAIT)
+        interception_profile: Request interception profile: full, layout,
+            a11y-minimal or headers-only (default a11y-minimal: no fonts or media, images stubbed)
 
     Returns:
         Dict containing violations, passes, incomplete, and raw axe results
@@ -25,76 +36,28 @@ def scan_axe(url: str, device: Literal["mobile", "desktop"] = "mobile") -> dict[
         # Validate URL
         if not url.startswith(('http://', 'https://')):
             raise ValueError("URL must start with http:// or https://")
-
-        # Get path to Node script
-        node_script = Path(__file__).parent.parent.parent / "node-tools" / "axe-playwright.js"
-
-        if not node_script.exists():
-            raise FileNotFoundError(f"Node script not found: {node_script}")
+        validate_interception_profile(interception_profile)
 
         # Run axe scan via Node script
-        cmd = ["node", str(node_script), url, device]
-
         logger.info(f"Running axe scan for {url} with {device} device")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-
-        if result.returncode != 0:
-            raise RuntimeError(f"Axe scan failed: {result.stderr}")
-
-        # Parse JSON output
-        raw_data = json.loads(result.stdout)
-
-        # Normalize violations
-        violations = []
-        for violation in raw_data.get('violations', []):
-            violations.append({
-                'id': violation.get('id'),
-                'impact': violation.get('impact'),
-                'description': violation.get('description'),
-                'help': violation.get('help'),
-                'helpUrl': violation.get('helpUrl'),
-                'nodes': len(violation.get('nodes', [])),
-                'tags': violation.get('tags', [])
-            })
-
-        # Normalize incomplete (potential issues)
-        incomplete = []
-        for item in raw_data.get('incomplete', []):
-            incomplete.append({
-                'id': item.get('id'),
-                'impact': item.get('impact'),
-                'description': item.get('description'),
-                'help': item.get('help'),
-                'nodes': len(item.get('nodes', [])),
-                'tags': item.get('tags', [])
-            })
+        args = [url, device] + ([f"--wait-for={wait_for}"] if wait_for else [])
+        if interception_profile:
+            args.append(f"--interception={interception_profile}")
+        params = {"url": url, "device": device, "waitFor": wait_for, "interception": interception_profile}
+        raw_data = run_node_tool("axe", "axe-playwright.js", args, params, timeout=60)
 
-        # Count passes and incomplete
-        passes_count = len(raw_data.get('passes', []))
-        incomplete_count = len(raw_data.get('incomplete', []))
+        return _summarize_axe(raw_data, url, device)
 
+    except (subprocess.TimeoutExpired, TimeoutError):
         return {
-            'status': 'ok',
-            'url': url,
-            'device': device,
-            'violations': violations,
-            'violationsCount': len(violations),
-            'incomplete': incomplete,
-            'incompleteCount': incomplete_count,
-            'passesCount': passes_count,
-            'summary': {
-                'violations': len(violations),
-                'incomplete': incomplete_count,
-                'passes': passes_count,
-                'total_rules_tested': len(violations) + incomplete_count + passes_count
-            },
-            'raw': raw_data
+            'status': 'error',
+            'error': 'Axe scan timed out after 60 seconds'
         }
-
-    except subprocess.TimeoutExpired:
+    except NodeToolError as e:
+        logger.error(f"Axe scan failed: {e}")
         return {
             'status': 'error',
-            'error': 'Axe scan timed out after 60 seconds'
+            'error': f'Axe scan failed: {e}'
         }
     except json.JSONDecodeError as e:
         return {
@@ -106,4 +69,55 @@ def scan_axe(url: str, device: Literal["mobile", "desktop"] = "mobile") -> dict[
         return {
             'status': 'error',
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+
+def _summarize_axe(raw_data: dict[str, Any], url: str, device: str) -> dict[str, Any]:
+    """Normalize raw axe results into the scan_axe result format."""
+    # Normalize violations
+    violations = []
+    for violation in raw_data.get('violations', []):
+        violations.append({
+            'id': violation.get('id'),
+            'impact': violation.get('impact'),
+            'description': violation.get('description'),
+            'help': violation.get('help'),
+            'helpUrl': violation.get('helpUrl'),
+            'nodes': len(violation.get('nodes', [])),
+            'tags': violation.get('tags', [])
+        })
+
+    # Normalize incomplete (potential issues)
+    incomplete = []
+    for item in raw_data.get('incomplete', []):
+        incomplete.append({
+            'id': item.get('id'),
+            'impact': item.get('impact'),
+            'description': item.get('description'),
+            'help': item.get('help'),
+            'nodes': len(item.get('nodes', [])),
+            'tags': item.get('tags', [])
+        })
+
+    # Count passes and incomplete
+    passes_count = len(raw_data.get('passes', []))
+    incomplete_count = len(raw_data.get('incomplete', []))
+
+    return {
+        'status': 'ok',
+        'url': url,
+        'device': device,
+        'violations': violations,
+        'violationsCount': len(violations),
+        'incomplete': incomplete,
+        'incompleteCount': incomplete_count,
+        'passesCount': passes_count,
+        'summary': {
+            'violations': len(violations),
+            'incomplete': incomplete_count,
+            'passes': passes_count,
+            'total_rules_tested': len(violations) + incomplete_count + passes_count
+        },
+        'requests': (raw_data.get('navigation') or {}).get('requests'),
+        'raw': raw_data
+    }
@@ -0,0 +1,255 @@
+"""
+Batch multi-URL audits with a bounded worker pool.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .audit_page import PAGE_CHECKS, audit_page
+from .axe_playwright import scan_axe
+from .change_detection import incremental_tool
+from .lighthouse import audit_lighthouse
+from .lighthouse_fast import lighthouse_fast
+from .orchestrator import MAX_WORKERS, ToolJob, run_coroutine_sync, run_tool
+from .report_merge import report_merge
+from .responsive import responsive_audit
+from .security_headers import security_headers
+from .url_check import url_check
+from .webhint import webhint_scan
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOOLS: dict[str, Callable[..., dict[str, Any]]] = {
+    'audit_lighthouse': audit_lighthouse,
+    'lighthouse_fast': lighthouse_fast,
+    'scan_axe': scan_axe,
+    'webhint_scan': webhint_scan,
+    'security_headers': security_headers,
+    'responsive_audit': responsive_audit,
+    'url_check': url_check
+}
+
+DEFAULT_TOOLS = ['security_headers', 'scan_axe', 'responsive_audit']
+MAX_CONCURRENCY = 32
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def audit_batch(
+    urls: list[str],
+    tools: list[str] | None = None,
+    concurrency: int = 4,
+    budgets: dict[str, Any] | None = None,
+    tool_timeout: float = 180,
+    incremental: bool = False
+) -> dict[str, Any]:
+    """
+    Audit many URLs with several tools using a bounded pool of workers.
+
+    Browser-based checks for the same URL share one page load (see audit_page),
+    and all jobs share the server's browser pool and Node worker.
+
+    Args:
+        urls: URLs to audit
+        tools: Tools to run per URL (default: security_headers, scan_axe, responsive_audit)
+        concurrency: Maximum tool jobs running at once (1-32, capped at the
+            tool pool size AUDIT_MAX_WORKERS)
+        budgets: Optional budget thresholds applied to every per-URL report
+        tool_timeout: Seconds each tool job may run
+        incremental: Reuse each tool's last result for pages whose content is unchanged
+
+    Returns:
+        Dict with one merged result per URL, average scores and an aggregate report.
+        Progress is streamed line by line to progressPath while the batch runs.
+    """
+    try:
+        if not urls:
+            raise ValueError("URLs list cannot be empty")
+
+        tools = tools or DEFAULT_TOOLS
+        unknown = [tool for tool in tools if tool not in BATCH_TOOLS]
+        if unknown:
+            raise ValueError(f"Unsupported tools: {unknown}. Use: {list(BATCH_TOOLS)}")
+
+        if not 1 <= concurrency <= MAX_CONCURRENCY:
+            raise ValueError(f"Concurrency must be between 1 and {MAX_CONCURRENCY}")
+        # More jobs than pool threads would only wait in the pool's queue
+        concurrency = min(concurrency, MAX_WORKERS)
+
+        # Preserve order while dropping duplicates
+        urls = list(dict.fromkeys(urls))
+
+        artifacts_dir = Path(__file__).parent.parent.parent / "artifacts"
+        artifacts_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        progress_path = artifacts_dir / f"batch-{timestamp}-{uuid.uuid4().hex[:8]}.progress.jsonl"
+
+        logger.info(f"Starting batch audit of {len(urls)} URLs with {tools} (concurrency {concurrency})")
+        with open(progress_path, 'x', encoding='utf-8') as progress_file:
+            def on_progress(event: dict[str, Any]):
+                progress_file.write(json.dumps(event) + "\n")
+                progress_file.flush()
+                logger.info(
+                    f"[batch {event['completed']}/{event['total']}] "
+                    f"{event['tool']} {event['url']}: {event['status']}"
+                )
+
+            per_url = run_coroutine_sync(run_batch(urls, tools, concurrency, tool_timeout, on_progress, incremental))
+
+        return {
+            'status': 'ok',
+            'urlsCount': len(urls),
+            'tools': tools,
+            'concurrency': concurrency,
+            'progressPath': str(progress_path),
+            **summarize_batch(per_url, budgets)
+        }
+
+    except Exception as e:
+        logger.error(f"Batch audit failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+            'tool': 'audit_batch'
+        }
+
+
+async def run_batch(
+    urls: list[str],
+    tools: list[str],
+    concurrency: int,
+    tool_timeout: float,
+    on_progress: ProgressCallback | None = None,
+    incremental: bool = False
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Run every tool against every URL, at most `concurrency` jobs at a time.
+
+    Returns:
+        Tool results keyed by URL, then by tool name
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    per_url: dict[str, dict[str, dict[str, Any]]] = {url: {} for url in urls}
+    jobs = [(url, job) for url in urls for job in plan_jobs(url, tools, incremental)]
+    completed = 0
+
+    async def execute(url: str, job: ToolJob):
+        nonlocal completed
+        async with semaphore:
+            result = await run_tool(job, timeout=tool_timeout)
+
+        if job.name == 'audit_page':
+            page_tools = job.kwargs['tools']
+            if result.get('status') == 'ok':
+                per_url[url].update(result['results'])
+            else:
+                per_url[url].update({tool: result for tool in page_tools})
+        else:
+            per_url[url][job.name] = result
+
+        completed += 1
+        if on_progress:
+            on_progress({
+                'completed': completed,
+                'total': len(jobs),
+                'url': url,
+                'tool': job.name,
+                'status': result.get('status'),
+                'stale': result.get('stale', False),
+                'durationMs': result.get('durationMs')
+            })
+
+    await asyncio.gather(*(execute(url, job) for url, job in jobs))
+    return per_url
+
+
+def plan_jobs(url: str, tools: list[str], incremental: bool = False) -> list[ToolJob]:
+    """
+    Build the jobs for one URL, folding browser checks into a single page load.
+
+    With incremental=True each job skips pages unchanged since its last run.
+    """
+    page_tools = [tool for tool in tools if tool in PAGE_CHECKS]
+    planned: list[tuple[str, Callable[..., dict[str, Any]], dict[str, Any]]] = []
+
+    if len(page_tools) > 1:
+        planned.append(('audit_page', audit_page, {'tools': page_tools}))
+    else:
+        page_tools = []
+
+    for tool in tools:
+        if tool not in page_tools:
+            planned.append((tool, BATCH_TOOLS[tool], {}))
+
+    if incremental:
+        return [
+            ToolJob(name, incremental_tool(name, func), (url,), {**kwargs, 'incremental': True})
+            for name, func, kwargs in planned
+        ]
+    return [ToolJob(name, func, (url,), kwargs) for name, func, kwargs in planned]
+
+
+def summarize_batch(
+    per_url: dict[str, dict[str, dict[str, Any]]],
+    budgets: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Merge each URL's results and build the aggregate report."""
+    url_reports = []
+    all_items = []
+
+    for url, results in per_url.items():
+        items = [result for result in results.values() if result.get('status') == 'ok']
+        all_items.extend(items)
+        entry: dict[str, Any] = {
+            'url': url,
+            'tools': {tool: result.get('status') for tool, result in results.items()},
+            'errors': {
+                tool: result.get('error')
+                for tool, result in results.items() if result.get('status') != 'ok'
+            }
+        }
+
+        if items:
+            merged = report_merge(items, budgets)
+            entry.update({
+                'status': merged.get('status'),
+                'score': merged.get('score'),
+                'budgets': merged.get('budgets'),
+                'summary': merged.get('summary'),
+                'jsonReportPath': merged.get('jsonReportPath'),
+                'htmlReportPath': merged.get('htmlReportPath')
+            })
+        else:
+            entry['status'] = 'error'
+            entry['error'] = 'All tools failed for this URL'
+
+        url_reports.append(entry)
+
+    scored = [entry['score'] for entry in url_reports if entry.get('score')]
+    average_scores = {
+        category: round(sum(score[category] for score in scored) / len(scored), 1)
+        for category in scored[0]
+    } if scored else {}
+
+    aggregate = report_merge(all_items, budgets) if all_items else {
+        'status': 'error',
+        'error': 'No successful results to merge'
+    }
+
+    return {
+        'succeeded': sum(1 for entry in url_reports if entry['status'] == 'ok'),
+        'failed': sum(1 for entry in url_reports if entry['status'] != 'ok'),
+        'averageScores': average_scores,
+        'results': url_reports,
+        'aggregate': {
+            key: aggregate.get(key)
+            for key in ('status', 'error', 'summary', 'jsonReportPath', 'htmlReportPath')
+            if key in aggregate
+        }
+    }
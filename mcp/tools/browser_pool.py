@@ -0,0 +1,404 @@
+"""
+Warm Chromium pool shared by the Playwright-based audit tools.
+
+The server process owns a small set of long-lived browser servers
+(``node-tools/browser-server.js``). Tools lease a WebSocket endpoint,
+connect to it from their Node script and open an isolated browser
+context, so no audit pays the Chromium cold start.
+"""
+
+import collections
+import json
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from .orchestrator import job_time_left
+
+try:
+    import psutil
+except ImportError:  # Optional: only used to measure browser memory
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+BROWSER_SERVER_SCRIPT = Path(__file__).parent.parent.parent / "node-tools" / "browser-server.js"
+
+# Wait this long before trying to start browsers again after a failed launch
+LAUNCH_RETRY_DELAY = 60.0
+
+
+@dataclass
+class PoolConfig:
+    """Browser pool limits, read from the environment by default."""
+    size: int = 2
+    max_contexts: int = 4
+    max_uses: int = 200
+    max_rss_mb: int = 1024
+    lease_timeout: float = 60.0
+    startup_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Build a config from BROWSER_POOL_* environment variables."""
+        enabled = os.getenv("BROWSER_POOL_ENABLED", "true").lower() == "true"
+        return cls(
+            size=int(os.getenv("BROWSER_POOL_SIZE", "2")) if enabled else 0,
+            max_contexts=int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "4")),
+            max_uses=int(os.getenv("BROWSER_POOL_MAX_USES", "200")),
+            max_rss_mb=int(os.getenv("BROWSER_POOL_MAX_RSS_MB", "1024")),
+            lease_timeout=float(os.getenv("BROWSER_POOL_LEASE_TIMEOUT", "60"))
+        )
+
+
+@dataclass
+class PooledBrowser:
+    """A running browser server and its usage counters."""
+    process: subprocess.Popen
+    ws_endpoint: str
+    browser_pid: int | None
+    started_at: float = field(default_factory=time.time)
+    uses: int = 0
+    active: int = 0
+    retiring: bool = False
+
+    def is_alive(self) -> bool:
+        """Check that the browser server process is still running."""
+        return self.process.poll() is None
+
+    def is_reachable(self, timeout: float = 1.0) -> bool:
+        """Check that the WebSocket endpoint accepts TCP connections."""
+        parsed = urlparse(self.ws_endpoint)
+        try:
+            with socket.create_connection((parsed.hostname, parsed.port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def rss_mb(self) -> float | None:
+        """Resident memory of the browser and its child processes, if measurable."""
+        if not self.browser_pid:
+            return None
+        return _process_tree_rss_mb(self.browser_pid)
+
+    def describe(self) -> dict[str, Any]:
+        """Summarize this browser for health reporting."""
+        return {
+            'pid': self.browser_pid,
+            'uses': self.uses,
+            'activeContexts': self.active,
+            'uptimeSeconds': round(time.time() - self.started_at, 1),
+            'rssMb': self.rss_mb(),
+            'retiring': self.retiring
+        }
+
+
+class BrowserPool:
+    """Hands out warm browser endpoints with per-browser context limits."""
+
+    def __init__(self, config: PoolConfig | None = None):
+        self.config = config or PoolConfig.from_env()
+        self._browsers: list[PooledBrowser] = []
+        self._starting = 0
+        self._closed = False
+        self._launch_failed_at: float | None = None
+        self._last_error: str | None = None
+        self._cond = threading.Condition()
+        self._stats = {'leases': 0, 'launched': 0, 'recycled': 0, 'unhealthy': 0, 'fallbacks': 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether leases may currently be served from the pool."""
+        if self.config.size <= 0 or self._closed:
+            return False
+        if self._launch_failed_at is not None:
+            return time.monotonic() - self._launch_failed_at >= LAUNCH_RETRY_DELAY
+        return True
+
+    @contextmanager
+    def lease(self) -> Iterator[str | None]:
+        """
+        Lease a browser endpoint for the duration of one audit.
+
+        Yields None when the pool is disabled or cannot start a browser,
+        in which case the caller should launch its own.
+        """
+        browser = self._acquire()
+        try:
+            yield browser.ws_endpoint if browser else None
+        finally:
+            if browser:
+                self._release(browser)
+
+    def warm(self) -> None:
+        """Start browsers up to the configured pool size."""
+        for _ in range(self.config.size):
+            with self._cond:
+                if len(self._browsers) + self._starting >= self.config.size:
+                    return
+                self._starting += 1
+            browser = self._start_browser()
+            if browser is None:
+                return
+            with self._cond:
+                self._browsers.append(browser)
+                self._cond.notify_all()
+
+    def health_check(self) -> dict[str, Any]:
+        """Probe every browser, retire unhealthy ones and report pool state."""
+        with self._cond:
+            browsers = list(self._browsers)
+
+        for browser in browsers:
+            if not browser.is_alive() or (browser.active == 0 and not browser.is_reachable()):
+                self._stats['unhealthy'] += 1
+                self._retire(browser)
+
+        with self._cond:
+            return {
+                'enabled': self.enabled,
+                'size': self.config.size,
+                'maxContextsPerBrowser': self.config.max_contexts,
+                'maxUses': self.config.max_uses,
+                'maxRssMb': self.config.max_rss_mb,
+                'browsers': [b.describe() for b in self._browsers],
+                'stats': dict(self._stats),
+                'lastError': self._last_error
+            }
+
+    def shutdown(self) -> None:
+        """Stop all browser servers."""
+        with self._cond:
+            self._closed = True
+            browsers = list(self._browsers)
+            self._browsers.clear()
+            self._cond.notify_all()
+
+        for browser in browsers:
+            _stop_process(browser.process)
+
+    def _acquire(self) -> PooledBrowser | None:
+        """Pick a browser with spare capacity, starting one if the pool allows it."""
+        if not self.enabled:
+            return None
+
+        deadline = time.monotonic() + job_time_left(self.config.lease_timeout)
+        with self._cond:
+            while True:
+                if not self.enabled:
+                    self._stats['fallbacks'] += 1
+                    return None
+
+                browser = self._pick_available()
+                if browser:
+                    browser.active += 1
+                    browser.uses += 1
+                    self._stats['leases'] += 1
+                    return browser
+
+                if len(self._browsers) + self._starting < self.config.size:
+                    self._starting += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Browser pool exhausted: {self.config.size} browsers with "
+                        f"{self.config.max_contexts} contexts each are busy"
+                    )
+                self._cond.wait(remaining)
+
+        browser = self._start_browser()
+        if browser is None:
+            with self._cond:
+                self._stats['fallbacks'] += 1
+            return None
+
+        with self._cond:
+            browser.active = 1
+            browser.uses = 1
+            self._stats['leases'] += 1
+            self._browsers.append(browser)
+            self._cond.notify_all()
+        return browser
+
+    def _pick_available(self) -> PooledBrowser | None:
+        """Return the least busy healthy browser below its context limit (lock held)."""
+        for browser in [b for b in self._browsers if not b.is_alive()]:
+            logger.warning(f"Pooled browser {browser.browser_pid} exited unexpectedly")
+            self._stats['unhealthy'] += 1
+            self._browsers.remove(browser)
+
+        candidates = [
+            b for b in self._browsers
+            if not b.retiring and b.active < self.config.max_contexts
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda b: b.active)
+
+    def _release(self, browser: PooledBrowser) -> None:
+        """Return a lease and recycle the browser when it is worn out."""
+        with self._cond:
+            browser.active -= 1
+            if browser.uses >= self.config.max_uses:
+                browser.retiring = True
+
+        if not browser.retiring and self.config.max_rss_mb > 0:
+            rss = browser.rss_mb()
+            if rss is not None and rss > self.config.max_rss_mb:
+                logger.info(f"Recycling pooled browser {browser.browser_pid}: RSS {rss:.0f} MB")
+                browser.retiring = True
+
+        if browser.retiring or not browser.is_alive():
+            self._retire(browser)
+        else:
+            with self._cond:
+                self._cond.notify_all()
+
+    def _retire(self, browser: PooledBrowser) -> None:
+        """Stop accepting leases on a browser and stop it once idle."""
+        with self._cond:
+            browser.retiring = True
+            if browser.active > 0 or browser not in self._browsers:
+                return
+            self._browsers.remove(browser)
+            self._stats['recycled'] += 1
+            self._cond.notify_all()
+
+        _stop_process(browser.process)
+
+    def _start_browser(self) -> PooledBrowser | None:
+        """Launch one browser server; caller has already reserved a start slot."""
+        browser = None
+        try:
+            browser = _launch_browser_server(self.config.startup_timeout)
+            self._launch_failed_at = None
+            self._last_error = None
+            logger.info(f"Started pooled browser {browser.browser_pid} at {browser.ws_endpoint}")
+            return browser
+        except Exception as e:
+            logger.warning(f"Browser pool launch failed, tools will launch their own browser: {e}")
+            self._launch_failed_at = time.monotonic()
+            self._last_error = str(e)
+            return None
+        finally:
+            with self._cond:
+                self._starting -= 1
+                if browser is not None:
+                    self._stats['launched'] += 1
+                self._cond.notify_all()
+
+
+def _launch_browser_server(startup_timeout: float) -> PooledBrowser:
+    """Start browser-server.js and wait for it to report its endpoint."""
+    if not BROWSER_SERVER_SCRIPT.exists():
+        raise FileNotFoundError(f"Node script not found: {BROWSER_SERVER_SCRIPT}")
+
+    process = subprocess.Popen(
+        ["node", str(BROWSER_SERVER_SCRIPT)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
+    # Drain stderr so a chatty browser can never block on a full pipe
+    stderr_tail: collections.deque[str] = collections.deque(maxlen=20)
+    threading.Thread(
+        target=lambda: stderr_tail.extend(process.stderr),
+        daemon=True
+    ).start()
+
+    first_line: list[str] = []
+    reader = threading.Thread(target=lambda: first_line.append(process.stdout.readline()), daemon=True)
+    reader.start()
+    reader.join(startup_timeout)
+
+    line = first_line[0].strip() if first_line else ""
+    if not line:
+        _stop_process(process)
+        details = "".join(stderr_tail).strip()
+        raise RuntimeError(f"Browser server did not report an endpoint: {details or 'no output'}")
+
+    try:
+        info = json.loads(line)
+        return PooledBrowser(process=process, ws_endpoint=info['wsEndpoint'], browser_pid=info.get('pid'))
+    except (ValueError, KeyError, TypeError) as e:
+        _stop_process(process)
+        raise RuntimeError(f"Browser server reported no endpoint: {line[:200]}") from e
+
+
+def _stop_process(process: subprocess.Popen) -> None:
+    """Ask a browser server to exit, killing it if it does not."""
+    if process.poll() is not None:
+        return
+    try:
+        process.stdin.close()
+        process.wait(timeout=5)
+    except Exception:
+        process.kill()
+
+
+def _process_tree_rss_mb(pid: int) -> float | None:
+    """Sum resident memory of a process and its descendants in megabytes."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return round(total / (1024 * 1024), 1)
+        except psutil.Error:
+            return None
+
+    # Linux fallback without psutil
+    proc_root = Path("/proc")
+    if not proc_root.exists():
+        return None
+
+    total_kb = 0
+    pending = [pid]
+    seen: set[int] = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            for line in (proc_root / str(current) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+                    break
+            children = (proc_root / str(current) / "task" / str(current) / "children").read_text()
+            pending.extend(int(child) for child in children.split())
+        except (OSError, ValueError):
+            continue
+
+    return round(total_kb / 1024, 1) if seen else None
+
+
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
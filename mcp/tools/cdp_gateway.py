@@ -1,116 +1,580 @@
 """
 Chrome DevTools MCP Gateway - Client for chrome-devtools-mcp server.
+
+The cdp_* tools take an optional session_id. Each session owns its own
+chrome-devtools-mcp child (and so its own Chrome), so page, emulation and
+trace state stay with the caller that created them while other sessions run
+in parallel. Calls without a session_id share the "default" session.
 """
 
+import asyncio
+import gzip
+import itertools
 import json
 import logging
 import os
+import shutil
 import subprocess
 import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal
 
+from .artifact_store import get_artifact_store
+from .screenshots import VariantFormat, image_variants, store_base64_image, store_image_file
+from .trace_analysis import analyze_trace
+
 logger = logging.getLogger(__name__)
 
-class ChromeMCPClient:
-    """Client for communicating with chrome-devtools-mcp server."""
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("CHROME_MCP_TIMEOUT", "60"))
+
+# Deadline for the initialize handshake (npx may download the package first)
+STARTUP_TIMEOUT = float(os.getenv("CHROME_MCP_STARTUP_TIMEOUT", "30"))
+
+# Failed starts are retried after 1s, 2s, 4s ... up to this many seconds
+MAX_RESTART_BACKOFF = float(os.getenv("CHROME_MCP_MAX_BACKOFF", "60"))
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "mcp-auditor-local", "version": "1.1.0"}
+
+DEFAULT_SESSION = "default"
+
+
+def chrome_mcp_command() -> list[str]:
+    """Command line for chrome-devtools-mcp from CHROME_MCP_COMMAND / CHROME_MCP_ARGS."""
+    return [os.getenv("CHROME_MCP_COMMAND", "npx")] + json.loads(
+        os.getenv("CHROME_MCP_ARGS", '["-y", "chrome-devtools-mcp"]')
+    )
+
+
+def tool_content(result: dict[str, Any]) -> dict[str, Any]:
+    """Split a tools/call result's content items into joined text, images and resources."""
+    texts: list[str] = []
+    content: dict[str, Any] = {'text': '', 'images': [], 'resources': []}
+    for item in result.get('content') or []:
+        kind = item.get('type')
+        if kind == 'text':
+            texts.append(item.get('text', ''))
+        elif kind == 'image':
+            content['images'].append(item)
+        elif kind == 'resource':
+            content['resources'].append(item.get('resource') or {})
+    content['text'] = "\n".join(texts)
+    if 'structuredContent' in result:
+        content['structured'] = result['structuredContent']
+    return content
+
+
+class ChromeMCPError(RuntimeError):
+    """chrome-devtools-mcp answered a request with a JSON-RPC error."""
+
+    def __init__(self, error: dict[str, Any]):
+        super().__init__(f"Chrome MCP error: {error}")
+        self.error = error
+
 
-    def __init__(self):
+class ChromeMCPClient:
+    """
+    Multiplexing JSON-RPC client for chrome-devtools-mcp.
+
+    A reader thread matches responses to callers by id, so requests from
+    several threads (or coroutines, via request_async) can be in flight at
+    once. Server notifications go to notification_handler; server-initiated
+    requests such as ping are answered by the reader.
+
+    The child is ready once it answers the MCP initialize handshake, so a
+    cold start costs as long as the server actually takes. Failed starts are
+    retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        command: list[str] | None = None,
+        notification_handler: Callable[[str, dict[str, Any]], None] | None = None
+    ):
+        self.command = command
+        self.notification_handler = notification_handler or self._log_notification
         self.process: subprocess.Popen | None = None
-        self.request_id = 0
-        self.lock = threading.Lock()
-
-    def _get_next_id(self) -> int:
-        """Get next request ID."""
-        with self.lock:
-            self.request_id += 1
-            return self.request_id
-
-    def _ensure_process(self) -> bool:
-        """Ensure chrome-devtools-mcp process is running."""
-        if self.process and self.process.poll() is None:
+        self._ids = itertools.count(1)
+        self._pending: dict[int, tuple[subprocess.Popen, Future]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._notifications = 0
+        self._server: dict[str, Any] = {}
+        self._startup_ms: int | None = None
+        self._starts = 0
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def request(self, method: str, params: dict[str, Any] | None = None, timeout: float | None = None) -> Any:
+        """
+        Send a request and wait for its result.
+
+        Raises:
+            ChromeMCPError: The server answered with an error
+            TimeoutError: No response within the timeout (the process keeps running)
+            RuntimeError: chrome-devtools-mcp is not available or exited
+        """
+        timeout = timeout or DEFAULT_REQUEST_TIMEOUT
+        request_id, future = self._send(method, params)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._abandon(request_id)
+            raise TimeoutError(f"Chrome MCP request '{method}' timed out after {timeout} seconds") from None
+
+    async def request_async(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None
+    ) -> Any:
+        """Awaitable request(); does not block the event loop while waiting."""
+        timeout = timeout or DEFAULT_REQUEST_TIMEOUT
+        request_id, future = self._send(method, params)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(request_id)
+            raise TimeoutError(f"Chrome MCP request '{method}' timed out after {timeout} seconds") from None
+
+    def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        timeout: float | None = None
+    ) -> dict[str, Any]:
+        """
+        Call one of the server's MCP tools (tools/call) and return its content.
+
+        Raises:
+            ChromeMCPError: The tool reported isError (message from its text content)
+        """
+        result = self.request("tools/call", {"name": name, "arguments": arguments or {}}, timeout) or {}
+        content = tool_content(result)
+        if result.get('isError'):
+            raise ChromeMCPError({'tool': name, 'message': content['text'] or 'Tool call failed'})
+        return content
+
+    def notify(self, method: str, params: dict[str, Any] | None = None):
+        """Send a notification (no response expected)."""
+        process = self._ensure_process()
+        self._write(process, {"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def start(self) -> bool:
+        """Start the child and complete the handshake now (e.g. at server boot)."""
+        try:
+            self._ensure_process()
             return True
+        except RuntimeError as e:
+            logger.warning(f"chrome-devtools-mcp pre-warm failed: {e}")
+            return False
+
+    def status(self) -> dict[str, Any]:
+        """Report process state for health checks."""
+        process = self.process
+        running = process is not None and process.poll() is None
+        return {
+            'running': running,
+            'pid': process.pid if running else None,
+            'server': self._server.get('serverInfo'),
+            'protocolVersion': self._server.get('protocolVersion'),
+            'startupMs': self._startup_ms,
+            'starts': self._starts,
+            'consecutiveFailures': self._failures,
+            'retryInSeconds': max(0.0, round(self._retry_at - time.monotonic(), 1)),
+            'inFlight': len(self._pending),
+            'notifications': self._notifications
+        }
+
+    def close(self):
+        """Stop the child process; pending requests fail when its output closes."""
+        with self._lock:
+            process, self.process = self.process, None
+        if process and process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+
+    def _send(self, method: str, params: dict[str, Any] | None) -> tuple[int, Future]:
+        process = self._ensure_process()
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            self._pending[request_id] = (process, future)
 
         try:
-            # Get command from environment
-            command = os.getenv("CHROME_MCP_COMMAND", "npx")
-            args = json.loads(os.getenv("CHROME_MCP_ARGS", '["-y", "chrome-devtools-mcp"]'))
+            self._write(process, {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        except RuntimeError:
+            self._abandon(request_id)
+            raise
+        return request_id, future
 
-            # Start the process
-            cmd = [command] + args
-            logger.info(f"Starting chrome-devtools-mcp: {' '.join(cmd)}")
+    def _write(self, process: subprocess.Popen, message: dict[str, Any]):
+        try:
+            with self._write_lock:
+                process.stdin.write(json.dumps(message) + "\n")
+                process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise RuntimeError(f"chrome-devtools-mcp is not accepting requests: {e}") from e
+
+    def _abandon(self, request_id: int):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def _ensure_process(self) -> subprocess.Popen:
+        """Return a ready chrome-devtools-mcp process, starting it if needed."""
+        process = self.process
+        if process and process.poll() is None:
+            return process
+
+        with self._start_lock:
+            if self.process and self.process.poll() is None:
+                return self.process
+
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise RuntimeError(f"chrome-devtools-mcp failed to start; retrying in {wait:.0f}s")
+
+            try:
+                self.process = self._start()
+            except RuntimeError:
+                self._failures += 1
+                backoff = min(2 ** (self._failures - 1), MAX_RESTART_BACKOFF)
+                self._retry_at = time.monotonic() + backoff
+                raise
+
+            self._failures = 0
+            self._retry_at = 0.0
+            return self.process
+
+    def _start(self) -> subprocess.Popen:
+        """Launch the child and run the initialize/initialized handshake (start lock held)."""
+        command = self.command or chrome_mcp_command()
+        if self._starts:
+            logger.warning("chrome-devtools-mcp exited, restarting")
+        logger.info(f"Starting chrome-devtools-mcp: {' '.join(command)}")
+        self._starts += 1
+        started = time.monotonic()
 
-            self.process = subprocess.Popen(
-                cmd,
+        try:
+            process = subprocess.Popen(
+                command,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                bufsize=0
+                bufsize=1
             )
+        except FileNotFoundError as e:
+            logger.error("chrome-devtools-mcp not found. Install with: npm i -g chrome-devtools-mcp")
+            raise RuntimeError("chrome-devtools-mcp is not available") from e
 
-            # Wait a moment for startup
-            time.sleep(2)
-
-            # Check if process is still running
-            if self.process.poll() is not None:
-                stderr = self.process.stderr.read() if self.process.stderr else ""
-                raise RuntimeError(f"chrome-devtools-mcp failed to start: {stderr}")
+        threading.Thread(target=self._read_messages, args=(process,), daemon=True).start()
+        threading.Thread(target=self._drain_stderr, args=(process,), daemon=True).start()
 
-            return True
-
-        except FileNotFoundError:
-            logger.error("chrome-devtools-mcp not found. Install with: npm i -g chrome-devtools-mcp")
-            return False
+        # Ready when the server answers initialize; exiting first fails the wait early
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            self._pending[request_id] = (process, future)
+        try:
+            self._write(process, {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": MCP_PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": CLIENT_INFO
+                }
+            })
+            self._server = future.result(timeout=STARTUP_TIMEOUT) or {}
+            self._write(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
         except Exception as e:
-            logger.error(f"Failed to start chrome-devtools-mcp: {e}")
-            return False
-
-    def _send_request(self, method: str, params: dict[str, Any] = None) -> dict[str, Any]:
-        """Send JSON-RPC request to chrome-devtools-mcp."""
-        if not self._ensure_process():
-            raise RuntimeError("chrome-devtools-mcp is not available")
-
-        request_id = self._get_next_id()
-        request = {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "method": method,
-            "params": params or {}
+            self._abandon(request_id)
+            process.kill()
+            if isinstance(e, FutureTimeoutError):
+                raise RuntimeError(f"chrome-devtools-mcp not ready after {STARTUP_TIMEOUT:.0f}s") from None
+            raise RuntimeError(f"chrome-devtools-mcp failed to start: {e}") from e
+
+        self._startup_ms = round((time.monotonic() - started) * 1000)
+        server_info = self._server.get('serverInfo', {})
+        logger.info(
+            f"chrome-devtools-mcp ready in {self._startup_ms} ms "
+            f"({server_info.get('name', 'unknown')} {server_info.get('version', '')})".rstrip()
+        )
+        return process
+
+    def _read_messages(self, process: subprocess.Popen):
+        """Dispatch responses to waiting futures and notifications to the handler until EOF."""
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring non-JSON output from chrome-devtools-mcp: {line[:200]}")
+                continue
+
+            if 'method' in message:
+                self._handle_server_message(process, message)
+                continue
+
+            with self._lock:
+                entry = self._pending.pop(message.get('id'), None)
+            if entry is None:
+                # Late answer to a request that already timed out
+                continue
+
+            future = entry[1]
+            if 'error' in message:
+                future.set_exception(ChromeMCPError(message['error'] or {}))
+            else:
+                future.set_result(message.get('result', {}))
+
+        # Process exited: fail the requests that were sent to it
+        process.wait()
+        with self._lock:
+            orphaned = [rid for rid, (owner, _) in self._pending.items() if owner is process]
+            pending = [self._pending.pop(rid)[1] for rid in orphaned]
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError(f"chrome-devtools-mcp exited with code {process.returncode}"))
+
+    def _handle_server_message(self, process: subprocess.Popen, message: dict[str, Any]):
+        """Answer server requests and hand notifications to the handler."""
+        if 'id' in message:
+            reply: dict[str, Any] = {"jsonrpc": "2.0", "id": message['id']}
+            if message['method'] == 'ping':
+                reply['result'] = {}
+            else:
+                reply['error'] = {"code": -32601, "message": f"Method not found: {message['method']}"}
+            try:
+                self._write(process, reply)
+            except RuntimeError as e:
+                logger.debug(f"Could not answer chrome-devtools-mcp request: {e}")
+            return
+
+        self._notifications += 1
+        try:
+            self.notification_handler(message['method'], message.get('params') or {})
+        except Exception as e:
+            logger.warning(f"Chrome MCP notification handler failed: {e}")
+
+    def _drain_stderr(self, process: subprocess.Popen):
+        """Forward diagnostics to the log (an unread pipe would block the child)."""
+        for line in process.stderr:
+            line = line.rstrip()
+            if line:
+                logger.debug(f"[chrome-devtools-mcp] {line}")
+
+    @staticmethod
+    def _log_notification(method: str, params: dict[str, Any]):
+        logger.debug(f"Chrome MCP notification {method}: {json.dumps(params)[:200]}")
+
+
+@dataclass
+class ChromeMCPSessionConfig:
+    """Session limits for the chrome-devtools-mcp pool, read from the environment by default."""
+    max_sessions: int = 4
+    idle_timeout: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> "ChromeMCPSessionConfig":
+        """Build a config from CHROME_MCP_* environment variables."""
+        return cls(
+            max_sessions=max(1, int(os.getenv("CHROME_MCP_MAX_SESSIONS", "4"))),
+            idle_timeout=float(os.getenv("CHROME_MCP_SESSION_IDLE_SECONDS", "600"))
+        )
+
+
+@dataclass
+class ChromeMCPSession:
+    """One chrome-devtools-mcp child and its usage bookkeeping."""
+    session_id: str
+    client: ChromeMCPClient
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+    uses: int = 0
+
+    def describe(self) -> dict[str, Any]:
+        status = self.client.status()
+        return {
+            'sessionId': self.session_id,
+            'running': status['running'],
+            'pid': status['pid'],
+            'leases': self.leases,
+            'uses': self.uses,
+            'idleSeconds': round(time.monotonic() - self.last_used, 1),
+            'ageSeconds': round(time.time() - self.created_at, 1)
         }
 
-        try:
-            # Send request
-            request_json = json.dumps(request) + "\n"
-            self.process.stdin.write(request_json)
-            self.process.stdin.flush()
 
-            # Read response
-            response_line = self.process.stdout.readline()
-            if not response_line:
-                raise RuntimeError("No response from chrome-devtools-mcp")
+class ChromeMCPSessionPool:
+    """
+    chrome-devtools-mcp children keyed by caller-supplied session id.
 
-            response = json.loads(response_line.strip())
+    A session is created on first use and kept until it has been idle for
+    idle_timeout seconds. At max_sessions, the least recently used session
+    with no active lease is closed to make room; if every session is in use
+    the call fails instead of waiting.
 
-            if "error" in response:
-                raise RuntimeError(f"Chrome MCP error: {response['error']}")
+    Sessions other than "default" start chrome-devtools-mcp with --isolated
+    so their Chromes do not share (and lock) one user data directory.
+    """
 
-            return response.get("result", {})
+    def __init__(self, config: ChromeMCPSessionConfig | None = None, command: list[str] | None = None):
+        self.config = config or ChromeMCPSessionConfig.from_env()
+        self.command = command
+        self._sessions: dict[str, ChromeMCPSession] = {}
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'evictedIdle': 0, 'evictedForCapacity': 0, 'closed': 0, 'rejected': 0}
 
-        except Exception as e:
-            logger.error(f"Chrome MCP communication error: {e}")
-            # Try to restart process on communication error
-            if self.process:
-                self.process.terminate()
-                self.process = None
-            raise
+    @contextmanager
+    def lease(self, session_id: str | None = None) -> Iterator[ChromeMCPClient]:
+        """
+        Hold a session's client for the duration of a tool call.
 
-# Global client instance
-_chrome_client = ChromeMCPClient()
+        A leased session is never evicted, so its child cannot be closed
+        underneath an in-flight request.
+        """
+        session = self._acquire(session_id or DEFAULT_SESSION)
+        try:
+            yield session.client
+        finally:
+            with self._lock:
+                session.leases -= 1
+                session.last_used = time.monotonic()
+
+    def client(self, session_id: str | None = None) -> ChromeMCPClient:
+        """The client for a session, creating it if needed (e.g. for pre-warming)."""
+        with self.lease(session_id) as client:
+            return client
+
+    def close_session(self, session_id: str) -> bool:
+        """Close one session's child. Returns False for an unknown session id."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session:
+                self._stats['closed'] += 1
+        if session is None:
+            return False
+        session.client.close()
+        logger.info(f"Closed chrome-devtools-mcp session {session_id}")
+        return True
+
+    def evict_idle(self) -> int:
+        """Close sessions idle longer than idle_timeout; returns how many were closed."""
+        with self._lock:
+            expired = self._pop_expired()
+        for session in expired:
+            session.client.close()
+        return len(expired)
+
+    def close_all(self):
+        """Close every session (server shutdown)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.client.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Report sessions and counters for health checks."""
+        self.evict_idle()
+        with self._lock:
+            return {
+                'maxSessions': self.config.max_sessions,
+                'idleTimeoutSeconds': self.config.idle_timeout,
+                'sessions': [session.describe() for session in self._sessions.values()],
+                'stats': dict(self._stats)
+            }
 
-def cdp_health() -> dict[str, Any]:
+    def _acquire(self, session_id: str) -> ChromeMCPSession:
+        with self._lock:
+            closing = self._pop_expired(keep=session_id)
+            session = self._sessions.get(session_id)
+            if session is None:
+                if len(self._sessions) >= self.config.max_sessions:
+                    victim = self._least_recently_used()
+                    if victim is None:
+                        self._stats['rejected'] += 1
+                        raise RuntimeError(
+                            f"All {self.config.max_sessions} chrome-devtools-mcp sessions are in use; "
+                            "retry later or close one with cdp_close_session"
+                        )
+                    closing.append(self._sessions.pop(victim.session_id))
+                    self._stats['evictedForCapacity'] += 1
+                    logger.info(f"Evicting chrome-devtools-mcp session {victim.session_id} to make room for {session_id}")
+                session = ChromeMCPSession(session_id, ChromeMCPClient(self._command_for(session_id)))
+                self._sessions[session_id] = session
+                self._stats['created'] += 1
+            session.leases += 1
+            session.uses += 1
+            session.last_used = time.monotonic()
+
+        # Closing waits for the child to exit; do it outside the lock
+        for expired in closing:
+            expired.client.close()
+        return session
+
+    def _pop_expired(self, keep: str | None = None) -> list[ChromeMCPSession]:
+        """Remove idle sessions past the timeout (lock held)."""
+        if self.config.idle_timeout <= 0:
+            return []
+        cutoff = time.monotonic() - self.config.idle_timeout
+        expired = [
+            session for session_id, session in self._sessions.items()
+            if session_id != keep and session.leases == 0 and session.last_used < cutoff
+        ]
+        for session in expired:
+            del self._sessions[session.session_id]
+            self._stats['evictedIdle'] += 1
+            logger.info(f"Closing idle chrome-devtools-mcp session {session.session_id}")
+        return expired
+
+    def _least_recently_used(self) -> ChromeMCPSession | None:
+        idle = [session for session in self._sessions.values() if session.leases == 0]
+        return min(idle, key=lambda session: session.last_used, default=None)
+
+    def _command_for(self, session_id: str) -> list[str] | None:
+        if session_id == DEFAULT_SESSION:
+            return self.command
+        command = self.command or chrome_mcp_command()
+        return command if "--isolated" in command else command + ["--isolated"]
+
+
+_sessions: ChromeMCPSessionPool | None = None
+_sessions_lock = threading.Lock()
+
+
+def get_chrome_mcp_sessions() -> ChromeMCPSessionPool:
+    """Get the process-wide chrome-devtools-mcp session pool."""
+    global _sessions
+    with _sessions_lock:
+        if _sessions is None:
+            _sessions = ChromeMCPSessionPool()
+        return _sessions
+
+
+def get_chrome_mcp_client(session_id: str | None = None) -> ChromeMCPClient:
+    """Get the chrome-devtools-mcp client for a session (default session when omitted)."""
+    return get_chrome_mcp_sessions().client(session_id)
+
+def cdp_health(session_id: str | None = None) -> dict[str, Any]:
     """Check health of Chrome DevTools MCP gateway."""
+    sessions = get_chrome_mcp_sessions()
     try:
         if not os.getenv("CHROME_MCP_ENABLED", "true").lower() == "true":
             return {
@@ -119,32 +583,40 @@ def cdp_health() -> dict[str, Any]:
             }
 
         # Try to get available tools
-        result = _chrome_client._send_request("tools/list")
+        with sessions.lease(session_id) as client:
+            result = client.request("tools/list")
+            process = client.status()
 
         return {
             'status': 'ok',
             'message': 'Chrome MCP gateway is healthy',
-            'availableTools': len(result.get('tools', []))
+            'sessionId': session_id or DEFAULT_SESSION,
+            'availableTools': len(result.get('tools', [])),
+            'process': process,
+            'sessions': sessions.stats()
         }
 
     except Exception as e:
         return {
             'status': 'error',
             'error': str(e),
+            'sessions': sessions.stats(),
             'suggestion': 'Install chrome-devtools-mcp with: npm i -g chrome-devtools-mcp'
         }
 
-def cdp_open(url: str) -> dict[str, Any]:
+def cdp_open(url: str, session_id: str | None = None) -> dict[str, Any]:
     """Open URL in Chrome via DevTools MCP."""
     try:
         if not url.startswith(('http://', 'https://')):
             raise ValueError("URL must start with http:// or https://")
 
-        result = _chrome_client._send_request("navigate", {"url": url})
+        with get_chrome_mcp_sessions().lease(session_id) as client:
+            result = client.call_tool("navigate_page", {"url": url})
 
         return {
             'status': 'ok',
             'url': url,
+            'sessionId': session_id or DEFAULT_SESSION,
             'result': result
         }
 
@@ -155,83 +627,176 @@ def cdp_open(url: str) -> dict[str, Any]:
             'error': str(e)
         }
 
-def cdp_screenshot(selector: str | None = None) -> dict[str, Any]:
-    """Capture screenshot via Chrome DevTools MCP."""
+def cdp_screenshot(
+    uid: str | None = None,
+    session_id: str | None = None,
+    thumbnail_width: int | None = None,
+    formats: list[VariantFormat] | None = None
+) -> dict[str, Any]:
+    """
+    Capture screenshot via Chrome DevTools MCP (take_screenshot).
+
+    uid is the element uid from chrome-devtools-mcp's page snapshot (CSS
+    selectors are not accepted); omit it to capture the viewport.
+    The server writes the image to a scratch file in the artifact store (older
+    servers return it as base64 image content, which is decoded to disk); the
+    response carries its path, dimensions and sha256 rather than the image
+    data. thumbnail_width and formats ("jpeg", "webp") add downscaled or
+    re-encoded copies (requires Pillow).
+    """
+    target = None
     try:
-        params = {}
-        if selector:
-            params['selector'] = selector
-
-        result = _chrome_client._send_request("screenshot", params)
-
-        # Save screenshot to artifacts if base64 data is returned
-        if 'data' in result:
-            artifacts_dir = Path(__file__).parent.parent.parent / "artifacts"
-            artifacts_dir.mkdir(exist_ok=True)
-
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            screenshot_path = artifacts_dir / f"cdp-screenshot-{timestamp}.png"
-
-            import base64
-            with open(screenshot_path, 'wb') as f:
-                f.write(base64.b64decode(result['data']))
-
-            result['screenshotPath'] = str(screenshot_path)
-
-        return {
+        target = get_artifact_store().temp_path(".png")
+        arguments: dict[str, Any] = {'format': 'png', 'filePath': str(target)}
+        if uid:
+            arguments['uid'] = uid
+
+        with get_chrome_mcp_sessions().lease(session_id) as client:
+            result = client.call_tool("take_screenshot", arguments)
+
+        # The base64 payload is never echoed back through MCP
+        images = result.pop('images')
+        if target.stat().st_size:
+            screenshot = store_image_file(target, kind="cdp-screenshot")
+        elif images and isinstance(images[0].get('data'), str):
+            target.unlink()
+            screenshot = store_base64_image(images[0]['data'], kind="cdp-screenshot")
+        else:
+            raise RuntimeError(f"take_screenshot returned no image: {result['text']}")
+        # Release the base64 text before rendering variants
+        del images
+
+        result['screenshotPath'] = screenshot['path']
+        response = {
             'status': 'ok',
-            'selector': selector,
+            'uid': uid,
+            'sessionId': session_id or DEFAULT_SESSION,
+            'screenshot': screenshot,
             'result': result
         }
+        try:
+            response['variants'] = image_variants(screenshot, "cdp-screenshot", thumbnail_width, formats)
+        except (RuntimeError, ValueError, OSError) as e:
+            response['variantsError'] = str(e)
+        return response
 
     except Exception as e:
+        if target is not None:
+            target.unlink(missing_ok=True)
         logger.error(f"CDP screenshot failed: {e}")
         return {
             'status': 'error',
             'error': str(e)
         }
 
-def cdp_trace(action: Literal["start", "stop"]) -> dict[str, Any]:
-    """Start or stop performance tracing via Chrome DevTools MCP."""
+def cdp_trace(action: Literal["start", "stop"], session_id: str | None = None) -> dict[str, Any]:
+    """
+    Start or stop performance tracing via Chrome DevTools MCP.
+
+    On stop, the server writes the raw trace to a scratch file in the artifact
+    store; it is kept gzip-compressed and summarized (see _store_trace).
+    """
+    target = None
     try:
         if action not in ["start", "stop"]:
             raise ValueError("Action must be 'start' or 'stop'")
 
-        method = "trace_start" if action == "start" else "trace_stop"
-        result = _chrome_client._send_request(method)
+        with get_chrome_mcp_sessions().lease(session_id) as client:
+            if action == "start":
+                result = client.call_tool("performance_start_trace", {"reload": False, "autoStop": False})
+            else:
+                target = get_artifact_store().temp_path(".json.gz")
+                result = client.call_tool("performance_stop_trace", {"filePath": str(target)})
 
-        return {
+        response = {
             'status': 'ok',
             'action': action,
+            'sessionId': session_id or DEFAULT_SESSION,
             'result': result
         }
+        if target is not None:
+            response.update(_store_trace(target))
+        return response
 
     except Exception as e:
+        if target is not None:
+            target.unlink(missing_ok=True)
         logger.error(f"CDP trace {action} failed: {e}")
         return {
             'status': 'error',
             'error': str(e)
         }
 
-def cdp_emulate(profile: Literal["mobile", "desktop", "custom"]) -> dict[str, Any]:
-    """Emulate device profile via Chrome DevTools MCP."""
+def _store_trace(source: Path) -> dict[str, Any]:
+    """
+    Move a trace file written by performance_stop_trace into the artifact store and summarize it.
+
+    The raw trace is stored gzip-compressed (compressed here if the server
+    wrote plain JSON) and streamed through the analyzer. The summary is stored
+    next to the trace (manifest entry kind "cdp-trace-summary" referencing the
+    trace id).
+    """
+    store = get_artifact_store()
+    if not source.stat().st_size:
+        source.unlink()
+        return {'analysisError': 'performance_stop_trace did not write a trace file'}
+
+    with open(source, 'rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+    if not compressed:
+        tmp = store.temp_path(".json.gz")
+        with open(source, 'rb') as src, gzip.open(tmp, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        source.unlink()
+        source = tmp
+
+    trace_ref = store.put_file(source, kind="cdp-trace", ext="json.gz")
+    response: dict[str, Any] = {'tracePath': trace_ref['path']}
+    try:
+        summary = analyze_trace(trace_ref['path'])
+    except (OSError, ValueError) as e:
+        logger.warning(f"Trace analysis failed: {e}")
+        response['analysisError'] = str(e)
+        return response
+
+    summary_ref = store.put_json(summary, kind="cdp-trace-summary", meta={'trace': trace_ref['id']})
+    response['summary'] = summary
+    response['summaryPath'] = summary_ref['path']
+    return response
+
+def cdp_emulate(
+    profile: Literal["mobile", "desktop", "custom"],
+    session_id: str | None = None,
+    width: int | None = None,
+    height: int | None = None
+) -> dict[str, Any]:
+    """
+    Emulate device profile via Chrome DevTools MCP.
+
+    Resizes the page viewport with the server's resize_page tool; "custom"
+    uses the given width and height.
+    """
     try:
         if profile not in ["mobile", "desktop", "custom"]:
             raise ValueError("Profile must be 'mobile', 'desktop', or 'custom'")
 
-        # Map profiles to device settings
+        # Map profiles to viewport sizes
         device_settings = {
-            "mobile": {"width": 375, "height": 667, "deviceScaleFactor": 2, "mobile": True},
-            "desktop": {"width": 1280, "height": 800, "deviceScaleFactor": 1, "mobile": False},
-            "custom": {}  # Let the MCP handle custom settings
+            "mobile": {"width": 375, "height": 667},
+            "desktop": {"width": 1280, "height": 800},
+            "custom": {"width": width, "height": height}
         }
 
-        params = device_settings.get(profile, {})
-        result = _chrome_client._send_request("emulate_device", params)
+        params = device_settings[profile]
+        if not params["width"] or not params["height"]:
+            raise ValueError("The custom profile needs width and height")
+        with get_chrome_mcp_sessions().lease(session_id) as client:
+            result = client.call_tool("resize_page", params)
 
         return {
             'status': 'ok',
             'profile': profile,
+            'sessionId': session_id or DEFAULT_SESSION,
             'result': result
         }
 
@@ -240,4 +805,10 @@ def cdp_emulate(profile: Literal["mobile", "desktop", "custom"]) -> dict[str, An
         return {
             'status': 'error',
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+def cdp_close_session(session_id: str) -> dict[str, Any]:
+    """Close a Chrome DevTools MCP session and its browser."""
+    if get_chrome_mcp_sessions().close_session(session_id):
+        return {'status': 'ok', 'sessionId': session_id, 'closed': True}
+    return {'status': 'error', 'error': f"Unknown session: {session_id}"}
@@ -0,0 +1,265 @@
+"""
+Incremental audits: skip re-auditing pages whose content has not changed.
+
+Before running a tool, the page is fingerprinted with conditional requests
+(If-None-Match / If-Modified-Since) for the main document and its critical
+subresources (stylesheets and blocking scripts). If the fingerprint matches
+the one recorded with the last successful result, that result is returned
+with a staleness marker instead of launching a browser.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin
+
+import httpx
+
+from .result_cache import DEFAULT_CACHE_DIR, cache_key
+from .url_check import normalize_url, probe_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = DEFAULT_CACHE_DIR / "incremental"
+
+# Subresources beyond this many are not fingerprinted
+MAX_SUBRESOURCES = 20
+
+
+class _CriticalResourceParser(HTMLParser):
+    """Collect render-blocking stylesheets and scripts from a document."""
+
+    def __init__(self, page_url: str):
+        super().__init__()
+        self.base = page_url
+        self.resources: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        values = dict(attrs)
+        if tag == 'base' and values.get('href'):
+            self.base = urljoin(self.base, values['href'])
+        elif tag == 'link' and values.get('href') and 'stylesheet' in (values.get('rel') or '').lower():
+            self.resources.append(urljoin(self.base, values['href']))
+        elif tag == 'script' and values.get('src') and 'async' not in values and 'defer' not in values:
+            if values.get('type', 'text/javascript') in ('text/javascript', 'module', 'application/javascript'):
+                self.resources.append(urljoin(self.base, values['src']))
+
+
+def _conditional_headers(previous: dict[str, Any] | None) -> dict[str, str]:
+    """Validators from a previous fetch as conditional request headers."""
+    headers = {}
+    if previous and previous.get('etag'):
+        headers['If-None-Match'] = previous['etag']
+    if previous and previous.get('lastModified'):
+        headers['If-Modified-Since'] = previous['lastModified']
+    return headers
+
+
+def _fetch_state(url: str, previous: dict[str, Any] | None, timeout: float) -> tuple[dict[str, Any], bytes | None]:
+    """
+    Fetch one resource conditionally.
+
+    Returns its state (validators and body digest) and the body, which is
+    None when the server answered 304 Not Modified.
+    """
+    response = probe_url(url, method="GET", headers=_conditional_headers(previous), timeout=timeout)
+
+    if response.status_code == 304 and previous:
+        return {**previous, 'notModified': True}, None
+
+    response.raise_for_status()
+    return {
+        'etag': response.headers.get('ETag'),
+        'lastModified': response.headers.get('Last-Modified'),
+        'digest': hashlib.sha256(response.content).hexdigest(),
+        'contentType': response.headers.get('Content-Type', '')
+    }, response.content
+
+
+def fingerprint_page(
+    url: str,
+    previous: dict[str, Any] | None = None,
+    timeout: float = 10
+) -> dict[str, Any]:
+    """
+    Fingerprint a page and its critical subresources.
+
+    Args:
+        url: Page URL
+        previous: Fingerprint from the last audit, used for conditional requests
+        timeout: Seconds per request
+
+    Returns:
+        Dict with the document state, subresource states and a combined digest
+    """
+    previous = previous or {}
+    document, body = _fetch_state(url, previous.get('document'), timeout)
+
+    if body is None:
+        # 304: the document and its list of subresources are unchanged
+        resource_urls = list(previous.get('subresources', {}))
+    elif 'html' in document['contentType']:
+        parser = _CriticalResourceParser(url)
+        parser.feed(body.decode('utf-8', errors='replace'))
+        resource_urls = list(dict.fromkeys(parser.resources))[:MAX_SUBRESOURCES]
+    else:
+        resource_urls = []
+
+    subresources: dict[str, Any] = {}
+    for resource_url in resource_urls:
+        try:
+            state, _ = _fetch_state(resource_url, previous.get('subresources', {}).get(resource_url), timeout)
+        except httpx.HTTPError as e:
+            state = {'error': str(e), 'digest': None}
+        subresources[resource_url] = state
+
+    combined = hashlib.sha256(document['digest'].encode())
+    for resource_url in sorted(subresources):
+        combined.update(f"{resource_url}={subresources[resource_url].get('digest')}".encode())
+
+    return {
+        'document': document,
+        'subresources': subresources,
+        'digest': combined.hexdigest()
+    }
+
+
+class ChangeDetector:
+    """Stores the last result and page fingerprint for each tool call."""
+
+    def __init__(self, directory: Path | None = None, max_age: float | None = None):
+        self.directory = directory or Path(os.getenv("INCREMENTAL_DIR", str(DEFAULT_SNAPSHOT_DIR)))
+        # Re-audit unchanged pages anyway once their result is this old
+        self.max_age = max_age if max_age is not None else float(os.getenv("INCREMENTAL_MAX_AGE_HOURS", "168")) * 3600
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads(self._path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key: str, url: str, fingerprint: dict[str, Any], result: dict[str, Any]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {'url': url, 'auditedAt': time.time(), 'fingerprint': fingerprint, 'result': result}
+        tmp_path = self._path(key).with_suffix('.tmp')
+        with self._lock:
+            tmp_path.write_text(json.dumps(entry, default=str), encoding='utf-8')
+            os.replace(tmp_path, self._path(key))
+
+    def run(
+        self,
+        name: str,
+        func: Callable[..., dict[str, Any]],
+        args: tuple,
+        kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Run a tool unless the page is unchanged since its last successful run.
+
+        Results gain an 'incremental' entry; reused results also get 'stale': True.
+        """
+        url = args[0] if args else kwargs.get('url')
+        if not isinstance(url, str) or not normalize_url(url):
+            return func(*args, **kwargs)
+
+        try:
+            key = cache_key(name, func, args, kwargs)
+        except TypeError:
+            # Let the tool report bad arguments itself
+            return func(*args, **kwargs)
+
+        previous = self.load(key)
+        try:
+            fingerprint = fingerprint_page(url, previous['fingerprint'] if previous else None)
+        except httpx.HTTPError as e:
+            logger.info(f"{name}: could not fingerprint {url} ({e}), running full audit")
+            fingerprint = None
+
+        if previous and fingerprint:
+            age = time.time() - previous['auditedAt']
+            if fingerprint['digest'] == previous['fingerprint']['digest'] and age <= self.max_age:
+                logger.info(f"{name}: {url} unchanged since last audit, reusing result")
+                result = previous['result']
+                result['stale'] = True
+                result['incremental'] = {
+                    'changed': False,
+                    'auditedAt': datetime.fromtimestamp(previous['auditedAt']).isoformat(),
+                    'ageSeconds': round(age),
+                    'fingerprint': fingerprint['digest'][:12]
+                }
+                return result
+
+        if not previous:
+            reason = 'first audit'
+        elif not fingerprint:
+            reason = 'fingerprint unavailable'
+        elif fingerprint['digest'] != previous['fingerprint']['digest']:
+            reason = 'content changed'
+        else:
+            reason = 'previous result expired'
+
+        result = func(*args, **kwargs)
+        if isinstance(result, dict):
+            result['incremental'] = {'changed': True, 'reason': reason}
+            if fingerprint and result.get('status') == 'ok':
+                self.save(key, url, fingerprint, result)
+        return result
+
+
+def incremental_tool(
+    name: str,
+    func: Callable[..., dict[str, Any]],
+    detector: "ChangeDetector | None" = None
+) -> Callable[..., dict[str, Any]]:
+    """
+    Add an ``incremental`` parameter to a tool.
+
+    With incremental=True the tool only re-runs when the page content changed
+    since its last successful run; otherwise the previous result is returned.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, incremental: bool = False, **kwargs) -> dict[str, Any]:
+        if not incremental:
+            return func(*args, **kwargs)
+        return (detector or get_change_detector()).run(name, func, args, kwargs)
+
+    incremental_param = inspect.Parameter(
+        'incremental', inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool
+    )
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), incremental_param]
+    )
+    wrapper.__annotations__ = {**func.__annotations__, 'incremental': bool}
+    wrapper.__doc__ = (func.__doc__ or '').rstrip() + (
+        "\n\n    Pass incremental=True to reuse the last result when the page is unchanged.\n"
+    )
+    return wrapper
+
+
+_detector: ChangeDetector | None = None
+_detector_lock = threading.Lock()
+
+
+def get_change_detector() -> ChangeDetector:
+    """Get the process-wide change detector."""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = ChangeDetector()
+        return _detector
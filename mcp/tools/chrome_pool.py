@@ -0,0 +1,385 @@
+"""
+Warm headless Chrome instances for Lighthouse.
+
+Lighthouse normally launches (and kills) its own Chrome on every run. The
+pool keeps a few headless Chromes running on remote-debugging ports and
+hands one port at a time to a Lighthouse run (``--port``). Runs stay
+isolated although the profile is shared: the Node worker audits in a new
+browser context per run, and CLI runs keep Lighthouse's storage reset, which
+clears the origin's storage and the browser cache first. Leftover tabs are
+closed afterwards and each Chrome is restarted with a new profile after a
+number of runs. The pool size also caps
+how many Lighthouse Chromes run at once, including ones Lighthouse launches
+itself when the pool cannot start a browser.
+"""
+
+import glob
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .http_client import get_http_client
+from .orchestrator import job_time_left
+
+logger = logging.getLogger(__name__)
+
+# Chrome flags used for every Lighthouse run, warm or launched by the CLI
+CHROME_FLAGS = [
+    "--headless",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--disable-features=Translate,VizDisplayCompositor",
+    "--safebrowsing-disable-download-protection",
+    "--safebrowsing-disable-extension-blacklist",
+    "--ignore-certificate-errors",
+    "--allow-insecure-localhost",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-ipc-flooding-protection",
+    "--disable-hang-monitor",
+    "--disable-prompt-on-repost",
+    "--disable-domain-reliability",
+    "--disable-component-extensions-with-background-pages"
+]
+
+CHROME_CANDIDATES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
+]
+
+PLAYWRIGHT_CHROME_GLOBS = [
+    "~/.cache/ms-playwright/chromium-*/chrome-linux*/chrome",
+    "~/Library/Caches/ms-playwright/chromium-*/chrome-mac*/Chromium.app/Contents/MacOS/Chromium",
+    "~/AppData/Local/ms-playwright/chromium-*/chrome-win*/chrome.exe"
+]
+
+# Wait this long before trying to start Chrome again after a failed launch
+LAUNCH_RETRY_DELAY = 60.0
+
+# Chromes started for one lease before giving up on the pool (they keep exiting)
+LAUNCH_ATTEMPTS = 2
+
+
+def find_chrome() -> str | None:
+    """Locate a Chrome/Chromium binary: CHROME_PATH, PATH, then Playwright's download."""
+    configured = os.getenv("CHROME_PATH")
+    if configured and Path(configured).exists():
+        return configured
+
+    for candidate in CHROME_CANDIDATES:
+        if Path(candidate).is_absolute():
+            if Path(candidate).exists():
+                return candidate
+        elif shutil.which(candidate):
+            return shutil.which(candidate)
+
+    for pattern in PLAYWRIGHT_CHROME_GLOBS:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if matches:
+            return matches[-1]
+    return None
+
+
+@dataclass
+class ChromePoolConfig:
+    """Lighthouse Chrome pool limits, read from the environment by default."""
+    enabled: bool = True
+    size: int = 2
+    max_uses: int = 25
+    lease_timeout: float = 300.0
+    startup_timeout: float = 20.0
+
+    @classmethod
+    def from_env(cls) -> "ChromePoolConfig":
+        """Build a config from LIGHTHOUSE_CHROME_* environment variables."""
+        return cls(
+            enabled=os.getenv("LIGHTHOUSE_CHROME_POOL_ENABLED", "true").lower() == "true",
+            size=max(1, int(os.getenv("LIGHTHOUSE_CHROME_POOL_SIZE", "2"))),
+            max_uses=int(os.getenv("LIGHTHOUSE_CHROME_MAX_USES", "25")),
+            lease_timeout=float(os.getenv("LIGHTHOUSE_CHROME_LEASE_TIMEOUT", "300"))
+        )
+
+
+@dataclass
+class WarmChrome:
+    """A running headless Chrome with its own profile directory."""
+    process: subprocess.Popen
+    port: int
+    profile_dir: str
+    started_at: float = field(default_factory=time.time)
+    uses: int = 0
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def is_reachable(self, timeout: float = 2.0) -> bool:
+        """Check that the DevTools HTTP endpoint answers."""
+        try:
+            response = get_http_client().get(f"http://127.0.0.1:{self.port}/json/version", timeout=timeout)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def close_extra_targets(self):
+        """Close tabs left behind by a run, keeping one blank page open."""
+        try:
+            client = get_http_client()
+            targets = client.get(f"http://127.0.0.1:{self.port}/json/list", timeout=2.0).json()
+            pages = [target for target in targets if target.get('type') == 'page']
+            for target in pages[1:]:
+                client.get(f"http://127.0.0.1:{self.port}/json/close/{target['id']}", timeout=2.0)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.debug(f"Could not clean up Chrome targets on port {self.port}: {e}")
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            'pid': self.process.pid,
+            'port': self.port,
+            'uses': self.uses,
+            'uptimeSeconds': round(time.time() - self.started_at, 1)
+        }
+
+
+class ChromePool:
+    """Hands out warm Chrome debugging ports, one Lighthouse run per Chrome."""
+
+    def __init__(self, config: ChromePoolConfig | None = None):
+        self.config = config or ChromePoolConfig.from_env()
+        self._idle: list[WarmChrome] = []
+        self._busy: list[WarmChrome] = []
+        self._closed = False
+        self._launch_failed_at: float | None = None
+        self._last_error: str | None = None
+        # Caps concurrent Lighthouse Chromes, pooled or launched by the CLI
+        self._slots = threading.BoundedSemaphore(self.config.size)
+        self._lock = threading.Lock()
+        self._stats = {'leases': 0, 'launched': 0, 'recycled': 0, 'fallbacks': 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether warm Chromes may currently be served."""
+        if not self.config.enabled or self._closed:
+            return False
+        if self._launch_failed_at is not None:
+            return time.monotonic() - self._launch_failed_at >= LAUNCH_RETRY_DELAY
+        return True
+
+    @contextmanager
+    def lease(self) -> Iterator[int | None]:
+        """
+        Reserve a Chrome slot for one Lighthouse run.
+
+        Yields the debugging port of a warm Chrome, or None when the pool is
+        disabled or cannot start Chrome (Lighthouse then launches its own,
+        still within the concurrency cap). A Chrome whose run raised (failed or
+        timed out mid-audit) is replaced rather than reused.
+        """
+        if not self._slots.acquire(timeout=job_time_left(self.config.lease_timeout)):
+            raise TimeoutError(f"All {self.config.size} Lighthouse Chrome slots are busy")
+
+        chrome = None
+        reuse = False
+        try:
+            chrome = self._checkout()
+            yield chrome.port if chrome else None
+            reuse = True
+        finally:
+            if chrome:
+                self._checkin(chrome, reuse)
+            self._slots.release()
+
+    def warm(self) -> None:
+        """Start Chromes up to the pool size."""
+        while self.enabled:
+            with self._lock:
+                if len(self._idle) + len(self._busy) >= self.config.size:
+                    return
+            chrome = self._start_chrome()
+            if chrome is None:
+                return
+            with self._lock:
+                self._idle.append(chrome)
+
+    def health_check(self) -> dict[str, Any]:
+        """Drop dead Chromes and report pool state."""
+        with self._lock:
+            idle = list(self._idle)
+
+        for chrome in idle:
+            if not chrome.is_alive() or not chrome.is_reachable():
+                logger.warning(f"Warm Chrome on port {chrome.port} is unhealthy, restarting it on next use")
+                self._discard(chrome)
+
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'size': self.config.size,
+                'maxUses': self.config.max_uses,
+                'chromeBinary': find_chrome(),
+                'idle': [chrome.describe() for chrome in self._idle],
+                'busy': [chrome.describe() for chrome in self._busy],
+                'stats': dict(self._stats),
+                'lastError': self._last_error
+            }
+
+    def shutdown(self) -> None:
+        """Stop every warm Chrome."""
+        with self._lock:
+            self._closed = True
+            chromes = self._idle + self._busy
+            self._idle, self._busy = [], []
+        for chrome in chromes:
+            _stop_chrome(chrome)
+
+    def _checkout(self) -> WarmChrome | None:
+        if not self.enabled:
+            with self._lock:
+                self._stats['fallbacks'] += 1
+            return None
+
+        launches = 0
+        while True:
+            with self._lock:
+                chrome = self._idle.pop() if self._idle else None
+            if chrome is None:
+                if launches >= LAUNCH_ATTEMPTS:
+                    logger.warning(f"Warm Chrome exited right after {launches} launches, Lighthouse will launch its own")
+                    self._launch_failed_at = time.monotonic()
+                    self._last_error = "Chrome exited right after launch"
+                else:
+                    launches += 1
+                    chrome = self._start_chrome()
+                if chrome is None:
+                    with self._lock:
+                        self._stats['fallbacks'] += 1
+                    return None
+            if chrome.is_alive():
+                break
+            self._discard(chrome)
+
+        with self._lock:
+            chrome.uses += 1
+            self._busy.append(chrome)
+            self._stats['leases'] += 1
+        return chrome
+
+    def _checkin(self, chrome: WarmChrome, reuse: bool = True) -> None:
+        with self._lock:
+            if chrome in self._busy:
+                self._busy.remove(chrome)
+
+        if not reuse or self._closed or not chrome.is_alive() or chrome.uses >= self.config.max_uses:
+            self._discard(chrome)
+            return
+
+        chrome.close_extra_targets()
+        with self._lock:
+            self._idle.append(chrome)
+
+    def _discard(self, chrome: WarmChrome) -> None:
+        with self._lock:
+            if chrome in self._idle:
+                self._idle.remove(chrome)
+            self._stats['recycled'] += 1
+        _stop_chrome(chrome)
+
+    def _start_chrome(self) -> WarmChrome | None:
+        try:
+            chrome = _launch_chrome(self.config.startup_timeout)
+            with self._lock:
+                self._stats['launched'] += 1
+            self._launch_failed_at = None
+            self._last_error = None
+            logger.info(f"Started warm Chrome {chrome.process.pid} on port {chrome.port}")
+            return chrome
+        except Exception as e:
+            logger.warning(f"Could not start warm Chrome, Lighthouse will launch its own: {e}")
+            self._launch_failed_at = time.monotonic()
+            self._last_error = str(e)
+            return None
+
+
+def _launch_chrome(startup_timeout: float) -> WarmChrome:
+    """Start headless Chrome on a free debugging port with a fresh profile."""
+    binary = find_chrome()
+    if not binary:
+        raise FileNotFoundError("Chrome not found; set CHROME_PATH")
+
+    profile_dir = tempfile.mkdtemp(prefix="lighthouse-chrome-")
+    process = subprocess.Popen(
+        [
+            binary,
+            *CHROME_FLAGS,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "about:blank"
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    # Chrome writes the port it picked to DevToolsActivePort in the profile
+    port_file = Path(profile_dir) / "DevToolsActivePort"
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            port = int(port_file.read_text().splitlines()[0])
+            return WarmChrome(process=process, port=port, profile_dir=profile_dir)
+        except (OSError, ValueError, IndexError):
+            time.sleep(0.1)
+
+    process.kill()
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    raise RuntimeError(f"Chrome did not open a debugging port within {startup_timeout:.0f}s")
+
+
+def _stop_chrome(chrome: WarmChrome) -> None:
+    """Terminate Chrome and remove its profile."""
+    if chrome.is_alive():
+        chrome.process.terminate()
+        try:
+            chrome.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            chrome.process.kill()
+    shutil.rmtree(chrome.profile_dir, ignore_errors=True)
+
+
+_pool: ChromePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_chrome_pool() -> ChromePool:
+    """Get the process-wide Lighthouse Chrome pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ChromePool()
+        return _pool
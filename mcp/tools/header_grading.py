@@ -0,0 +1,353 @@
+"""
+Security header grading.
+
+Parses the policies behind the headers security_headers checks for, rather
+than only testing for their presence: CSP directives and source lists, HSTS
+max-age and preload eligibility, Set-Cookie flags, CORS, and the
+cross-origin isolation headers (COOP/COEP/CORP).
+
+Parsers and per-header reports are memoized by header value: a site crawl
+sees the same CSP and HSTS values on thousands of pages. Cached reports are
+shared between calls and must not be mutated.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any
+from urllib.parse import urlsplit
+
+# Points deducted per finding
+SEVERITY_WEIGHTS = {'high': 15, 'medium': 7, 'low': 3, 'info': 0}
+
+GRADE_THRESHOLDS = ((90, 'A'), (80, 'B'), (70, 'C'), (60, 'D'))
+
+# HSTS max-age below six months is too short to matter; preload needs a year
+HSTS_MIN_MAX_AGE = 15768000
+HSTS_PRELOAD_MAX_AGE = 31536000
+
+# Sources that let any host (or inline data) serve scripts
+UNSAFE_SCRIPT_SOURCES = {'*', 'http:', 'https:', 'data:', 'blob:'}
+
+SESSION_COOKIE_PATTERN = re.compile(r'sess|sid|token|auth|login', re.IGNORECASE)
+
+# Distinct header values kept per memoized parser
+PARSE_CACHE_SIZE = 1024
+
+
+def _finding(header: str, severity: str, finding_id: str, message: str) -> dict[str, str]:
+    return {'header': header, 'severity': severity, 'id': finding_id, 'message': message}
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_csp(value: str) -> tuple[dict[str, tuple[str, ...]], ...]:
+    """
+    Parse a Content-Security-Policy value into one directive map per policy.
+
+    Several headers arrive comma-joined and each is enforced on its own. Within
+    a policy, directive names are case-insensitive and repeats are ignored.
+    """
+    policies = []
+    for policy_value in value.split(','):
+        directives: dict[str, tuple[str, ...]] = {}
+        for directive in policy_value.split(';'):
+            tokens = directive.split()
+            if tokens and tokens[0].lower() not in directives:
+                directives[tokens[0].lower()] = tuple(tokens[1:])
+        if directives:
+            policies.append(directives)
+    return tuple(policies)
+
+
+def _csp_policy_findings(directives: dict[str, tuple[str, ...]]) -> dict[str, tuple[str, str]]:
+    """Finding id -> (severity, message) for one policy."""
+    findings = {}
+    default_src = directives.get('default-src')
+    script_src = directives.get('script-src', default_src)
+
+    if script_src is None:
+        findings['csp-no-script-src'] = ('high', 'Neither script-src nor default-src restricts scripts')
+    else:
+        sources = {source.lower() for source in script_src}
+        has_nonce_or_hash = any(
+            source.startswith(("'nonce-", "'sha256-", "'sha384-", "'sha512-")) for source in sources
+        )
+        if "'unsafe-inline'" in sources and not has_nonce_or_hash and "'strict-dynamic'" not in sources:
+            findings['csp-unsafe-inline'] = ('high', "script-src allows 'unsafe-inline' without nonces or hashes")
+        if "'unsafe-eval'" in sources:
+            findings['csp-unsafe-eval'] = ('medium', "script-src allows 'unsafe-eval'")
+        wildcards = sorted(sources & UNSAFE_SCRIPT_SOURCES)
+        if wildcards and "'strict-dynamic'" not in sources:
+            findings['csp-wildcard'] = ('high', f"script-src allows any host: {' '.join(wildcards)}")
+
+    object_src = directives.get('object-src', default_src)
+    if object_src is None:
+        findings['csp-no-object-src'] = ('medium', "object-src is missing; set object-src 'none'")
+    elif tuple(source.lower() for source in object_src) != ("'none'",):
+        findings['csp-object-src'] = ('low', "object-src is not 'none'")
+
+    if 'base-uri' not in directives:
+        findings['csp-no-base-uri'] = ('medium', "base-uri is missing (it does not fall back to default-src)")
+
+    return findings
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def csp_report(value: str, report_only: bool = False) -> dict[str, Any]:
+    """
+    Parsed CSP and its weaknesses.
+
+    A weakness is reported only when every enforced policy has it, since all
+    policies must allow a resource for it to load.
+    """
+    header = 'content-security-policy-report-only' if report_only else 'content-security-policy'
+    policies = parse_csp(value)
+    per_policy = [_csp_policy_findings(directives) for directives in policies]
+
+    findings = []
+    if per_policy:
+        common = set(per_policy[0]).intersection(*per_policy[1:])
+        findings = [
+            _finding(header, severity, finding_id, message)
+            for finding_id, (severity, message) in per_policy[0].items()
+            if finding_id in common
+        ]
+    if report_only:
+        findings.insert(0, _finding(header, 'medium', 'csp-report-only', 'CSP is report-only and not enforced'))
+
+    return {
+        'policies': [{name: list(sources) for name, sources in directives.items()} for directives in policies],
+        'reportOnly': report_only,
+        'findings': findings
+    }
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_hsts(value: str) -> dict[str, Any]:
+    """Parse Strict-Transport-Security into max-age, includeSubDomains and preload."""
+    parsed = {'maxAge': None, 'includeSubDomains': False, 'preload': False}
+    for directive in value.split(';'):
+        name, _, argument = directive.strip().partition('=')
+        name = name.strip().lower()
+        if name == 'max-age' and parsed['maxAge'] is None:
+            argument = argument.strip().strip('"')
+            parsed['maxAge'] = int(argument) if argument.isdigit() else None
+        elif name == 'includesubdomains':
+            parsed['includeSubDomains'] = True
+        elif name == 'preload':
+            parsed['preload'] = True
+    return parsed
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def hsts_report(value: str) -> dict[str, Any]:
+    """Parsed HSTS, preload eligibility and weaknesses."""
+    header = 'strict-transport-security'
+    parsed = parse_hsts(value)
+    max_age = parsed['maxAge']
+    preload_ready = (
+        parsed['preload'] and parsed['includeSubDomains'] and (max_age or 0) >= HSTS_PRELOAD_MAX_AGE
+    )
+
+    findings = []
+    if max_age is None:
+        findings.append(_finding(header, 'high', 'hsts-invalid', 'max-age is missing or invalid; the header is ignored'))
+    elif max_age == 0:
+        findings.append(_finding(header, 'high', 'hsts-disabled', 'max-age=0 removes HSTS protection'))
+    elif max_age < HSTS_MIN_MAX_AGE:
+        findings.append(_finding(header, 'medium', 'hsts-short', f'max-age={max_age} is under six months'))
+    if not parsed['includeSubDomains']:
+        findings.append(_finding(header, 'low', 'hsts-no-subdomains', 'includeSubDomains is not set'))
+    if parsed['preload'] and not preload_ready:
+        findings.append(_finding(
+            header, 'low', 'hsts-preload-ineligible',
+            'preload requires max-age of at least one year and includeSubDomains'
+        ))
+
+    return {**parsed, 'preloadReady': preload_ready, 'findings': findings}
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_set_cookie(line: str) -> dict[str, Any]:
+    """Parse one Set-Cookie line into its name and attributes (names lowercased)."""
+    pair, *attributes = line.split(';')
+    name = pair.partition('=')[0].strip()
+    parsed: dict[str, Any] = {'name': name, 'secure': False, 'httpOnly': False, 'sameSite': None,
+                              'domain': None, 'path': None}
+    for attribute in attributes:
+        key, _, value = attribute.strip().partition('=')
+        key = key.strip().lower()
+        if key == 'secure':
+            parsed['secure'] = True
+        elif key == 'httponly':
+            parsed['httpOnly'] = True
+        elif key == 'samesite':
+            parsed['sameSite'] = value.strip().capitalize()
+        elif key in ('domain', 'path'):
+            parsed[key] = value.strip()
+    return parsed
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def cookie_report(line: str, https: bool = True) -> dict[str, Any]:
+    """Parsed cookie and flag weaknesses."""
+    cookie = parse_set_cookie(line)
+    name = cookie['name']
+    findings = []
+
+    if https and not cookie['secure']:
+        findings.append(_finding('set-cookie', 'medium', 'cookie-no-secure', f'{name} is missing Secure'))
+    if not cookie['httpOnly']:
+        severity = 'medium' if SESSION_COOKIE_PATTERN.search(name) else 'low'
+        findings.append(_finding('set-cookie', severity, 'cookie-no-httponly', f'{name} is missing HttpOnly'))
+    if cookie['sameSite'] is None:
+        findings.append(_finding('set-cookie', 'low', 'cookie-no-samesite', f'{name} has no SameSite attribute'))
+    elif cookie['sameSite'] == 'None' and not cookie['secure']:
+        findings.append(_finding(
+            'set-cookie', 'high', 'cookie-samesite-none-insecure',
+            f'{name} has SameSite=None without Secure and is rejected by browsers'
+        ))
+    if name.startswith('__Secure-') and not cookie['secure']:
+        findings.append(_finding('set-cookie', 'high', 'cookie-prefix', f'{name} uses __Secure- without Secure'))
+    if name.startswith('__Host-') and (not cookie['secure'] or cookie['domain'] or cookie['path'] != '/'):
+        findings.append(_finding(
+            'set-cookie', 'high', 'cookie-prefix', f'{name} uses __Host- without Secure, Path=/ and no Domain'
+        ))
+
+    return {**cookie, 'findings': findings}
+
+
+def _cors_report(headers: dict[str, str]) -> dict[str, Any]:
+    allow_origin = headers.get('access-control-allow-origin')
+    allow_credentials = headers.get('access-control-allow-credentials', '').strip().lower() == 'true'
+    header = 'access-control-allow-origin'
+    findings = []
+
+    if allow_origin == '*' and allow_credentials:
+        findings.append(_finding(header, 'high', 'cors-wildcard-credentials',
+                                 'Wildcard origin combined with Allow-Credentials: true'))
+    elif allow_origin == '*':
+        findings.append(_finding(header, 'info', 'cors-wildcard', 'Any origin may read this response'))
+    elif allow_origin and allow_origin.strip().lower() == 'null':
+        findings.append(_finding(header, 'medium', 'cors-null-origin',
+                                 'Allowing the null origin lets sandboxed documents read this response'))
+
+    return {'allowOrigin': allow_origin, 'allowCredentials': allow_credentials, 'findings': findings}
+
+
+def _isolation_report(headers: dict[str, str]) -> dict[str, Any]:
+    coop = (headers.get('cross-origin-opener-policy') or '').split(';')[0].strip().lower() or None
+    coep = (headers.get('cross-origin-embedder-policy') or '').split(';')[0].strip().lower() or None
+    corp = (headers.get('cross-origin-resource-policy') or '').strip().lower() or None
+    findings = []
+
+    if coop in (None, 'unsafe-none'):
+        findings.append(_finding('cross-origin-opener-policy', 'low', 'coop-missing',
+                                 'Cross-Origin-Opener-Policy does not isolate the browsing context'))
+    if corp is None:
+        findings.append(_finding('cross-origin-resource-policy', 'info', 'corp-missing',
+                                 'Cross-Origin-Resource-Policy is not set'))
+
+    return {
+        'coop': coop,
+        'coep': coep,
+        'corp': corp,
+        'crossOriginIsolated': coop == 'same-origin' and coep in ('require-corp', 'credentialless'),
+        'findings': findings
+    }
+
+
+def _other_findings(headers: dict[str, str], csp: dict[str, Any] | None) -> list[dict[str, str]]:
+    findings = []
+
+    frame_ancestors = csp and not csp['reportOnly'] and any(
+        'frame-ancestors' in policy for policy in csp['policies']
+    )
+    if not headers.get('x-frame-options') and not frame_ancestors:
+        findings.append(_finding('x-frame-options', 'medium', 'framing-unprotected',
+                                 'Neither X-Frame-Options nor CSP frame-ancestors prevents framing'))
+
+    if (headers.get('x-content-type-options') or '').strip().lower() != 'nosniff':
+        findings.append(_finding('x-content-type-options', 'medium', 'xcto-missing',
+                                 'X-Content-Type-Options is not nosniff'))
+
+    referrer = (headers.get('referrer-policy') or '').split(',')[-1].strip().lower()
+    if not referrer:
+        findings.append(_finding('referrer-policy', 'low', 'referrer-missing', 'Referrer-Policy is not set'))
+    elif referrer in ('unsafe-url', 'no-referrer-when-downgrade'):
+        findings.append(_finding('referrer-policy', 'medium' if referrer == 'unsafe-url' else 'low',
+                                 'referrer-leaky', f'Referrer-Policy {referrer} leaks full URLs'))
+
+    if not (headers.get('permissions-policy') or headers.get('feature-policy')):
+        findings.append(_finding('permissions-policy', 'low', 'permissions-missing',
+                                 'Permissions-Policy is not set'))
+
+    for name in ('server', 'x-powered-by'):
+        if re.search(r'\d', headers.get(name) or ''):
+            findings.append(_finding(name, 'info', 'version-disclosure', f'{name} discloses a version'))
+
+    return findings
+
+
+def grade_headers(headers: dict[str, str], url: str) -> dict[str, Any]:
+    """
+    Grade a response's security headers.
+
+    Args:
+        headers: Response headers with lowercase names; Set-Cookie lines joined by newlines
+        url: URL the headers were served for (HSTS and Secure cookies only apply to https)
+
+    Returns:
+        Dict with a 0-100 score, a letter grade, all findings and the parsed
+        csp, hsts, cookies, cors and isolation sections
+    """
+    https = urlsplit(url).scheme == 'https'
+    findings = []
+
+    csp = None
+    if headers.get('content-security-policy'):
+        csp = csp_report(headers['content-security-policy'])
+    elif headers.get('content-security-policy-report-only'):
+        csp = csp_report(headers['content-security-policy-report-only'], report_only=True)
+    else:
+        findings.append(_finding('content-security-policy', 'high', 'csp-missing',
+                                 'Content-Security-Policy is not set'))
+    if csp:
+        findings.extend(csp['findings'])
+
+    hsts = None
+    if not https:
+        findings.append(_finding('strict-transport-security', 'high', 'no-https', 'Page is not served over HTTPS'))
+    elif headers.get('strict-transport-security'):
+        hsts = hsts_report(headers['strict-transport-security'])
+        findings.extend(hsts['findings'])
+    else:
+        findings.append(_finding('strict-transport-security', 'high', 'hsts-missing',
+                                 'Strict-Transport-Security is not set'))
+
+    cookies = [
+        cookie_report(line.strip(), https)
+        for line in (headers.get('set-cookie') or '').split('\n') if line.strip()
+    ]
+    for cookie in cookies:
+        findings.extend(cookie['findings'])
+
+    cors = _cors_report(headers)
+    isolation = _isolation_report(headers)
+    findings.extend(cors['findings'])
+    findings.extend(isolation['findings'])
+    findings.extend(_other_findings(headers, csp))
+
+    score = max(0, 100 - sum(SEVERITY_WEIGHTS[finding['severity']] for finding in findings))
+    grade = next((letter for threshold, letter in GRADE_THRESHOLDS if score >= threshold), 'F')
+
+    return {
+        'score': score,
+        'grade': grade,
+        'findings': findings,
+        'csp': csp,
+        'hsts': hsts,
+        'cookies': cookies,
+        'cors': cors,
+        'isolation': isolation
+    }
+
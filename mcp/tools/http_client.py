@@ -0,0 +1,149 @@
+"""
+Shared HTTP clients for Python-side fetches.
+
+All HTTP made by the tools (url_check, change detection, security headers,
+WAVE, the site crawler, Chrome's DevTools endpoints) goes through the
+clients here, so repeated requests to a host reuse keep-alive connections
+instead of paying DNS, TCP and TLS setup each time.
+
+- One sync client per process; one async client per event loop (httpx async
+  connections cannot move between loops). Code that runs its own short-lived
+  loop should use the sync client, or call release_async_client() before the
+  loop ends
+- httpx keeps a connection pool per origin, bounded by the configured limits
+- HTTP/2 is negotiated when the optional ``h2`` package is installed
+  (``pip install httpx[http2]``)
+- Proxies come from HTTP_PROXY / HTTPS_PROXY / NO_PROXY as with any httpx client
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # Optional: HTTP/1.1 keep-alive is used without it
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; WebAuditMCP/1.0)"
+
+
+@dataclass
+class HttpClientConfig:
+    """Connection limits and timeouts for the shared clients."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> "HttpClientConfig":
+        """Build a config from HTTP_CLIENT_* environment variables."""
+        return cls(
+            max_connections=int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("HTTP_CLIENT_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", "5")),
+            http2=os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"
+        )
+
+
+class HttpClients:
+    """Owns the shared sync client and the per-loop async clients."""
+
+    def __init__(self, config: HttpClientConfig | None = None):
+        self.config = config or HttpClientConfig.from_env()
+        self._sync: httpx.Client | None = None
+        self._async: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _client_options(self) -> dict[str, Any]:
+        # No explicit transport, so httpx still mounts proxies from the environment
+        return {
+            'follow_redirects': True,
+            'max_redirects': 10,
+            'timeout': httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+            'headers': {'User-Agent': USER_AGENT},
+            'http2': self.config.http2 and HTTP2_AVAILABLE,
+            'limits': httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry
+            )
+        }
+
+    def sync_client(self) -> httpx.Client:
+        """The process-wide sync client."""
+        with self._lock:
+            if self._sync is None:
+                self._sync = httpx.Client(**self._client_options())
+                logger.debug(f"Created shared HTTP client (http2={self.config.http2 and HTTP2_AVAILABLE})")
+            return self._sync
+
+    def async_client(self) -> httpx.AsyncClient:
+        """The async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(**self._client_options())
+                self._async[loop] = client
+            return client
+
+    async def release_async_client(self):
+        """Close and forget the running loop's async client."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the sync client; async clients are closed by release_async_client()."""
+        with self._lock:
+            if self._sync is not None:
+                self._sync.close()
+                self._sync = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'http2': self.config.http2 and HTTP2_AVAILABLE,
+            'maxConnections': self.config.max_connections,
+            'maxKeepalive': self.config.max_keepalive_connections,
+            'asyncClients': len(self._async)
+        }
+
+
+_clients: HttpClients | None = None
+_clients_lock = threading.Lock()
+
+
+def get_http_clients() -> HttpClients:
+    """Get the process-wide HTTP client set."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = HttpClients()
+        return _clients
+
+
+def get_http_client() -> httpx.Client:
+    """Shared sync client."""
+    return get_http_clients().sync_client()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async client for the running event loop."""
+    return get_http_clients().async_client()
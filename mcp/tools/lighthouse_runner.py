@@ -0,0 +1,285 @@
+"""
+Shared Lighthouse execution for audit_lighthouse and lighthouse_fast.
+
+Runs go to a persistent Node worker, which imports Lighthouse once and
+returns only categories and key audits; the full LHR goes gzip-compressed
+into the report store. Lighthouse keeps process-global state, so each
+concurrent run gets its own worker process; the Chrome pool lease around a
+run caps how many there are. The Lighthouse CLI is used only when no worker
+can be started. Both paths run against a warm Chrome from the Lighthouse
+Chrome pool.
+"""
+
+import json
+import logging
+import subprocess
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal
+
+from .chrome_pool import CHROME_FLAGS, get_chrome_pool
+from .node_worker import (
+    NodeWorkerClient,
+    NodeWorkerError,
+    NodeWorkerUnavailable,
+    node_worker_enabled,
+)
+from .orchestrator import job_time_left
+from .report_store import compress_file, new_report, store_report
+from .runner_registry import get_runner_registry
+
+logger = logging.getLogger(__name__)
+
+NODE_TOOLS_DIR = Path(__file__).parent.parent.parent / "node-tools"
+
+KEY_AUDITS = [
+    'first-contentful-paint',
+    'largest-contentful-paint',
+    'cumulative-layout-shift',
+    'total-blocking-time',
+    'speed-index'
+]
+
+SKIPPED_AUDITS = {
+    'full': "unused-javascript,unused-css-rules,largest-contentful-paint-element,screenshot-thumbnails",
+    'fast': "screenshot-thumbnails,final-screenshot,full-page-screenshot"
+}
+
+# Chrome flags for fast runs that launch their own Chrome
+FAST_CHROME_FLAGS = [
+    "--headless",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-default-apps"
+]
+
+# Idle Lighthouse workers; at most one per Chrome pool slot is ever created
+_workers: list[NodeWorkerClient] = []
+_all_workers: list[NodeWorkerClient] = []
+_workers_lock = threading.Lock()
+
+
+class LighthouseRunError(RuntimeError):
+    """Lighthouse ran but failed to audit the page."""
+
+
+def _resolve_lighthouse_runner() -> tuple[list[str], bool] | None:
+    """Determine how to invoke the Lighthouse CLI (cached by the runner registry).
+
+    Returns:
+        Tuple of (base command list, uses_npx flag) or None if unavailable.
+    """
+    info = get_runner_registry().resolve("lighthouse")
+    return (list(info.command), info.uses_npx) if info.command else None
+
+
+def lighthouse_module_installed() -> bool:
+    """Whether the worker can import Lighthouse from node-tools."""
+    return (NODE_TOOLS_DIR / "node_modules" / "lighthouse" / "package.json").exists()
+
+
+def summarize_lhr(lhr: dict[str, Any], audits: list[str] = KEY_AUDITS) -> dict[str, Any]:
+    """Keep the sections the tools use from a full LHR (mirrors lighthouse-runner.js)."""
+    fields = ('id', 'title', 'description', 'score', 'scoreDisplayMode', 'displayValue', 'numericValue', 'numericUnit')
+    return {
+        'lighthouseVersion': lhr.get('lighthouseVersion'),
+        'requestedUrl': lhr.get('requestedUrl'),
+        'finalUrl': lhr.get('finalDisplayedUrl') or lhr.get('finalUrl'),
+        'fetchTime': lhr.get('fetchTime'),
+        'runtimeError': lhr.get('runtimeError'),
+        'runWarnings': lhr.get('runWarnings'),
+        'categories': {
+            category_id: {'id': category_id, 'title': category.get('title'), 'score': category.get('score')}
+            for category_id, category in lhr.get('categories', {}).items()
+        },
+        'audits': {
+            audit_id: {key: value for key, value in lhr.get('audits', {}).get(audit_id, {}).items() if key in fields}
+            for audit_id in audits
+        }
+    }
+
+
+def run_lighthouse(
+    url: str,
+    device: Literal["mobile", "desktop"] = "mobile",
+    mode: Literal["full", "fast"] = "full",
+    timeout: float = 90,
+    save_report: bool = True
+) -> dict[str, Any]:
+    """
+    Run Lighthouse and return the summarized LHR.
+
+    Args:
+        url: The URL to audit
+        device: Device preset
+        mode: "full" for all categories, "fast" for performance only
+        timeout: Seconds the run may take
+        save_report: Store the full LHR (gzip) in the report store and include
+            reportId/reportPath
+
+    Raises:
+        LighthouseRunError: Lighthouse reported a failure (message holds its stderr)
+        FileNotFoundError: Neither the worker nor the Lighthouse CLI is available
+        subprocess.TimeoutExpired / TimeoutError: The run did not finish in time
+    """
+    is_localhost = 'localhost' in url or '127.0.0.1' in url
+    chrome_flags = CHROME_FLAGS if mode == "full" else FAST_CHROME_FLAGS + (
+        ["--ignore-certificate-errors"] if is_localhost else []
+    )
+
+    report_id, path = new_report("lighthouse", url) if save_report else (None, None)
+    try:
+        summary = _run(url, device, mode, is_localhost, chrome_flags, timeout, path)
+        if report_id and path.stat().st_size:
+            summary['reportId'] = report_id
+            summary['reportPath'] = store_report(report_id, path)['path']
+        return summary
+    finally:
+        if path:
+            path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _lighthouse_worker() -> Iterator[NodeWorkerClient]:
+    """
+    Take a Node worker that runs no other Lighthouse job.
+
+    Callers hold a Chrome pool lease, so no more workers are created than the
+    pool has slots. A worker whose job timed out is killed before it is handed
+    back, so the next run never shares it with a Lighthouse run still going.
+    """
+    with _workers_lock:
+        if _workers:
+            worker = _workers.pop()
+        else:
+            worker = NodeWorkerClient()
+            _all_workers.append(worker)
+    try:
+        yield worker
+    except TimeoutError:
+        worker.kill()
+        raise
+    finally:
+        with _workers_lock:
+            _workers.append(worker)
+
+
+def lighthouse_workers_status() -> list[dict[str, Any]]:
+    """Report the Lighthouse workers for health checks."""
+    with _workers_lock:
+        workers = list(_all_workers)
+    return [worker.status() for worker in workers]
+
+
+def close_lighthouse_workers() -> None:
+    """Stop every Lighthouse worker."""
+    with _workers_lock:
+        workers = list(_all_workers)
+    for worker in workers:
+        worker.close()
+
+
+def _run(
+    url: str,
+    device: str,
+    mode: str,
+    is_localhost: bool,
+    chrome_flags: list[str],
+    timeout: float,
+    report_path: Path | None
+) -> dict[str, Any]:
+    """Run on a Lighthouse worker, or through the CLI when no worker can be started."""
+    with get_chrome_pool().lease() as port:
+        if node_worker_enabled() and lighthouse_module_installed():
+            params = {
+                "url": url,
+                "device": device,
+                "mode": mode,
+                "localhost": is_localhost,
+                "port": port,
+                "chromeFlags": chrome_flags,
+                "saveReport": str(report_path) if report_path else False,
+                "audits": KEY_AUDITS
+            }
+            try:
+                with _lighthouse_worker() as worker:
+                    return worker.call("lighthouse", params, timeout=job_time_left(timeout))
+            except NodeWorkerError as e:
+                raise LighthouseRunError(e.message) from e
+            except NodeWorkerUnavailable as e:
+                logger.warning(f"Node worker unavailable, running the Lighthouse CLI: {e}")
+
+        return _run_cli(url, device, mode, is_localhost, port, chrome_flags, timeout, report_path)
+
+
+def _run_cli(
+    url: str,
+    device: str,
+    mode: str,
+    is_localhost: bool,
+    port: int | None,
+    chrome_flags: list[str],
+    timeout: float,
+    report_path: Path | None
+) -> dict[str, Any]:
+    """Run the Lighthouse CLI, reading its JSON output from a temporary file."""
+    runner = _resolve_lighthouse_runner()
+    if not runner:
+        raise FileNotFoundError("npx executable not found in PATH")
+
+    base_cmd, uses_npx = runner
+    cmd = base_cmd.copy()
+    if uses_npx:
+        cmd.append("--")
+
+    with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+
+    try:
+        cmd += [url, "--output=json", f"--output-path={tmp_path}", "--quiet"]
+
+        # A pooled Chrome keeps its profile between runs, so Lighthouse must clear
+        # the origin's storage and the browser cache; a Chrome it launches is fresh
+        storage_reset = [] if port else ["--disable-storage-reset"]
+        if mode == "fast":
+            cmd += [
+                "--only-categories=performance",
+                "--throttling-method=provided",
+                *storage_reset,
+                f"--skip-audits={SKIPPED_AUDITS['fast']}"
+            ]
+        elif is_localhost:
+            cmd += [
+                "--throttling-method=provided",
+                *storage_reset,
+                f"--skip-audits={SKIPPED_AUDITS['full']}"
+            ]
+
+        if device == "desktop":
+            cmd.append("--preset=desktop")
+
+        if port:
+            cmd.append(f"--port={port}")
+        else:
+            cmd.append(f"--chrome-flags={' '.join(chrome_flags)}")
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=job_time_left(timeout))
+        if result.returncode != 0:
+            raise LighthouseRunError(result.stderr.strip())
+
+        with open(tmp_path) as f:
+            lhr = json.load(f)
+
+        summary = summarize_lhr(lhr)
+        if report_path:
+            compress_file(Path(tmp_path), report_path)
+        return summary
+
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
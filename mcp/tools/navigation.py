@@ -0,0 +1,232 @@
+"""
+Navigation wait strategies for the Python Playwright tools.
+
+Mirrors node-tools/lib/navigation.js: page.goto() waits for ``load`` (or
+``domcontentloaded``) and any further settling is bounded by a short settle
+timeout that never fails the navigation, so beacon-heavy or long-polling
+pages do not hang until the navigation timeout. Requests go through the
+interception profiles of node-tools/lib/interception.js; analytics and ad
+hosts from node-tools/lib/tracker-domains.json are blocked by default.
+"""
+
+import base64
+import json
+import logging
+import os
+import time
+from functools import cache
+from pathlib import Path
+from typing import Any, Literal
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+TRACKER_DOMAINS_FILE = Path(__file__).parent.parent.parent / "node-tools" / "lib" / "tracker-domains.json"
+
+WaitStrategy = Literal["load", "domcontentloaded", "networkidle", "lcp", "dom-quiet"]
+WAIT_STRATEGIES = ("load", "domcontentloaded", "networkidle", "lcp", "dom-quiet")
+
+InterceptionProfile = Literal["full", "layout", "a11y-minimal", "headers-only"]
+
+# Same profiles as node-tools/lib/interception.js
+INTERCEPTION_PROFILES: dict[str, dict[str, Any]] = {
+    "full": {"block": (), "stub": ()},
+    "layout": {"block": ("media",), "stub": ()},
+    "a11y-minimal": {"block": ("media", "font"), "stub": ("image",)},
+    "headers-only": {"allow": ("document",), "block": (), "stub": ()},
+}
+
+# Smallest transparent GIF
+_PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+_WAIT_FOR_LCP = """({ quietMs, maxMs }) => new Promise((resolve) => {
+  const start = performance.now();
+  let last = start;
+  let observer;
+  try {
+    observer = new PerformanceObserver(() => { last = performance.now(); });
+    observer.observe({ type: 'largest-contentful-paint', buffered: true });
+  } catch {
+    resolve(true);
+    return;
+  }
+  const check = () => {
+    const now = performance.now();
+    if (now - last >= quietMs || now - start >= maxMs) {
+      observer.disconnect();
+      resolve(now - last >= quietMs);
+    } else {
+      setTimeout(check, Math.min(100, quietMs));
+    }
+  };
+  check();
+})"""
+
+_WAIT_FOR_DOM_QUIET = """({ quietMs, maxMs }) => new Promise((resolve) => {
+  const start = performance.now();
+  let last = start;
+  const observer = new MutationObserver(() => { last = performance.now(); });
+  observer.observe(document.documentElement, { subtree: true, childList: true, attributes: true, characterData: true });
+  const check = () => {
+    const now = performance.now();
+    if (now - last >= quietMs || now - start >= maxMs) {
+      observer.disconnect();
+      resolve(now - last >= quietMs);
+    } else {
+      setTimeout(check, Math.min(100, quietMs));
+    }
+  };
+  check();
+})"""
+
+
+@cache
+def tracker_domains() -> frozenset[str]:
+    """Blocklisted analytics/ad hosts (subdomains match too)."""
+    try:
+        return frozenset(json.loads(TRACKER_DOMAINS_FILE.read_text(encoding='utf-8'))['domains'])
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not read tracker blocklist: {e}")
+        return frozenset()
+
+
+def is_tracker_url(url: str) -> bool:
+    """Whether a URL's host is (a subdomain of) a blocklisted tracker host."""
+    labels = (urlsplit(url).hostname or '').split('.')
+    domains = tracker_domains()
+    return any('.'.join(labels[i:]) in domains for i in range(len(labels) - 1))
+
+
+def validate_interception_profile(profile: str | None) -> None:
+    """Raise ValueError for an unknown interception profile name (None means the tool default)."""
+    if profile is not None and profile not in INTERCEPTION_PROFILES:
+        raise ValueError(
+            f"Unknown interception profile: {profile}. Use one of: {', '.join(INTERCEPTION_PROFILES)}"
+        )
+
+
+def total_request_counts(counts: list[dict[str, Any] | None]) -> dict[str, int]:
+    """Sum per-navigation allowed/blocked/stubbed request counts."""
+    totals = {'allowed': 0, 'blocked': 0, 'stubbed': 0}
+    for item in counts:
+        for key in totals:
+            totals[key] += (item or {}).get(key, 0)
+    return totals
+
+
+def _decide(profile: dict[str, Any], resource_type: str, url: str, block_trackers: bool) -> str:
+    if block_trackers and is_tracker_url(url):
+        return 'stub' if resource_type == 'script' else 'block'
+    if 'allow' in profile and resource_type not in profile['allow']:
+        return 'block'
+    if resource_type in profile['block']:
+        return 'block'
+    if resource_type in profile['stub']:
+        return 'stub'
+    return 'allow'
+
+
+async def apply_interception(
+    page: Any,
+    profile: InterceptionProfile = "full",
+    block_trackers: bool = True
+) -> dict[str, Any]:
+    """
+    Route a page's requests through an interception profile.
+
+    Returns request counts that keep updating while the page is open.
+    """
+    validate_interception_profile(profile)
+    rules = INTERCEPTION_PROFILES[profile]
+    counts: dict[str, Any] = {'profile': profile, 'allowed': 0, 'blocked': 0, 'stubbed': 0, 'interceptedByType': {}}
+
+    async def _handle(route):
+        request = route.request
+        resource_type = request.resource_type
+        decision = _decide(rules, resource_type, request.url, block_trackers)
+        if decision == 'allow':
+            counts['allowed'] += 1
+            await route.fallback()
+            return
+
+        by_type = counts['interceptedByType']
+        by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        if decision == 'stub':
+            counts['stubbed'] += 1
+            if resource_type == 'image':
+                await route.fulfill(status=200, content_type='image/gif', body=_PIXEL_GIF)
+            else:
+                await route.fulfill(status=200, content_type='application/javascript', body='')
+            return
+        counts['blocked'] += 1
+        await route.abort('blockedbyclient')
+
+    await page.route('**/*', _handle)
+    return counts
+
+
+async def navigate(
+    page: Any,
+    url: str,
+    wait_for: WaitStrategy | None = None,
+    timeout: float = 30000,
+    settle_timeout: float | None = None,
+    quiet_ms: float | None = None,
+    block_trackers: bool | None = None,
+    interception: InterceptionProfile = "full"
+) -> tuple[Any, dict[str, Any]]:
+    """
+    Navigate a Playwright page and wait according to a strategy.
+
+    Args:
+        page: Playwright async Page
+        url: URL to open
+        wait_for: Wait strategy (default NAVIGATION_WAIT or networkidle)
+        timeout: Navigation timeout in ms
+        settle_timeout: Upper bound for the settle phase in ms (NAVIGATION_SETTLE_TIMEOUT_MS)
+        quiet_ms: Quiet window for lcp and dom-quiet (NAVIGATION_QUIET_MS)
+        block_trackers: Block/stub requests to analytics/ad hosts (NAVIGATION_BLOCK_TRACKERS)
+        interception: Interception profile: full, layout, a11y-minimal or headers-only
+
+    Returns:
+        Tuple of (main document response, navigation stats)
+    """
+    wait_for = wait_for or os.getenv("NAVIGATION_WAIT", "networkidle")
+    if wait_for not in WAIT_STRATEGIES:
+        raise ValueError(f"Unknown wait strategy: {wait_for}. Use one of: {', '.join(WAIT_STRATEGIES)}")
+    if settle_timeout is None:
+        settle_timeout = float(os.getenv("NAVIGATION_SETTLE_TIMEOUT_MS", "5000"))
+    if quiet_ms is None:
+        quiet_ms = float(os.getenv("NAVIGATION_QUIET_MS", "500"))
+    if block_trackers is None:
+        block_trackers = os.getenv("NAVIGATION_BLOCK_TRACKERS", "true").lower() == "true"
+
+    requests = await apply_interception(page, interception, block_trackers)
+
+    started = time.monotonic()
+    response = await page.goto(
+        url,
+        wait_until='domcontentloaded' if wait_for == 'domcontentloaded' else 'load',
+        timeout=timeout
+    )
+    load_ms = round((time.monotonic() - started) * 1000)
+
+    settled = True
+    try:
+        if wait_for == 'networkidle':
+            await page.wait_for_load_state('networkidle', timeout=settle_timeout)
+        elif wait_for in ('lcp', 'dom-quiet'):
+            script = _WAIT_FOR_LCP if wait_for == 'lcp' else _WAIT_FOR_DOM_QUIET
+            settled = await page.evaluate(script, {'quietMs': quiet_ms, 'maxMs': settle_timeout})
+    except Exception as e:
+        # Settle timeout or the page navigated away mid-wait: continue with what is loaded
+        logger.debug(f"Navigation to {url} did not settle ({wait_for}): {e}")
+        settled = False
+
+    return response, {
+        'waitFor': wait_for,
+        'loadMs': load_ms,
+        'ms': round((time.monotonic() - started) * 1000),
+        'settled': settled,
+        'requests': requests
+    }
@@ -0,0 +1,130 @@
+"""
+Invocation helper for the Playwright-based Node tools.
+
+Jobs go to the persistent Node worker when it is available and fall back
+to spawning the tool's script directly. Both paths run against a browser
+leased from the shared pool.
+"""
+
+import json
+import logging
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Any
+
+from .browser_pool import get_browser_pool
+from .node_worker import (
+    NodeWorkerError,
+    NodeWorkerUnavailable,
+    get_node_worker,
+    node_worker_enabled,
+)
+from .orchestrator import job_time_left
+
+logger = logging.getLogger(__name__)
+
+NODE_TOOLS_DIR = Path(__file__).parent.parent.parent / "node-tools"
+
+
+class NodeToolError(RuntimeError):
+    """A Node tool reported a failure."""
+
+    def __init__(self, message: str, details: dict[str, Any] | None = None):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+
+def run_node_tool(
+    method: str,
+    script_name: str,
+    args: list[str],
+    params: dict[str, Any],
+    timeout: float
+) -> dict[str, Any]:
+    """
+    Run a Node tool and return its parsed JSON result.
+
+    Args:
+        method: Worker method name (e.g. "axe")
+        script_name: Script in node-tools used when the worker is unavailable
+        args: Command line arguments for the script
+        params: Worker job parameters
+        timeout: Timeout in seconds
+
+    Raises:
+        NodeToolError: The tool failed; ``details`` holds its error payload
+        subprocess.TimeoutExpired / TimeoutError: The tool did not finish in time
+        json.JSONDecodeError: The script printed something other than JSON
+    """
+    node_script = NODE_TOOLS_DIR / script_name
+
+    if not node_script.exists():
+        raise FileNotFoundError(f"Node script not found: {node_script}")
+
+    with get_browser_pool().lease() as ws_endpoint:
+        if node_worker_enabled():
+            try:
+                return get_node_worker().call(
+                    method, {**params, "wsEndpoint": ws_endpoint}, timeout=job_time_left(timeout)
+                )
+            except NodeWorkerError as e:
+                raise NodeToolError(e.message, {"error": e.message, **e.data}) from e
+            except NodeWorkerUnavailable as e:
+                logger.warning(f"Node worker unavailable, spawning {script_name}: {e}")
+
+        env = os.environ.copy()
+        if ws_endpoint:
+            env["PLAYWRIGHT_WS_ENDPOINT"] = ws_endpoint
+        else:
+            env.pop("PLAYWRIGHT_WS_ENDPOINT", None)
+
+        cmd = ["node", str(node_script)] + args
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=job_time_left(timeout), env=env)
+
+    if result.returncode != 0:
+        error_info = _parse_error_output(result)
+        raise NodeToolError(error_info["error_message"], error_info["details"])
+
+    return json.loads(result.stdout)
+
+
+def _parse_error_output(result: subprocess.CompletedProcess) -> dict[str, Any]:
+    """Parse stderr/stdout from a Node script into a structured error."""
+    raw_stderr = (result.stderr or "").strip()
+    raw_stdout = (result.stdout or "").strip()
+
+    payload = raw_stderr or raw_stdout
+    parsed: dict[str, Any] = {}
+
+    if payload:
+        try:
+            parsed_json = json.loads(payload)
+            if isinstance(parsed_json, dict):
+                parsed = parsed_json
+        except json.JSONDecodeError:
+            # Some tools include ANSI codes; strip them for readability
+            cleaned = _strip_ansi(payload)
+            parsed = {"error": cleaned}
+
+    error_message = parsed.get("error") if isinstance(parsed, dict) else None
+
+    if not error_message and payload:
+        error_message = _strip_ansi(payload)
+
+    details: dict[str, Any] = {}
+    if isinstance(parsed, dict):
+        details = parsed
+
+    return {
+        "error_message": error_message or "Unknown error",
+        "details": details or None
+    }
+
+
+def _strip_ansi(text: str) -> str:
+    """Remove ANSI escape codes from error output."""
+    ansi_escape = re.compile(r'\x1B\[[0-9;]*[mK]')
+    return ansi_escape.sub('', text)
@@ -0,0 +1,230 @@
+"""
+Client for the persistent Node worker (node-tools/worker.js).
+
+The worker loads the Playwright tool modules once and serves JSON-RPC jobs
+over stdin/stdout, one JSON object per line. A reader thread matches
+responses to callers by id, so many jobs can be in flight at once.
+"""
+
+import itertools
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).parent.parent.parent / "node-tools" / "worker.js"
+
+# Give up on the worker for a while after this many crashes in a row
+MAX_CONSECUTIVE_FAILURES = 3
+FAILURE_COOLDOWN = 60.0
+
+
+class NodeWorkerUnavailable(RuntimeError):
+    """The worker process could not be started or died mid-request."""
+
+
+class NodeWorkerError(RuntimeError):
+    """A job failed inside the worker."""
+
+    def __init__(self, message: str, data: dict[str, Any] | None = None):
+        super().__init__(message)
+        self.message = message
+        self.data = data or {}
+
+
+class NodeWorkerClient:
+    """Multiplexing JSON-RPC client with automatic restart."""
+
+    def __init__(self, script: Path = WORKER_SCRIPT):
+        self.script = script
+        self.process: subprocess.Popen | None = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, tuple[subprocess.Popen, Future]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._failures = 0
+        self._disabled_until = 0.0
+        self._restarts = 0
+
+    def call(self, method: str, params: dict[str, Any] | None = None, timeout: float = 60) -> Any:
+        """
+        Run a job in the worker and wait for its result.
+
+        Raises:
+            NodeWorkerUnavailable: The worker cannot be started or exited
+            NodeWorkerError: The job raised inside the worker
+            TimeoutError: No response within the timeout
+        """
+        process = self._ensure_process()
+        request_id = next(self._ids)
+        future: Future = Future()
+
+        with self._lock:
+            self._pending[request_id] = (process, future)
+
+        message = json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        try:
+            with self._write_lock:
+                process.stdin.write(message + "\n")
+                process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise NodeWorkerUnavailable(f"Node worker is not accepting jobs: {e}") from e
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError(f"Node worker job '{method}' timed out after {timeout} seconds") from None
+
+    def status(self) -> dict[str, Any]:
+        """Report worker state for health checks."""
+        running = self.process is not None and self.process.poll() is None
+        return {
+            'running': running,
+            'pid': self.process.pid if running else None,
+            'inFlight': len(self._pending),
+            'restarts': self._restarts,
+            'disabled': time.monotonic() < self._disabled_until
+        }
+
+    def close(self) -> None:
+        """Stop the worker; it exits once stdin is closed."""
+        with self._lock:
+            process, self.process = self.process, None
+
+        if process and process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+
+    def kill(self) -> None:
+        """Kill the worker and fail its jobs; the next call starts a new one."""
+        with self._lock:
+            process, self.process = self.process, None
+
+        if process and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        """Return a running worker, starting or restarting it as needed."""
+        with self._lock:
+            if self.process and self.process.poll() is None:
+                return self.process
+
+            if time.monotonic() < self._disabled_until:
+                raise NodeWorkerUnavailable("Node worker is cooling down after repeated failures")
+
+            if not self.script.exists():
+                raise NodeWorkerUnavailable(f"Node script not found: {self.script}")
+
+            if self.process is not None:
+                self._restarts += 1
+                logger.warning("Node worker exited, restarting")
+
+            try:
+                self.process = subprocess.Popen(
+                    ["node", str(self.script)],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    cwd=str(self.script.parent)
+                )
+            except FileNotFoundError as e:
+                self._record_failure()
+                raise NodeWorkerUnavailable("node executable not found") from e
+
+            process = self.process
+            threading.Thread(target=self._read_responses, args=(process,), daemon=True).start()
+            threading.Thread(target=self._drain_stderr, args=(process,), daemon=True).start()
+            logger.info(f"Started Node worker (pid {process.pid})")
+            return process
+
+    def _read_responses(self, process: subprocess.Popen) -> None:
+        """Dispatch response lines to the waiting futures until EOF."""
+        answered = False
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring malformed worker output: {line[:200]}")
+                continue
+
+            with self._lock:
+                entry = self._pending.pop(response.get("id"), None)
+            if entry is None:
+                continue
+
+            future = entry[1]
+
+            answered = True
+            if "error" in response:
+                error = response["error"] or {}
+                future.set_exception(NodeWorkerError(error.get("message", "Unknown worker error"), error.get("data")))
+            else:
+                future.set_result(response.get("result"))
+
+        # Worker exited: fail the jobs that were sent to this process
+        process.wait()
+        with self._lock:
+            if answered:
+                self._failures = 0
+            elif process.returncode != 0:
+                self._record_failure()
+            orphaned = [rid for rid, (owner, _) in self._pending.items() if owner is process]
+            pending = [self._pending.pop(rid)[1] for rid in orphaned]
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(NodeWorkerUnavailable(f"Node worker exited with code {process.returncode}"))
+
+    def _drain_stderr(self, process: subprocess.Popen) -> None:
+        """Forward worker diagnostics to the log."""
+        for line in process.stderr:
+            line = line.rstrip()
+            if line:
+                logger.debug(f"[node-worker] {line}")
+
+    def _record_failure(self) -> None:
+        """Count a failed start and back off after repeated failures (lock held)."""
+        self._failures += 1
+        if self._failures >= MAX_CONSECUTIVE_FAILURES:
+            logger.warning(f"Node worker failed {self._failures} times, disabling for {FAILURE_COOLDOWN:.0f}s")
+            self._disabled_until = time.monotonic() + FAILURE_COOLDOWN
+            self._failures = 0
+
+
+_worker: NodeWorkerClient | None = None
+_worker_lock = threading.Lock()
+
+
+def node_worker_enabled() -> bool:
+    """Whether tools should route jobs through the persistent worker."""
+    return os.getenv("NODE_WORKER_ENABLED", "true").lower() == "true"
+
+
+def get_node_worker() -> NodeWorkerClient:
+    """Get the process-wide Node worker client."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = NodeWorkerClient()
+        return _worker
@@ -0,0 +1,174 @@
+"""
+Concurrent execution of blocking audit tools.
+
+Tools are plain synchronous functions; the orchestrator runs them on a
+shared thread pool from an asyncio event loop so independent audits
+overlap, with a timeout per tool and an optional global deadline.
+
+A tool's timeout starts when it begins running, not while it waits for a
+pool thread. The running tool's remaining budget is available through
+job_time_left(), which subprocess and worker calls use as their timeout so
+a timed-out tool gives its thread back instead of running on unobserved.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Threads in the shared tool pool; no caller can run more tools at once
+MAX_WORKERS = int(os.getenv("AUDIT_MAX_WORKERS", "16"))
+
+# Shared pool so timed-out tools never block asyncio.run() from returning
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_WORKERS,
+    thread_name_prefix="audit-tool"
+)
+
+# Deadline (time.monotonic()) of the tool job running on this thread
+_job = threading.local()
+
+
+def job_time_left(timeout: float) -> float:
+    """Clamp a blocking call's timeout to what is left of the running tool job's budget."""
+    deadline = getattr(_job, 'deadline', None)
+    if deadline is None:
+        return timeout
+    return max(0.0, min(timeout, deadline - time.monotonic()))
+
+
+@dataclass
+class ToolJob:
+    """One tool invocation to schedule."""
+    name: str
+    func: Callable[..., dict[str, Any]]
+    args: tuple = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    timeout: float | None = None
+
+
+async def run_tool(
+    job: ToolJob,
+    timeout: float | None = None,
+    deadline: float | None = None
+) -> dict[str, Any]:
+    """
+    Run one tool off the event loop and normalize failures into error results.
+
+    Args:
+        job: Tool to run; job.timeout overrides timeout
+        timeout: Seconds the tool may run, counted from when it starts
+        deadline: time.monotonic() by which the job must finish, queueing included
+
+    The returned dict always has a 'status' key and gains 'durationMs'.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    limit = job.timeout if job.timeout is not None else timeout
+    running: asyncio.Future = loop.create_future()
+
+    def budget() -> float | None:
+        left = None if deadline is None else deadline - time.monotonic()
+        if limit is None:
+            return left
+        return limit if left is None else min(limit, left)
+
+    def call() -> dict[str, Any]:
+        loop.call_soon_threadsafe(lambda: running.done() or running.set_result(None))
+        allowed = budget()
+        _job.deadline = None if allowed is None else time.monotonic() + allowed
+        try:
+            return job.func(*job.args, **job.kwargs)
+        finally:
+            _job.deadline = None
+
+    try:
+        future = loop.run_in_executor(_executor, call)
+        # Waiting for a pool thread only counts against the overall deadline
+        queued = None if deadline is None else max(0.0, deadline - time.monotonic())
+        await asyncio.wait({future, running}, timeout=queued, return_when=asyncio.FIRST_COMPLETED)
+        if not (future.done() or running.done()):
+            future.cancel()
+            raise asyncio.TimeoutError
+        result = await asyncio.wait_for(future, timeout=budget())
+        if not isinstance(result, dict):
+            result = {'status': 'error', 'error': f'{job.name} returned {type(result).__name__}'}
+    except asyncio.TimeoutError:
+        waited = time.monotonic() - started
+        logger.warning(f"{job.name} timed out after {waited:.0f}s")
+        result = {
+            'status': 'error',
+            'error': f'{job.name} timed out after {waited:.0f} seconds',
+            'timedOut': True
+        }
+    except Exception as e:
+        logger.error(f"{job.name} failed: {e}")
+        result = {'status': 'error', 'error': str(e)}
+
+    result['durationMs'] = round((time.monotonic() - started) * 1000)
+    return result
+
+
+async def run_tools(
+    jobs: list[ToolJob],
+    per_tool_timeout: float | None = None,
+    deadline: float | None = None
+) -> dict[str, dict[str, Any]]:
+    """
+    Run jobs concurrently and return their results keyed by job name.
+
+    Args:
+        jobs: Tools to run
+        per_tool_timeout: Default timeout in seconds for jobs without their own
+        deadline: Overall budget in seconds; no job runs past it
+    """
+    deadline_at = None if deadline is None else time.monotonic() + deadline
+    results = await asyncio.gather(*(run_tool(job, per_tool_timeout, deadline_at) for job in jobs))
+    return {job.name: result for job, result in zip(jobs, results, strict=True)}
+
+
+def run_coroutine_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Works whether or not the calling thread already has a running event loop
+    (in which case the coroutine gets its own loop on a helper thread).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    outcome: dict[str, Any] = {}
+
+    def runner():
+        try:
+            outcome['value'] = asyncio.run(coro)
+        except BaseException as e:  # Re-raised in the caller's thread
+            outcome['error'] = e
+
+    thread = threading.Thread(target=runner, name="audit-orchestrator")
+    thread.start()
+    thread.join()
+
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+def run_tools_sync(
+    jobs: list[ToolJob],
+    per_tool_timeout: float | None = None,
+    deadline: float | None = None
+) -> dict[str, dict[str, Any]]:
+    """Synchronous wrapper around run_tools for use inside tool functions."""
+    return run_coroutine_sync(run_tools(jobs, per_tool_timeout, deadline))
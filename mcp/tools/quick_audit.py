@@ -5,18 +5,38 @@ Quick audit tool - combines fast tools for immediate feedback
 import logging
 from typing import Any
 
+from .axe_playwright import scan_axe
+from .orchestrator import ToolJob, run_tools_sync
 from .responsive import responsive_audit
 from .security_headers import security_headers
+from .url_check import url_check
 
 logger = logging.getLogger(__name__)
 
-def quick_audit(url: str, include_responsive: bool = True) -> dict[str, Any]:
+# Optional fast tools that can run alongside the default checks
+EXTRA_TOOLS = {
+    'url_check': url_check,
+    'scan_axe': scan_axe
+}
+
+def quick_audit(
+    url: str,
+    include_responsive: bool = True,
+    extra_tools: list[str] | None = None,
+    tool_timeout: float = 60,
+    deadline: float = 90
+) -> dict[str, Any]:
     """
     Run a quick audit using fast tools only.
 
+    All sub-audits run concurrently, so wall time is that of the slowest tool.
+
     Args:
         url: The URL to audit
         include_responsive: Whether to include responsive audit (slower)
+        extra_tools: Additional fast tools to run: url_check, scan_axe
+        tool_timeout: Seconds each tool may run before it is reported as timed out
+        deadline: Overall seconds budget for the whole audit
 
     Returns:
         Dict containing results from multiple fast tools
@@ -25,6 +45,11 @@ def quick_audit(url: str, include_responsive: bool = True) -> dict[str, Any]:
         if not url.startswith(('http://', 'https://')):
             raise ValueError("URL must start with http:// or https://")
 
+        extra_tools = extra_tools or []
+        unknown = [tool for tool in extra_tools if tool not in EXTRA_TOOLS]
+        if unknown:
+            raise ValueError(f"Unsupported extra tools: {unknown}. Use: {list(EXTRA_TOOLS)}")
+
         results = {
             'status': 'ok',
             'url': url,
@@ -33,27 +58,35 @@ def quick_audit(url: str, include_responsive: bool = True) -> dict[str, Any]:
             'results': {}
         }
 
-        # Security headers (very fast)
-        logger.info(f"Running security headers check for {url}")
-        security_result = security_headers(url)
-        results['results']['security_headers'] = security_result
-        results['tools_used'].append('security_headers')
-
-        # Responsive audit (moderate speed)
+        # Security headers (very fast) and responsive audit (moderate speed) run side by side
+        jobs = [ToolJob('security_headers', security_headers, (url,))]
         if include_responsive:
-            logger.info(f"Running responsive audit for {url}")
-            responsive_result = responsive_audit(url, ["375x667", "1024x768"])
-            results['results']['responsive'] = responsive_result
-            results['tools_used'].append('responsive_audit')
+            jobs.append(ToolJob('responsive', responsive_audit, (url, ["375x667", "1024x768"])))
+        for tool in extra_tools:
+            jobs.append(ToolJob(tool, EXTRA_TOOLS[tool], (url,)))
+
+        logger.info(f"Running {len(jobs)} quick audit tools concurrently for {url}")
+        outcomes = run_tools_sync(jobs, per_tool_timeout=tool_timeout, deadline=deadline)
+
+        tool_names = {'responsive': 'responsive_audit'}
+        for name, outcome in outcomes.items():
+            results['results'][name] = outcome
+            results['tools_used'].append(tool_names.get(name, name))
+
+        security_result = outcomes['security_headers']
+        responsive_result = outcomes.get('responsive', {})
 
         # Summary
         security_ok = security_result.get('status') == 'ok'
         responsive_ok = responsive_result.get('status') == 'ok' if include_responsive else True
+        extras_ok = all(outcomes[tool].get('status') == 'ok' for tool in extra_tools)
 
         results['summary'] = {
-            'overall_status': 'ok' if (security_ok and responsive_ok) else 'warning',
+            'overall_status': 'ok' if (security_ok and responsive_ok and extras_ok) else 'warning',
             'security_headers_found': len(security_result.get('headers', {})) if security_ok else 0,
-            'responsive_issues': len(responsive_result.get('issues', [])) if include_responsive and responsive_ok else 0
+            'responsive_issues': len(responsive_result.get('issues', [])) if include_responsive and responsive_ok else 0,
+            'timed_out': [name for name, outcome in outcomes.items() if outcome.get('timedOut')],
+            'durations_ms': {name: outcome.get('durationMs') for name, outcome in outcomes.items()}
         }
 
         return results
@@ -65,4 +98,4 @@ def quick_audit(url: str, include_responsive: bool = True) -> dict[str, Any]:
             'error': str(e),
             'tool': 'quick_audit',
             'suggestion': 'Try individual tools: security_headers or responsive_audit'
-        }
\ No newline at end of file
+        }
@@ -2,14 +2,19 @@
 Report merging and unified scoring system.
 """
 
-import json
 import logging
 from datetime import datetime
-from pathlib import Path
 from typing import Any
 
+from .artifact_store import get_artifact_store
+
 logger = logging.getLogger(__name__)
 
+# security_headers grading findings that duplicate the missing-header findings
+PRESENCE_FINDINGS = {
+    'csp-missing', 'hsts-missing', 'xcto-missing', 'referrer-missing', 'permissions-missing', 'framing-unprotected'
+}
+
 def report_merge(items: list[dict[str, Any]], budgets: dict[str, Any] | None = None) -> dict[str, Any]:
     """
     Merge multiple audit results into a unified report.
@@ -48,6 +53,8 @@ def report_merge(items: list[dict[str, Any]], budgets: dict[str, Any] | None = N
 
             if tool_type == 'lighthouse':
                 _process_lighthouse_results(item, scores, findings, artifacts)
+            elif tool_type == 'lighthouse_fast':
+                _process_lighthouse_fast_results(item, scores, findings, artifacts)
             elif tool_type == 'axe':
                 _process_axe_results(item, scores, findings, artifacts)
             elif tool_type == 'wave':
@@ -78,16 +85,6 @@ def report_merge(items: list[dict[str, Any]], budgets: dict[str, Any] | None = N
         if budgets:
             budget_results = _apply_budgets(scores, findings, budgets)
 
-        # Generate report files
-        artifacts_dir = Path(__file__).parent.parent.parent / "artifacts"
-        artifacts_dir.mkdir(exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # JSON report
-        json_report_path = artifacts_dir / f"report-{timestamp}.json"
-        html_report_path = artifacts_dir / f"report-{timestamp}.html"
-
         report_data = {
             'timestamp': datetime.now().isoformat(),
             'score': scores,
@@ -97,14 +94,10 @@ def report_merge(items: list[dict[str, Any]], budgets: dict[str, Any] | None = N
             'summary': _generate_summary(scores, findings)
         }
 
-        # Save JSON report
-        with open(json_report_path, 'w') as f:
-            json.dump(report_data, f, indent=2)
-
-        # Generate and save HTML report
-        html_content = _generate_html_report(report_data)
-        with open(html_report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Save JSON (gzip) and HTML reports to the artifact store
+        store = get_artifact_store()
+        json_report = store.put_json(report_data, kind="report-merge")
+        html_report = store.put_text(_generate_html_report(report_data), kind="report-merge", ext="html")
 
         return {
             'status': 'ok',
@@ -112,8 +105,8 @@ def report_merge(items: list[dict[str, Any]], budgets: dict[str, Any] | None = N
             'findings': findings,
             'artifacts': artifacts,
             'budgets': budget_results,
-            'jsonReportPath': str(json_report_path),
-            'htmlReportPath': str(html_report_path),
+            'jsonReportPath': json_report['path'],
+            'htmlReportPath': html_report['path'],
             'summary': report_data['summary']
         }
 
@@ -128,6 +121,8 @@ def _identify_tool_type(item: dict[str, Any]) -> str:
     """Identify the tool type from audit result."""
     if 'categoryScores' in item:
         return 'lighthouse'
+    elif 'performance_score' in item and item.get('mode') == 'fast':
+        return 'lighthouse_fast'
     elif 'violations' in item:
         return 'axe'
     elif 'issues' in item and 'reportType' in item:
@@ -169,6 +164,20 @@ def _process_lighthouse_results(item: dict[str, Any], scores: dict[str, float],
                 'recommendation': audit.get('description', '')
             })
 
+def _process_lighthouse_fast_results(item: dict[str, Any], scores: dict[str, float], findings: list[dict], artifacts: list[str]):
+    """Process fast (performance-only) Lighthouse results."""
+    performance = item.get('performance_score', 0)
+    scores['perf'] = performance
+
+    if performance < 90:
+        findings.append({
+            'category': 'perf',
+            'severity': 'high' if performance < 50 else 'medium',
+            'summary': f'Performance score {performance:.0f}/100',
+            'evidence': item.get('metrics', {}),
+            'recommendation': 'Run audit_lighthouse for detailed performance opportunities'
+        })
+
 def _process_axe_results(item: dict[str, Any], scores: dict[str, float], findings: list[dict], artifacts: list[str]):
     """Process axe accessibility results."""
     violations = item.get('violations', [])
@@ -232,7 +241,8 @@ def _process_wave_results(item: dict[str, Any], scores: dict[str, float], findin
 
 def _process_security_headers_results(item: dict[str, Any], scores: dict[str, float], findings: list[dict], artifacts: list[str]):
     """Process security headers results."""
-    security_score = item.get('securityScore', 0)
+    # Prefer the graded score (policy contents) over header presence
+    security_score = item.get('gradeScore', item.get('securityScore', 0))
     headers = item.get('headers', {})
 
     scores['security'] = max(scores['security'], security_score)
@@ -257,6 +267,18 @@ def _process_security_headers_results(item: dict[str, Any], scores: dict[str, fl
                 'recommendation': f'Implement {header_names.get(header_key, header_key)} header'
             })
 
+    # Weak policies found by the grading engine; missing headers are reported above
+    for finding in item.get('analysis', {}).get('findings', []):
+        if finding['severity'] == 'info' or finding['id'] in PRESENCE_FINDINGS:
+            continue
+        findings.append({
+            'category': 'security',
+            'severity': finding['severity'],
+            'summary': finding['message'],
+            'evidence': {'header': finding['header'], 'id': finding['id']},
+            'recommendation': f"Tighten the {finding['header']} header"
+        })
+
 def _process_zap_results(item: dict[str, Any], scores: dict[str, float], findings: list[dict], artifacts: list[str]):
     """Process ZAP security scan results."""
     zap_security_score = item.get('securityScore', 0)
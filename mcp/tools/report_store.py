@@ -0,0 +1,165 @@
+"""
+Compressed store for full audit reports.
+
+Large reports (a Lighthouse LHR is often 5-20 MB) are written gzip-compressed
+into the artifact store and tools return a report id instead of the report
+itself. report_slice fetches parts of a stored report by JSON pointer.
+"""
+
+import functools
+import gzip
+import json
+import logging
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from .artifact_store import get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+REPORT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+# Slices larger than this are summarized instead of returned
+DEFAULT_MAX_BYTES = 200_000
+
+
+def new_report(kind: str, url: str) -> tuple[str, Path]:
+    """Allocate a report id and a scratch path to write its compressed JSON to."""
+    host = re.sub(r'[^A-Za-z0-9.-]', '_', urlsplit(url).hostname or 'report')
+    report_id = f"{kind}-{host}-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    return report_id, get_artifact_store().temp_path(".json.gz")
+
+
+def compress_file(source: Path, destination: Path) -> None:
+    """Gzip a file without reading it into memory."""
+    with open(source, 'rb') as src, gzip.open(destination, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+
+
+def store_report(report_id: str, path: Path) -> dict[str, Any]:
+    """Move a report written by new_report's caller into the artifact store."""
+    return get_artifact_store().put_file(path, kind="report", ext="json.gz", name=report_id)
+
+
+def _report_path(report_id: str) -> Path:
+    if not REPORT_ID_PATTERN.match(report_id):
+        raise ValueError(f"Invalid report id: {report_id}")
+    path = get_artifact_store().locate(report_id)
+    if path is None:
+        raise FileNotFoundError(f"Report not found: {report_id}")
+    return path
+
+
+@functools.lru_cache(maxsize=2)
+def _load(path: Path, mtime: float) -> Any:
+    """Parse a stored report; the last couple stay cached for follow-up slices."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_report(report_id: str) -> Any:
+    """Load a stored report by id."""
+    path = _report_path(report_id)
+    return _load(path, path.stat().st_mtime)
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """
+    Resolve an RFC 6901 JSON pointer such as "/audits/speed-index/score".
+
+    Raises:
+        KeyError: The pointer does not exist in the document
+    """
+    if pointer in ('', '/'):
+        return document
+    if not pointer.startswith('/'):
+        raise KeyError(f"JSON pointer must start with '/': {pointer}")
+
+    current = document
+    for token in pointer[1:].split('/'):
+        token = token.replace('~1', '/').replace('~0', '~')
+        if isinstance(current, dict) and token in current:
+            current = current[token]
+        elif isinstance(current, list) and token.isdigit() and int(token) < len(current):
+            current = current[int(token)]
+        else:
+            raise KeyError(f"{pointer} not found (at '{token}')")
+    return current
+
+
+def _outline(value: Any) -> Any:
+    """Shape of a value too large to return: keys and sizes, one level deep."""
+    if isinstance(value, dict):
+        return {key: f"{type(child).__name__} ({len(json.dumps(child))} bytes)" for key, child in value.items()}
+    if isinstance(value, list):
+        return f"list of {len(value)} items"
+    return f"{type(value).__name__} ({len(json.dumps(value))} bytes)"
+
+
+def report_slice(
+    report_id: str,
+    pointers: list[str] | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES
+) -> dict[str, Any]:
+    """
+    Fetch parts of a stored report (e.g. a full Lighthouse result) by JSON pointer.
+
+    Args:
+        report_id: Id returned by the audit (e.g. result["reportId"])
+        pointers: JSON pointers to fetch, e.g. ["/audits/largest-contentful-paint",
+            "/categories/performance/score"]. Omit to list the top-level keys.
+        max_bytes: Slices larger than this are replaced by an outline of their keys
+
+    Returns:
+        Dict with the value (or outline) for each pointer
+    """
+    try:
+        document = load_report(report_id)
+
+        if not pointers:
+            return {
+                'status': 'ok',
+                'reportId': report_id,
+                'outline': _outline(document),
+                'hint': 'Pass pointers such as "/audits" or "/categories/performance" to fetch slices'
+            }
+
+        slices: dict[str, Any] = {}
+        errors: dict[str, str] = {}
+        for pointer in pointers:
+            try:
+                value = resolve_pointer(document, pointer)
+            except KeyError as e:
+                errors[pointer] = str(e).strip("'\"")
+                continue
+
+            size = len(json.dumps(value))
+            if size > max_bytes:
+                slices[pointer] = {'truncated': True, 'bytes': size, 'outline': _outline(value)}
+            else:
+                slices[pointer] = value
+
+        return {
+            'status': 'ok' if slices else 'error',
+            'reportId': report_id,
+            'slices': slices,
+            'errors': errors
+        }
+
+    except (ValueError, FileNotFoundError) as e:
+        return {
+            'status': 'error',
+            'error': str(e),
+            'tool': 'report_slice'
+        }
+    except Exception as e:
+        logger.error(f"Report slice failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+            'tool': 'report_slice'
+        }
@@ -5,18 +5,41 @@ Responsive design audit tool.
 import json
 import logging
 import subprocess
-from pathlib import Path
 from typing import Any
 
+from .navigation import (
+    InterceptionProfile,
+    WaitStrategy,
+    total_request_counts,
+    validate_interception_profile,
+)
+from .node_runner import NodeToolError, run_node_tool
+
 logger = logging.getLogger(__name__)
 
-def responsive_audit(url: str, viewports: list[str] = None) -> dict[str, Any]:
+def responsive_audit(
+    url: str,
+    viewports: list[str] = None,
+    max_parallel: int | None = None,
+    share_network_cache: bool = True,
+    wait_for: WaitStrategy | None = None,
+    interception_profile: InterceptionProfile | None = None
+) -> dict[str, Any]:
     """
     Run responsive design audit across multiple viewports.
 
+    Viewports render at the same time in separate contexts of one browser.
+
     Args:
         url: The URL to audit
         viewports: List of viewport sizes (e.g., ["360x640", "768x1024"])
+        max_parallel: Viewports rendered at once (default RESPONSIVE_MAX_PARALLEL, 3)
+        share_network_cache: Download each stylesheet/script/image/font once
+            for all viewports instead of once per viewport
+        wait_for: Navigation wait strategy: load, domcontentloaded, networkidle,
+            lcp or dom-quiet (default NAVIGATION_WAIT)
+        interception_profile: Request interception profile: full, layout,
+            a11y-minimal or headers-only (default layout: everything but audio/video)
 
     Returns:
         Dict containing responsive audit results and screenshots
@@ -30,48 +53,43 @@ def responsive_audit(url: str, viewports: list[str] = None) -> dict[str, Any]:
         if viewports is None:
             viewports = ["360x640", "768x1024", "1280x800"]
 
-        # Get path to Node script
-        node_script = Path(__file__).parent.parent.parent / "node-tools" / "responsive.js"
+        if max_parallel is not None and max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        validate_interception_profile(interception_profile)
 
-        if not node_script.exists():
-            raise FileNotFoundError(f"Node script not found: {node_script}")
-
-        # Prepare command with viewports
-        cmd = ["node", str(node_script), url] + viewports
+        params = {
+            "url": url,
+            "viewports": viewports,
+            "shareCache": share_network_cache,
+            "waitFor": wait_for,
+            "interception": interception_profile
+        }
+        args = [url] + viewports
+        if max_parallel is not None:
+            params["maxParallel"] = max_parallel
+            args.append(f"--max-parallel={max_parallel}")
+        if not share_network_cache:
+            args.append("--no-shared-cache")
+        if wait_for:
+            args.append(f"--wait-for={wait_for}")
+        if interception_profile:
+            args.append(f"--interception={interception_profile}")
 
         logger.info(f"Running responsive audit for {url} with viewports: {viewports}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        raw_data = run_node_tool("responsive", "responsive.js", args, params, timeout=120)
 
-        if result.returncode != 0:
-            raise RuntimeError(f"Responsive audit failed: {result.stderr}")
-
-        # Parse JSON output
-        raw_data = json.loads(result.stdout)
-
-        # Calculate overall responsive score
-        summaries = raw_data.get('summaries', [])
-        total_issues = sum(
-            summary.get('overflowCount', 0) + summary.get('badTapTargets', 0)
-            for summary in summaries
-        )
-
-        # Simple scoring: fewer issues = higher score
-        responsive_score = max(0, 100 - (total_issues * 5))  # Deduct 5 points per issue
+        return _summarize_responsive(raw_data, url, viewports)
 
+    except (subprocess.TimeoutExpired, TimeoutError):
         return {
-            'status': 'ok',
-            'url': url,
-            'viewports': viewports,
-            'responsiveScore': round(responsive_score, 1),
-            'summaries': summaries,
-            'totalIssues': total_issues,
-            'raw': raw_data
+            'status': 'error',
+            'error': 'Responsive audit timed out after 120 seconds'
         }
-
-    except subprocess.TimeoutExpired:
+    except NodeToolError as e:
+        logger.error(f"Responsive audit failed: {e}")
         return {
             'status': 'error',
-            'error': 'Responsive audit timed out after 120 seconds'
+            'error': f'Responsive audit failed: {e}'
         }
     except json.JSONDecodeError as e:
         return {
@@ -83,4 +101,29 @@ def responsive_audit(url: str, viewports: list[str] = None) -> dict[str, Any]:
         return {
             'status': 'error',
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+
+def _summarize_responsive(raw_data: dict[str, Any], url: str, viewports: list[str]) -> dict[str, Any]:
+    """Score raw responsive results into the responsive_audit result format."""
+    # Calculate overall responsive score
+    summaries = raw_data.get('summaries', [])
+    total_issues = sum(
+        summary.get('overflowCount', 0) + summary.get('badTapTargets', 0)
+        for summary in summaries
+    )
+
+    # Simple scoring: fewer issues = higher score
+    responsive_score = max(0, 100 - (total_issues * 5))  # Deduct 5 points per issue
+
+    return {
+        'status': 'ok',
+        'url': url,
+        'viewports': viewports,
+        'responsiveScore': round(responsive_score, 1),
+        'summaries': summaries,
+        'totalIssues': total_issues,
+        'elapsedMs': raw_data.get('elapsedMs'),
+        'requests': total_request_counts([(summary.get('navigation') or {}).get('requests') for summary in summaries]),
+        'raw': raw_data
+    }
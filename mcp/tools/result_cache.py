@@ -0,0 +1,413 @@
+"""
+Result cache shared by the audit tools.
+
+Successful tool results are stored on disk under artifacts/cache/, keyed by
+the tool name, its normalized arguments and the version of the tool (its
+Python module, the node-tools scripts it runs and the Node package behind
+it). Entries expire after a TTL
+and the least recently used ones are evicted once the cache exceeds its
+entry or size cap. Wrapped tools gain a ``force_refresh`` argument.
+"""
+
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .http_client import get_http_client
+from .url_check import normalize_url
+
+logger = logging.getLogger(__name__)
+
+NODE_TOOLS_DIR = Path(__file__).parent.parent.parent / "node-tools"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / "artifacts" / "cache"
+
+# Node packages whose version changes a tool's output
+TOOL_PACKAGES: dict[str, list[str]] = {
+    'audit_lighthouse': ['lighthouse'],
+    'lighthouse_fast': ['lighthouse'],
+    'scan_axe': ['@axe-core/playwright', 'playwright'],
+    'responsive_audit': ['playwright'],
+    'security_headers': ['playwright'],
+    'audit_page': ['@axe-core/playwright', 'playwright'],
+    'quick_audit': ['@axe-core/playwright', 'playwright'],
+    'webhint_scan': ['hint']
+}
+
+# node-tools scripts each tool runs (directly or through worker.js)
+TOOL_SCRIPTS: dict[str, list[str]] = {
+    'audit_lighthouse': ['lighthouse-runner.js'],
+    'lighthouse_fast': ['lighthouse-runner.js'],
+    'scan_axe': ['axe-playwright.js'],
+    'responsive_audit': ['responsive.js'],
+    'security_headers': ['security-headers.js'],
+    'audit_page': ['audit-page.js'],
+    'quick_audit': ['axe-playwright.js', 'responsive.js', 'security-headers.js']
+}
+
+
+@dataclass
+class CacheConfig:
+    """Result cache limits, read from the environment by default."""
+    enabled: bool = True
+    ttl: float = 900.0
+    max_entries: int = 512
+    max_bytes: int = 200 * 1024 * 1024
+    directory: Path = DEFAULT_CACHE_DIR
+    validate: bool = False
+
+    @classmethod
+    def from_env(cls) -> "CacheConfig":
+        """Build a config from RESULT_CACHE_* environment variables."""
+        return cls(
+            enabled=os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true",
+            ttl=float(os.getenv("RESULT_CACHE_TTL", "900")),
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "200")) * 1024 * 1024,
+            directory=Path(os.getenv("RESULT_CACHE_DIR", str(DEFAULT_CACHE_DIR))),
+            validate=os.getenv("RESULT_CACHE_VALIDATE", "false").lower() == "true"
+        )
+
+
+@functools.cache
+def _package_version(package: str) -> str:
+    """Installed version of a node-tools dependency, or its declared range."""
+    installed = NODE_TOOLS_DIR / "node_modules" / package / "package.json"
+    try:
+        return json.loads(installed.read_text(encoding='utf-8'))['version']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    try:
+        manifest = json.loads((NODE_TOOLS_DIR / "package.json").read_text(encoding='utf-8'))
+        return manifest.get('dependencies', {}).get(package, 'unknown')
+    except (OSError, ValueError):
+        return 'unknown'
+
+
+def _node_scripts(name: str) -> list[Path]:
+    """A tool's node-tools scripts plus the worker and shared lib/ modules they load."""
+    scripts = TOOL_SCRIPTS.get(name)
+    if not scripts:
+        return []
+    shared = [NODE_TOOLS_DIR / "worker.js", *sorted((NODE_TOOLS_DIR / "lib").glob("*.js*"))]
+    return [NODE_TOOLS_DIR / script for script in scripts] + shared
+
+
+@functools.cache
+def tool_version(name: str, func: Callable[..., Any]) -> str:
+    """Fingerprint of a tool's implementation, its Node scripts and the Node packages it runs."""
+    digest = hashlib.sha256()
+    try:
+        digest.update(Path(inspect.getfile(inspect.unwrap(func))).read_bytes())
+    except (OSError, TypeError):
+        digest.update(getattr(func, '__qualname__', name).encode())
+    for script in _node_scripts(name):
+        try:
+            digest.update(script.name.encode() + script.read_bytes())
+        except OSError:
+            digest.update(f"{script.name}:missing".encode())
+    for package in TOOL_PACKAGES.get(name, []):
+        digest.update(f"{package}@{_package_version(package)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def content_validator(url: str, timeout: float = 5.0) -> str | None:
+    """
+    Cheap fingerprint of the current page content.
+
+    Uses the ETag or Last-Modified header from a HEAD request, falling back
+    to a hash of the response body. Returns None if the page is unreachable.
+    """
+    try:
+        client = get_http_client()
+        response = client.head(url, timeout=timeout)
+        for header in ('etag', 'last-modified'):
+            if response.headers.get(header):
+                return f"{header}:{response.headers[header]}"
+        response = client.get(url, timeout=timeout)
+        return f"sha256:{hashlib.sha256(response.content).hexdigest()}"
+    except httpx.HTTPError as e:
+        logger.debug(f"Content validator unavailable for {url}: {e}")
+        return None
+
+
+def _normalize_value(key: str, value: Any) -> Any:
+    """Canonical form of one argument for the cache key."""
+    if key == 'url' and isinstance(value, str):
+        return normalize_url(value) or value
+    if isinstance(value, list | tuple) and key in ('tools', 'extra_tools', 'categories', 'checks'):
+        return sorted(value)
+    return value
+
+
+def cache_key(
+    name: str,
+    func: Callable[..., Any],
+    args: tuple,
+    kwargs: dict[str, Any],
+    validator: str | None = None
+) -> str:
+    """
+    Build the cache key for one call.
+
+    Arguments are bound to the tool's signature with defaults applied, so
+    positional, keyword and omitted-default calls share an entry.
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    payload = {
+        'tool': name,
+        'version': tool_version(name, func),
+        'args': {key: _normalize_value(key, value) for key, value in bound.arguments.items()},
+        'validator': validator
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """Disk-backed TTL + LRU store for tool results."""
+
+    def __init__(self, config: CacheConfig | None = None):
+        self.config = config or CacheConfig.from_env()
+        self._lock = threading.Lock()
+        # key -> [lock, callers holding or waiting for it]
+        self._key_locks: dict[str, list] = {}
+        # key -> (size in bytes, last access); ordered oldest access first
+        self._index: collections.OrderedDict[str, tuple[int, float]] = collections.OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._loaded = False
+
+    def _path(self, key: str) -> Path:
+        return self.config.directory / f"{key}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files on disk (once per process)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.config.directory.exists():
+            return
+
+        entries = []
+        for path in self.config.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for mtime, key, size in sorted(entries):
+            self._index[key] = (size, mtime)
+            self._bytes += size
+
+    def get(self, key: str) -> tuple[dict[str, Any], float] | None:
+        """Return (result, age in seconds) for a fresh entry, or None."""
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self._misses += 1
+                return None
+
+        try:
+            entry = json.loads(self._path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self._forget(key)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        age = time.time() - entry['createdAt']
+        if age > self.config.ttl:
+            self._forget(key)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        now = time.time()
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+
+        with self._lock:
+            self._hits += 1
+            if key in self._index:
+                self._index[key] = (self._index[key][0], now)
+                self._index.move_to_end(key)
+
+        return entry['result'], age
+
+    def put(self, key: str, tool: str, result: dict[str, Any]):
+        """Store a result and evict old entries beyond the caps."""
+        data = json.dumps({'tool': tool, 'createdAt': time.time(), 'result': result}, default=str)
+        size = len(data.encode('utf-8'))
+        if size > self.config.max_bytes:
+            logger.info(f"Not caching {tool} result: {size} bytes exceeds the cache size cap")
+            return
+
+        self.config.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path(key).with_suffix('.tmp')
+        tmp_path.write_text(data, encoding='utf-8')
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._bytes -= self._index[key][0]
+            self._index[key] = (size, time.time())
+            self._index.move_to_end(key)
+            self._bytes += size
+            evicted = self._evict_locked()
+
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def _evict_locked(self) -> list[str]:
+        evicted = []
+        while self._index and (
+            len(self._index) > self.config.max_entries or self._bytes > self.config.max_bytes
+        ):
+            old_key, (size, _) = self._index.popitem(last=False)
+            self._bytes -= size
+            evicted.append(old_key)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} cached results")
+        return evicted
+
+    def _forget(self, key: str):
+        with self._lock:
+            if key in self._index:
+                self._bytes -= self._index.pop(key)[0]
+        self._path(key).unlink(missing_ok=True)
+
+    @contextmanager
+    def key_lock(self, key: str) -> Iterator[None]:
+        """Serialize identical calls so only one of them runs the tool; the lock is dropped once unused."""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def clear(self):
+        """Remove every cached result."""
+        with self._lock:
+            self._load_index()
+            keys = list(self._index)
+            self._index.clear()
+            self._bytes = 0
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Cache status for health_check."""
+        with self._lock:
+            self._load_index()
+            return {
+                'enabled': self.config.enabled,
+                'entries': len(self._index),
+                'sizeMb': round(self._bytes / (1024 * 1024), 2),
+                'hits': self._hits,
+                'misses': self._misses,
+                'ttlSeconds': self.config.ttl,
+                'directory': str(self.config.directory)
+            }
+
+
+def cached_tool(
+    func: Callable[..., dict[str, Any]],
+    cache: "ResultCache | None" = None
+) -> Callable[..., dict[str, Any]]:
+    """
+    Wrap a tool so repeated calls with the same arguments reuse its result.
+
+    With RESULT_CACHE_VALIDATE=true the key also includes the page's ETag,
+    Last-Modified or body hash, so a changed page misses the cache.
+
+    The wrapper keeps the tool's name, docstring and signature (plus a
+    ``force_refresh`` parameter) so it can be registered with FastMCP as is.
+    Only results with status 'ok' are cached; hits gain a 'cache' entry.
+    """
+    name = func.__name__
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, force_refresh: bool = False, **kwargs) -> dict[str, Any]:
+        store = cache or get_result_cache()
+        if not store.config.enabled:
+            return func(*args, **kwargs)
+
+        try:
+            validator = None
+            if store.config.validate:
+                bound = signature.bind(*args, **kwargs)
+                url = bound.arguments.get('url')
+                validator = content_validator(url) if isinstance(url, str) else None
+            key = cache_key(name, func, args, kwargs, validator)
+        except TypeError:
+            # Let the tool report bad arguments itself
+            return func(*args, **kwargs)
+
+        with store.key_lock(key):
+            if not force_refresh:
+                hit = store.get(key)
+                if hit is not None:
+                    result, age = hit
+                    logger.info(f"{name}: served from cache ({age:.0f}s old)")
+                    result['cache'] = {'hit': True, 'ageSeconds': round(age, 1), 'key': key[:12]}
+                    return result
+
+            result = func(*args, **kwargs)
+            if isinstance(result, dict) and result.get('status') == 'ok':
+                try:
+                    store.put(key, name, result)
+                except (OSError, TypeError, ValueError) as e:
+                    logger.warning(f"{name}: could not cache result: {e}")
+            return result
+
+    force_param = inspect.Parameter(
+        'force_refresh', inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool
+    )
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), force_param]
+    )
+    wrapper.__annotations__ = {**func.__annotations__, 'force_refresh': bool}
+    wrapper.__doc__ = (func.__doc__ or '').rstrip() + (
+        "\n\n    Results are cached; pass force_refresh=True to re-run the audit.\n"
+    )
+    return wrapper
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
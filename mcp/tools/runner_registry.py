@@ -0,0 +1,189 @@
+"""
+Process-wide registry of external runners (node, npx, lighthouse, hint...).
+
+Each runner is located and version-probed once, then served from memory.
+A cached entry is reused until PATH changes, the resolved executable or the
+node-tools package it comes from is modified, or (for failed probes) a
+short retry delay passes, so audits never pay for a version subprocess.
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+NODE_TOOLS_DIR = Path(__file__).parent.parent.parent / "node-tools"
+
+# Failed probes are retried after this many seconds
+FAILED_PROBE_RETRY = 300.0
+
+
+@dataclass(frozen=True)
+class RunnerSpec:
+    """How to find and version one external runner."""
+    name: str
+    executables: tuple[str, ...]
+    npx_package: str | None = None
+    node_package: str | None = None
+    version_flag: str = "--version"
+    probe_timeout: float = 30.0
+
+
+RUNNERS: dict[str, RunnerSpec] = {
+    spec.name: spec for spec in (
+        RunnerSpec("node", ("node",), probe_timeout=5),
+        RunnerSpec("npm", ("npm",), probe_timeout=5),
+        RunnerSpec("npx", ("npx",), probe_timeout=5),
+        RunnerSpec("python", ("python", "python3"), probe_timeout=5),
+        RunnerSpec("lighthouse", ("lighthouse",), npx_package="lighthouse", node_package="lighthouse"),
+        RunnerSpec("webhint", ("hint",), npx_package="hint", node_package="hint")
+    )
+}
+
+
+@dataclass
+class RunnerInfo:
+    """Resolved location and version of a runner."""
+    name: str
+    available: bool
+    command: list[str] = field(default_factory=list)
+    uses_npx: bool = False
+    path: str | None = None
+    version: str | None = None
+    error: str | None = None
+    probed_at: float = field(default_factory=time.time)
+    probe_ms: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _which(executable: str) -> str | None:
+    """Find an executable, preferring the .cmd shim on Windows."""
+    if os.name == "nt":
+        return shutil.which(f"{executable}.cmd") or shutil.which(executable)
+    return shutil.which(executable)
+
+
+def _mtime(path: str | Path | None) -> float | None:
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+
+def _node_package_version(package: str) -> tuple[str | None, Path]:
+    """Version of a package installed in node-tools, read from its package.json."""
+    manifest = NODE_TOOLS_DIR / "node_modules" / package / "package.json"
+    try:
+        return json.loads(manifest.read_text(encoding='utf-8')).get('version'), manifest
+    except (OSError, ValueError):
+        return None, manifest
+
+
+class RunnerRegistry:
+    """Caches runner resolution and version probes for the whole process."""
+
+    def __init__(self, specs: dict[str, RunnerSpec] | None = None):
+        self.specs = specs or RUNNERS
+        self._entries: dict[str, tuple[tuple, RunnerInfo]] = {}
+        self._locks = {name: threading.Lock() for name in self.specs}
+        self._stats = {'hits': 0, 'probes': 0}
+
+    def resolve(self, name: str) -> RunnerInfo:
+        """Return the runner's info, probing only when the cached entry is stale."""
+        spec = self.specs[name]
+        with self._locks[name]:
+            path = next((found for exe in spec.executables if (found := _which(exe))), None)
+            npx = _which("npx") if spec.npx_package and not path else None
+            _, manifest = _node_package_version(spec.node_package) if spec.node_package else (None, None)
+            fingerprint = (os.environ.get("PATH", ""), path, _mtime(path), npx, _mtime(manifest))
+
+            cached = self._entries.get(name)
+            if cached and cached[0] == fingerprint:
+                info = cached[1]
+                if info.available or time.time() - info.probed_at < FAILED_PROBE_RETRY:
+                    self._stats['hits'] += 1
+                    return info
+
+            info = self._probe(spec, path, npx)
+            self._entries[name] = (fingerprint, info)
+            self._stats['probes'] += 1
+            return info
+
+    def probe_all(self) -> dict[str, RunnerInfo]:
+        """Resolve every known runner (used to warm the cache at startup)."""
+        return {name: self.resolve(name) for name in self.specs}
+
+    def invalidate(self, name: str | None = None):
+        """Drop cached entries so the next resolve probes again."""
+        for key in [name] if name else list(self._entries):
+            self._entries.pop(key, None)
+
+    def describe(self) -> dict[str, Any]:
+        """Cached runner state for health_check, without probing anything."""
+        return {
+            'runners': {name: info.to_dict() for name, (_, info) in self._entries.items()},
+            'stats': dict(self._stats)
+        }
+
+    def _probe(self, spec: RunnerSpec, path: str | None, npx: str | None) -> RunnerInfo:
+        started = time.monotonic()
+
+        if path:
+            command, uses_npx = [path], False
+        elif npx:
+            command, uses_npx = [npx, "-y", spec.npx_package], True
+        else:
+            return RunnerInfo(spec.name, available=False, error=f"{spec.executables[0]} not found in PATH")
+
+        version = None
+        if uses_npx and spec.node_package:
+            # node-tools already has the package: no need to ask npx
+            version, _ = _node_package_version(spec.node_package)
+
+        error = None
+        if version is None:
+            version_cmd = command + (["--", spec.version_flag] if uses_npx else [spec.version_flag])
+            try:
+                result = subprocess.run(version_cmd, capture_output=True, text=True, timeout=spec.probe_timeout)
+                if result.returncode == 0:
+                    version = (result.stdout or result.stderr).strip().split('\n')[0]
+                else:
+                    error = (result.stderr or result.stdout).strip()[:500] or f"exit code {result.returncode}"
+            except (OSError, subprocess.TimeoutExpired) as e:
+                error = str(e)
+
+        info = RunnerInfo(
+            spec.name,
+            available=version is not None,
+            command=command,
+            uses_npx=uses_npx,
+            path=path or npx,
+            version=version,
+            error=error,
+            probe_ms=round((time.monotonic() - started) * 1000)
+        )
+        logger.info(f"Resolved {spec.name}: {' '.join(command)} ({version or error})")
+        return info
+
+
+_registry: RunnerRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_runner_registry() -> RunnerRegistry:
+    """Get the process-wide runner registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = RunnerRegistry()
+        return _registry
@@ -0,0 +1,204 @@
+"""
+Screenshot storage for the cdp_* tools.
+
+take_screenshot writes the image to a scratch file in the artifact store,
+which is moved into place. Servers that return it as base64 image content
+instead are decoded in fixed-size slices into a scratch file, so the decoded
+bytes are never held in memory next to the base64 text. Callers get a path,
+dimensions and the content hash instead of the image data.
+
+Thumbnails and JPEG/WebP variants are rendered on request when the optional
+Pillow package is installed (``pip install Pillow``).
+"""
+
+import base64
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Any, Literal
+
+from .artifact_store import get_artifact_store
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:  # Optional: variants are unavailable without it
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Base64 characters read per slice
+DECODE_CHUNK = 4 * 256 * 1024
+
+VARIANT_QUALITY = int(os.getenv("SCREENSHOT_VARIANT_QUALITY", "80"))
+
+VariantFormat = Literal["jpeg", "webp"]
+
+
+def store_base64_image(data: str, kind: str) -> dict[str, Any]:
+    """
+    Decode a base64 image straight into the artifact store.
+
+    Accepts a data: URL and line-wrapped base64. Whitespace is dropped per
+    slice and the characters past the last full 4-character group are carried
+    into the next slice, so slices never split a group.
+
+    Returns:
+        Artifact reference plus width, height and sha256
+
+    Raises:
+        ValueError: If the data is not valid base64
+    """
+    store = get_artifact_store()
+    tmp = store.temp_path()
+    # Skip a "data:image/png;base64," prefix without copying the payload
+    begin = data.find(',', 0, 256) + 1 if data.startswith('data:') else 0
+    carry = ''
+    try:
+        with open(tmp, 'wb') as f:
+            for start in range(begin, len(data), DECODE_CHUNK):
+                piece = carry + ''.join(data[start:start + DECODE_CHUNK].split())
+                usable = len(piece) - len(piece) % 4
+                f.write(base64.b64decode(piece[:usable], validate=True))
+                carry = piece[usable:]
+        if carry:
+            raise ValueError("Base64 image data is truncated")
+    except (ValueError, OSError):
+        tmp.unlink(missing_ok=True)
+        raise
+    return _store_image(tmp, kind)
+
+
+def store_image_file(source: str | Path, kind: str) -> dict[str, Any]:
+    """Move an image chrome-devtools-mcp wrote to a store scratch path into the artifact store."""
+    return _store_image(Path(source), kind)
+
+
+def image_variants(
+    stored: dict[str, Any],
+    kind: str,
+    thumbnail_width: int | None = None,
+    formats: list[VariantFormat] | None = None
+) -> list[dict[str, Any]]:
+    """
+    Render a downscaled thumbnail and/or re-encoded copies of a stored image.
+
+    Args:
+        stored: Reference returned by store_base64_image / store_image_file
+        kind: Artifact kind of the source; variants use "<kind>-<variant>"
+        thumbnail_width: Width of a PNG thumbnail (aspect ratio kept)
+        formats: Full-size re-encodings to produce ("jpeg", "webp")
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+    """
+    if not thumbnail_width and not formats:
+        return []
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Screenshot variants require Pillow: pip install Pillow")
+
+    store = get_artifact_store()
+    variants = []
+    with Image.open(stored['path']) as source:
+        if thumbnail_width:
+            thumbnail = source.copy()
+            thumbnail.thumbnail((thumbnail_width, source.height))
+            variants.append(_save_variant(store, thumbnail, stored, f"{kind}-thumbnail", "png", "PNG", {}))
+
+        for fmt in formats or []:
+            if fmt == "jpeg":
+                # JPEG has no alpha channel
+                variants.append(_save_variant(
+                    store, source.convert('RGB'), stored, f"{kind}-jpeg", "jpg", "JPEG", {'quality': VARIANT_QUALITY}
+                ))
+            elif fmt == "webp":
+                variants.append(_save_variant(
+                    store, source, stored, f"{kind}-webp", "webp", "WEBP", {'quality': VARIANT_QUALITY}
+                ))
+            else:
+                raise ValueError(f"Unknown screenshot format: {fmt}. Use 'jpeg' or 'webp'")
+    return variants
+
+
+def image_format(header: bytes) -> str | None:
+    """File extension for a PNG, JPEG or WebP header."""
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header.startswith(b'\xff\xd8'):
+        return 'jpg'
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def image_size(header: bytes) -> tuple[int | None, int | None]:
+    """Width and height from a PNG, JPEG or WebP file header (None when unknown)."""
+    fmt = image_format(header)
+    if fmt == 'png' and len(header) >= 24:
+        return struct.unpack('>II', header[16:24])
+    if fmt == 'webp':
+        if header[12:16] == b'VP8X' and len(header) >= 30:
+            width = int.from_bytes(header[24:27], 'little') + 1
+            height = int.from_bytes(header[27:30], 'little') + 1
+            return width, height
+        if header[12:16] == b'VP8 ' and len(header) >= 30:
+            width, height = struct.unpack('<HH', header[26:30])
+            return width & 0x3fff, height & 0x3fff
+    if fmt == 'jpg':
+        return _jpeg_size(header)
+    return None, None
+
+
+def _jpeg_size(header: bytes) -> tuple[int | None, int | None]:
+    """Scan JPEG segments for the start-of-frame marker."""
+    pos = 2
+    while pos + 9 <= len(header):
+        if header[pos] != 0xff:
+            return None, None
+        marker = header[pos + 1]
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            height, width = struct.unpack('>HH', header[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + struct.unpack('>H', header[pos + 2:pos + 4])[0]
+    return None, None
+
+
+def _store_image(tmp: Path, kind: str) -> dict[str, Any]:
+    with open(tmp, 'rb') as f:
+        header = f.read(64 * 1024)
+    ext = image_format(header) or 'png'
+    width, height = image_size(header)
+
+    ref = get_artifact_store().put_file(tmp, kind=kind, ext=ext, meta={'width': width, 'height': height})
+    return {
+        'path': ref['path'],
+        'sha256': ref['id'],
+        'bytes': ref['bytes'],
+        'width': width,
+        'height': height,
+        'format': ext
+    }
+
+
+def _save_variant(
+    store,
+    image,
+    source: dict[str, Any],
+    kind: str,
+    ext: str,
+    pil_format: str,
+    options: dict[str, Any]
+) -> dict[str, Any]:
+    tmp = store.temp_path(f".{ext}")
+    image.save(tmp, pil_format, **options)
+    ref = store.put_file(tmp, kind=kind, ext=ext, meta={'source': source['sha256']})
+    return {
+        'kind': kind.rsplit('-', 1)[-1],
+        'path': ref['path'],
+        'sha256': ref['id'],
+        'bytes': ref['bytes'],
+        'width': image.width,
+        'height': image.height,
+        'format': ext
+    }
@@ -1,22 +1,58 @@
 """
 Security headers analysis tool.
+
+Headers are fetched over a pooled HTTP client; the Playwright path
+(node-tools/security-headers.js) is only used when the direct fetch fails
+or is answered by bot protection that a real browser may get past.
 """
 
 import json
 import logging
-import re
+import os
 import subprocess
-from pathlib import Path
-from typing import Any
+import time
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+import httpx
+
+from .header_grading import grade_headers
+from .http_client import get_http_client
+from .navigation import InterceptionProfile, validate_interception_profile
+from .node_runner import NodeToolError, run_node_tool
 
 logger = logging.getLogger(__name__)
 
-def security_headers(url: str) -> dict[str, Any]:
+SecurityHeadersMode = Literal["auto", "http", "browser"]
+
+# Bot protection and rate limiting answer with these; a browser often gets the real page
+CHALLENGE_STATUSES = {403, 429, 503}
+
+# Headers scored by the raw analysis (same checks as security-headers.js)
+SECURITY_HEADERS = (
+    'content-security-policy',
+    'strict-transport-security',
+    'x-frame-options',
+    'x-content-type-options',
+    'referrer-policy',
+    'permissions-policy'
+)
+
+
+def security_headers(
+    url: str,
+    interception_profile: InterceptionProfile | None = None,
+    mode: SecurityHeadersMode | None = None
+) -> dict[str, Any]:
     """
     Analyze security headers for the specified URL.
 
     Args:
         url: The URL to analyze
+        interception_profile: Request interception profile for the browser path: full,
+            layout, a11y-minimal or headers-only (default headers-only: the main document only)
+        mode: auto (direct HTTP fetch, browser when it fails or hits a bot challenge),
+            http (direct fetch only) or browser (default SECURITY_HEADERS_MODE or auto)
 
     Returns:
         Dict containing security header analysis
@@ -25,69 +61,47 @@ def security_headers(url: str) -> dict[str, Any]:
         # Validate URL
         if not url.startswith(('http://', 'https://')):
             raise ValueError("URL must start with http:// or https://")
-
-        # Get path to Node script
-        node_script = Path(__file__).parent.parent.parent / "node-tools" / "security-headers.js"
-
-        if not node_script.exists():
-            raise FileNotFoundError(f"Node script not found: {node_script}")
+        validate_interception_profile(interception_profile)
+        mode = mode or os.getenv("SECURITY_HEADERS_MODE", "auto")
+        if mode not in ("auto", "http", "browser"):
+            raise ValueError(f"Unknown mode: {mode}. Use one of: auto, http, browser")
+
+        fallback_reason = None
+        if mode != "browser":
+            logger.info(f"Fetching security headers for {url}")
+            try:
+                raw_data = _fetch_headers(url)
+            except httpx.HTTPError as e:
+                if _is_connection_refused(str(e)):
+                    logger.warning(f"Security headers analysis connection refused for {url}")
+                    return _connection_refused(url, str(e))
+                if mode == "http":
+                    raise RuntimeError(f"Security headers fetch failed: {e}") from e
+                fallback_reason = f"{type(e).__name__}: {e}"
+            else:
+                fallback_reason = _needs_browser(raw_data)
+                if fallback_reason is None or mode == "http":
+                    return _summarize_security_headers(raw_data, url)
+            logger.info(f"Falling back to the browser for {url}: {fallback_reason}")
 
         # Run security headers analysis via Node script
-        cmd = ["node", str(node_script), url]
-
         logger.info(f"Running security headers analysis for {url}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-        if result.returncode != 0:
-            error_info = _parse_error_output(result)
-
+        try:
+            args = [url] + ([f"--interception={interception_profile}"] if interception_profile else [])
+            params = {"url": url, "interception": interception_profile}
+            raw_data = run_node_tool("securityHeaders", "security-headers.js", args, params, timeout=30)
+        except NodeToolError as e:
             # Handle common network errors gracefully
-            error_message = error_info.get("error_message", "Security headers analysis failed")
-            if _is_connection_refused(error_message):
+            if _is_connection_refused(e.message):
                 logger.warning(f"Security headers analysis connection refused for {url}")
-                return {
-                    'status': 'error',
-                    'error': 'Connection refused - server not reachable',
-                    'url': url,
-                    'code': 'CONNECTION_REFUSED',
-                    'suggestion': (
-                        "Make sure your development server is running and reachable at the given URL. "
-                        "If it runs on a different port, pass the correct URL."
-                    ),
-                    'details': error_info.get("details")
-                }
-
-            raise RuntimeError(f"Security headers analysis failed: {error_message}")
-
-        # Parse JSON output
-        raw_data = json.loads(result.stdout)
-
-        # Extract security flags
-        headers = raw_data.get('headers', {})
-
-        security_analysis = {
-            'csp': bool(headers.get('content-security-policy')),
-            'hsts': bool(headers.get('strict-transport-security')),
-            'xfo': bool(headers.get('x-frame-options')),
-            'xcto': bool(headers.get('x-content-type-options')),
-            'referrer': bool(headers.get('referrer-policy')),
-            'permissions': bool(headers.get('permissions-policy') or headers.get('feature-policy'))
-        }
+                return _connection_refused(url, e.details)
 
-        # Calculate security score (0-100)
-        total_checks = len(security_analysis)
-        passed_checks = sum(security_analysis.values())
-        security_score = (passed_checks / total_checks) * 100 if total_checks > 0 else 0
+            raise RuntimeError(f"Security headers analysis failed: {e.message}") from e
 
-        return {
-            'status': 'ok',
-            'url': url,
-            'securityScore': round(security_score, 1),
-            'headers': security_analysis,
-            'raw': raw_data
-        }
+        raw_data['fetch'] = {'mode': 'browser', 'fallbackReason': fallback_reason}
+        return _summarize_security_headers(raw_data, url)
 
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, TimeoutError):
         return {
             'status': 'error',
             'error': 'Security headers analysis timed out after 30 seconds'
@@ -105,43 +119,110 @@ def security_headers(url: str) -> dict[str, Any]:
         }
 
 
-def _parse_error_output(result: subprocess.CompletedProcess) -> dict[str, Any]:
-    """Parse stderr/stdout from the Node script into a structured error."""
-    raw_stderr = (result.stderr or "").strip()
-    raw_stdout = (result.stdout or "").strip()
+def _fetch_headers(url: str) -> dict[str, Any]:
+    """
+    Fetch the main document's headers over the pooled client.
+
+    Only the headers are read; the body is never downloaded. Returns the same
+    raw structure as security-headers.js plus a ``fetch`` section with the
+    status, protocol and redirect chain.
+    """
+    started = time.monotonic()
+    with get_http_client().stream("GET", url) as response:
+        headers = {name: value for name, value in response.headers.items() if name != 'set-cookie'}
+        cookies = response.headers.get_list('set-cookie')
+        if cookies:
+            # Same joining as Playwright's response.headers()
+            headers['set-cookie'] = '\n'.join(cookies)
+
+        raw_data = _build_header_analysis(url, headers)
+        raw_data['fetch'] = {
+            'mode': 'http',
+            'status': response.status_code,
+            'httpVersion': response.http_version,
+            'finalUrl': str(response.url),
+            'redirects': [
+                {'url': str(hop.url), 'status': hop.status_code, 'location': hop.headers.get('location')}
+                for hop in response.history
+            ],
+            'ms': round((time.monotonic() - started) * 1000)
+        }
+    return raw_data
 
-    payload = raw_stderr or raw_stdout
-    parsed: dict[str, Any] = {}
 
-    if payload:
-        try:
-            parsed_json = json.loads(payload)
-            if isinstance(parsed_json, dict):
-                parsed = parsed_json
-        except json.JSONDecodeError:
-            # Some tools include ANSI codes; strip them for readability
-            cleaned = _strip_ansi(payload)
-            parsed = {"error": cleaned}
+def _build_header_analysis(url: str, headers: dict[str, str]) -> dict[str, Any]:
+    """Python port of buildHeaderAnalysis() in security-headers.js."""
+    security = {name: bool(headers.get(name)) for name in SECURITY_HEADERS}
+    security['permissions-policy'] = bool(headers.get('permissions-policy') or headers.get('feature-policy'))
+    return {
+        'url': url,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'headers': headers,
+        'security': security,
+        'securityScore': sum(security.values()) / len(security) * 100
+    }
 
-    error_message = parsed.get("error") if isinstance(parsed, dict) else None
 
-    if not error_message and payload:
-        error_message = _strip_ansi(payload)
+def _needs_browser(raw_data: dict[str, Any]) -> str | None:
+    """Why a direct fetch cannot be trusted for this page, or None."""
+    status = raw_data['fetch']['status']
+    if raw_data['headers'].get('cf-mitigated') == 'challenge':
+        return 'bot challenge'
+    if status in CHALLENGE_STATUSES:
+        return f"HTTP {status}"
+    return None
 
-    details: dict[str, Any] = {}
-    if isinstance(parsed, dict):
-        details = parsed
 
+def _connection_refused(url: str, details: Any) -> dict[str, Any]:
+    """Error result for a server that refused the connection."""
     return {
-        "error_message": error_message or "Unknown error",
-        "details": details or None
+        'status': 'error',
+        'error': 'Connection refused - server not reachable',
+        'url': url,
+        'code': 'CONNECTION_REFUSED',
+        'suggestion': (
+            "Make sure your development server is running and reachable at the given URL. "
+            "If it runs on a different port, pass the correct URL."
+        ),
+        'details': details
     }
 
 
-def _strip_ansi(text: str) -> str:
-    """Remove ANSI escape codes from error output."""
-    ansi_escape = re.compile(r'\x1B\[[0-9;]*[mK]')
-    return ansi_escape.sub('', text)
+def _summarize_security_headers(raw_data: dict[str, Any], url: str) -> dict[str, Any]:
+    """Turn raw header analysis into the security_headers result format."""
+    # Extract security flags
+    headers = raw_data.get('headers', {})
+
+    security_analysis = {
+        'csp': bool(headers.get('content-security-policy')),
+        'hsts': bool(headers.get('strict-transport-security')),
+        'xfo': bool(headers.get('x-frame-options')),
+        'xcto': bool(headers.get('x-content-type-options')),
+        'referrer': bool(headers.get('referrer-policy')),
+        'permissions': bool(headers.get('permissions-policy') or headers.get('feature-policy'))
+    }
+
+    # Calculate security score (0-100)
+    total_checks = len(security_analysis)
+    passed_checks = sum(security_analysis.values())
+    security_score = (passed_checks / total_checks) * 100 if total_checks > 0 else 0
+
+    # Grade what the headers actually allow; HSTS applies to where redirects ended up
+    final_url = (raw_data.get('fetch') or {}).get('finalUrl') or url
+    grading = grade_headers(headers, final_url)
+
+    return {
+        'status': 'ok',
+        'url': url,
+        'securityScore': round(security_score, 1),
+        'headers': security_analysis,
+        'grade': grading['grade'],
+        'gradeScore': grading['score'],
+        'analysis': grading,
+        'mode': (raw_data.get('fetch') or {}).get('mode', 'browser'),
+        'requests': (raw_data.get('navigation') or {}).get('requests'),
+        'raw': raw_data
+    }
 
 
 def _is_connection_refused(message: str | None) -> bool:
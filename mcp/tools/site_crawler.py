@@ -0,0 +1,530 @@
+"""
+Site-wide crawl and audit with a persistent, resumable frontier.
+
+Pages are seeded from sitemap.xml and/or a start URL, deduplicated after
+URL normalization, and audited through the batch scheduler. Crawl state
+lives in a SQLite file under artifacts/crawls/, so an interrupted crawl
+resumes where it stopped and each call audits up to max_pages new pages.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from .batch_audit import BATCH_TOOLS, run_batch
+from .http_client import get_http_client
+from .orchestrator import run_coroutine_sync
+from .report_merge import report_merge
+from .url_check import normalize_url
+
+logger = logging.getLogger(__name__)
+
+CRAWLS_DIR = Path(__file__).parent.parent.parent / "artifacts" / "crawls"
+
+DEFAULT_TOOLS = ['security_headers', 'scan_axe', 'lighthouse_fast']
+USER_AGENT = "MCP-Auditor/1.0 (+site crawler)"
+
+# Per-request options on the shared HTTP client
+REQUEST_OPTIONS = {'headers': {'User-Agent': USER_AGENT}, 'timeout': 15.0}
+
+# Links to these resources are never audited as pages
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+    '.css', '.js', '.json', '.xml', '.mp4', '.mp3', '.woff', '.woff2', '.ttf'
+)
+
+MAX_HTML_BYTES = 5 * 1024 * 1024
+MAX_CHILD_SITEMAPS = 50
+
+
+class _LinkExtractor(HTMLParser):
+    """Collect followable <a href> targets, honouring <base href>."""
+
+    def __init__(self, page_url: str):
+        super().__init__()
+        self.base = page_url
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        values = dict(attrs)
+        if tag == 'base' and values.get('href'):
+            self.base = urljoin(self.base, values['href'])
+        elif tag == 'a' and values.get('href'):
+            if 'nofollow' not in (values.get('rel') or '').lower():
+                self.links.append(urljoin(self.base, values['href']))
+
+
+class CrawlState:
+    """
+    SQLite-backed frontier and result store for one crawl.
+
+    The crawl loop may run on a helper thread (see run_coroutine_sync), so
+    the connection is shared across threads and every access holds a lock.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                source TEXT,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS frontier_status ON frontier (status, depth);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                completed_at REAL
+            );
+        """)
+
+    def get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def add(self, urls: list[str], depth: int, source: str) -> int:
+        """Add URLs to the frontier, ignoring ones already seen. Returns how many were new."""
+        with self._lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO frontier (url, depth, source, updated_at) VALUES (?, ?, ?, ?)",
+                [(url, depth, source, time.time()) for url in urls]
+            )
+            return self.db.total_changes - before
+
+    def claim(self, limit: int) -> list[tuple[str, int]]:
+        """Mark up to limit pending URLs as in progress, shallowest first."""
+        with self._lock, self.db:
+            rows = self.db.execute(
+                "SELECT url, depth FROM frontier WHERE status = 'pending' ORDER BY depth, rowid LIMIT ?",
+                (limit,)
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE frontier SET status = 'in_progress', updated_at = ? WHERE url = ?",
+                [(time.time(), url) for url, _ in rows]
+            )
+        return rows
+
+    def complete(self, url: str, status: str, results: dict[str, Any] | None = None):
+        """Record a page as done, failed or skipped, with its compacted results."""
+        with self._lock, self.db:
+            self.db.execute(
+                "UPDATE frontier SET status = ?, updated_at = ? WHERE url = ?",
+                (status, time.time(), url)
+            )
+            if results is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO results (url, results, completed_at) VALUES (?, ?, ?)",
+                    (url, json.dumps(results), time.time())
+                )
+
+    def requeue_interrupted(self) -> int:
+        """Return pages left in progress by a crashed run to the frontier."""
+        with self._lock, self.db:
+            return self.db.execute(
+                "UPDATE frontier SET status = 'pending' WHERE status = 'in_progress'"
+            ).rowcount
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall()
+        return dict(rows)
+
+    def iter_results(self):
+        with self._lock:
+            rows = self.db.execute("SELECT url, results FROM results ORDER BY completed_at").fetchall()
+        for url, results in rows:
+            yield url, json.loads(results)
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+class HostPoliteness:
+    """Space out requests to the same host by a fixed delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._next_slot: dict[str, float] = {}
+
+    async def wait(self, host: str):
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+@dataclass
+class CrawlConfig:
+    """Limits for one crawl run."""
+    tools: list[str]
+    allowed_hosts: set[str]
+    max_pages: int = 50
+    max_depth: int = 2
+    delay: float = 1.0
+    concurrency: int = 2
+    respect_robots: bool = True
+    tool_timeout: float = 180
+    incremental: bool = False
+    robots: dict[str, RobotFileParser | None] = field(default_factory=dict)
+
+
+def crawl_audit(
+    start_url: str,
+    tools: list[str] | None = None,
+    sitemap_url: str | None = None,
+    max_pages: int = 50,
+    max_depth: int = 2,
+    allowed_hosts: list[str] | None = None,
+    delay: float = 1.0,
+    concurrency: int = 2,
+    respect_robots: bool = True,
+    crawl_id: str | None = None,
+    restart: bool = False,
+    budgets: dict[str, Any] | None = None,
+    incremental: bool = False
+) -> dict[str, Any]:
+    """
+    Crawl a site and audit every discovered page.
+
+    Calling again with the same start_url, tools and scope (max_depth,
+    allowed_hosts, sitemap_url, respect_robots), or the same crawl_id, resumes
+    the crawl, auditing up to max_pages pages that have not been audited yet.
+    Resuming a crawl_id with a different scope is refused unless restart=True.
+
+    Args:
+        start_url: Page to start from; its host is the default allowed host
+        tools: Tools to run per page (default: security_headers, scan_axe, lighthouse_fast)
+        sitemap_url: Sitemap to seed from (default: <origin>/sitemap.xml when present)
+        max_pages: Pages to audit in this call
+        max_depth: Link depth to follow from the seeds
+        allowed_hosts: Hosts the crawl may visit
+        delay: Minimum seconds between page visits on the same host
+        concurrency: Pages audited at once
+        respect_robots: Skip pages disallowed by robots.txt
+        crawl_id: Explicit crawl identifier to resume
+        restart: Discard saved state and start over
+        budgets: Optional budget thresholds for the site report
+        incremental: Reuse the last result for pages unchanged since they were audited
+
+    Returns:
+        Dict with crawl progress, per-page results from this call and the site report
+    """
+    try:
+        start = normalize_url(start_url)
+        if not start:
+            raise ValueError("URL must start with http:// or https://")
+
+        tools = tools or DEFAULT_TOOLS
+        unknown = [tool for tool in tools if tool not in BATCH_TOOLS]
+        if unknown:
+            raise ValueError(f"Unsupported tools: {unknown}. Use: {list(BATCH_TOOLS)}")
+
+        if max_pages < 1 or concurrency < 1 or max_depth < 0 or delay < 0:
+            raise ValueError("max_pages and concurrency must be positive; max_depth and delay non-negative")
+
+        hosts = {host.lower() for host in (allowed_hosts or [urlsplit(start).hostname])}
+        # Settings that decide which pages belong to the frontier; max_pages is a per-call budget
+        scope = json.dumps({
+            'startUrl': start,
+            'tools': sorted(tools),
+            'maxDepth': max_depth,
+            'allowedHosts': sorted(hosts),
+            'sitemapUrl': sitemap_url,
+            'respectRobots': respect_robots
+        }, sort_keys=True)
+        if not crawl_id:
+            crawl_id = hashlib.sha1(scope.encode()).hexdigest()[:12]
+
+        state_path = CRAWLS_DIR / f"{crawl_id}.sqlite"
+        if restart:
+            # WAL mode keeps uncheckpointed pages in the -wal/-shm side files
+            for suffix in ('', '-wal', '-shm'):
+                Path(f"{state_path}{suffix}").unlink(missing_ok=True)
+
+        config = CrawlConfig(
+            tools=tools,
+            allowed_hosts=hosts,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            delay=delay,
+            concurrency=concurrency,
+            respect_robots=respect_robots,
+            incremental=incremental
+        )
+
+        state = CrawlState(state_path)
+        try:
+            saved_scope = state.get_meta('scope')
+            if saved_scope is not None and saved_scope != scope:
+                raise ValueError(
+                    f"Crawl {crawl_id} was started with different settings ({saved_scope}); "
+                    "pass restart=True to start it over"
+                )
+
+            requeued = state.requeue_interrupted()
+            if requeued:
+                logger.info(f"Resuming crawl {crawl_id}: {requeued} interrupted pages requeued")
+
+            client = get_http_client()
+            if state.get_meta('seeded') is None:
+                _seed(state, client, start, sitemap_url, config)
+                state.set_meta('start_url', start)
+                state.set_meta('scope', scope)
+                state.set_meta('seeded', str(time.time()))
+
+            pages = run_coroutine_sync(_crawl(state, client, config))
+
+            counts = state.counts()
+            report = _site_report(state, budgets)
+        finally:
+            state.close()
+
+        return {
+            'status': 'ok',
+            'crawlId': crawl_id,
+            'statePath': str(state_path),
+            'startUrl': start,
+            'pagesAudited': sum(1 for page in pages if page['status'] != 'skipped'),
+            'frontier': counts,
+            'complete': counts.get('pending', 0) == 0,
+            'pages': pages,
+            'report': report
+        }
+
+    except Exception as e:
+        logger.error(f"Crawl audit failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+            'tool': 'crawl_audit'
+        }
+
+
+def _seed(state: CrawlState, client: httpx.Client, start: str, sitemap_url: str | None, config: CrawlConfig):
+    """Add the start URL and sitemap entries at depth 0."""
+    state.add([start], 0, 'start')
+
+    parts = urlsplit(start)
+    sitemap = sitemap_url or f"{parts.scheme}://{parts.netloc}/sitemap.xml"
+    urls = [
+        url for url in (normalize_url(loc) for loc in _read_sitemap(client, sitemap))
+        if url and _in_scope(url, config)
+    ]
+    added = state.add(urls, 0, 'sitemap')
+    logger.info(f"Seeded crawl from {start} and {added} sitemap URLs")
+
+
+def _read_sitemap(client: httpx.Client, sitemap_url: str, depth: int = 0) -> list[str]:
+    """Read <loc> entries from a sitemap or sitemap index (gzip supported)."""
+    try:
+        response = client.get(sitemap_url, **REQUEST_OPTIONS)
+        if response.status_code != 200:
+            return []
+        content = response.content
+        if content[:2] == b'\x1f\x8b':
+            content = gzip.decompress(content)
+    except Exception as e:
+        logger.debug(f"Sitemap {sitemap_url} unavailable: {e}")
+        return []
+
+    locations: list[str] = []
+    child_sitemaps: list[str] = []
+    try:
+        # Stream the document so large sitemaps do not build a full tree
+        for _, element in ET.iterparse(io.BytesIO(content)):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'loc' and element.text:
+                locations.append(element.text.strip())
+            elif tag == 'sitemap':
+                child_sitemaps.extend(locations[-1:])
+                del locations[-1:]
+            element.clear()
+    except ET.ParseError as e:
+        logger.warning(f"Invalid sitemap {sitemap_url}: {e}")
+
+    if depth == 0:
+        for child in child_sitemaps[:MAX_CHILD_SITEMAPS]:
+            locations.extend(_read_sitemap(client, child, depth + 1))
+
+    return locations
+
+
+def _in_scope(url: str, config: CrawlConfig) -> bool:
+    """Check host limits and skip obvious non-page resources."""
+    parts = urlsplit(url)
+    return parts.hostname in config.allowed_hosts and not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+
+
+def _allowed_by_robots(client: httpx.Client, url: str, config: CrawlConfig) -> bool:
+    """Check robots.txt for the URL's origin, fetching it once per origin."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+
+    if origin not in config.robots:
+        parser: RobotFileParser | None = None
+        try:
+            response = client.get(f"{origin}/robots.txt", **REQUEST_OPTIONS)
+            if response.status_code == 200:
+                parser = RobotFileParser()
+                parser.parse(response.text.splitlines())
+        except Exception as e:
+            logger.debug(f"robots.txt unavailable for {origin}: {e}")
+        config.robots[origin] = parser
+
+    parser = config.robots[origin]
+    return parser is None or parser.can_fetch(USER_AGENT, url)
+
+
+def _discover_links(client: httpx.Client, url: str) -> list[str]:
+    """Fetch a page and return the absolute links it contains."""
+    try:
+        with client.stream('GET', url, **REQUEST_OPTIONS) as response:
+            if 'html' not in response.headers.get('content-type', ''):
+                return []
+            body = bytearray()
+            for chunk in response.iter_bytes():
+                body.extend(chunk)
+                if len(body) > MAX_HTML_BYTES:
+                    break
+            extractor = _LinkExtractor(str(response.url))
+            extractor.feed(body.decode(response.encoding or 'utf-8', errors='replace'))
+            return extractor.links
+    except Exception as e:
+        logger.debug(f"Link discovery failed for {url}: {e}")
+        return []
+
+
+async def _crawl(state: CrawlState, client: httpx.Client, config: CrawlConfig) -> list[dict[str, Any]]:
+    """Audit pages from the frontier until the page budget or frontier runs out."""
+    loop = asyncio.get_running_loop()
+    politeness = HostPoliteness(config.delay)
+    pages: list[dict[str, Any]] = []
+
+    async def process(url: str, depth: int):
+        try:
+            await visit(url, depth)
+        except Exception as e:
+            # One broken page must not abort the crawl
+            logger.error(f"Crawl of {url} failed: {e}")
+            state.complete(url, 'failed')
+            pages.append({'url': url, 'depth': depth, 'status': 'failed', 'error': str(e)})
+
+    async def visit(url: str, depth: int):
+        if config.respect_robots and not await loop.run_in_executor(None, _allowed_by_robots, client, url, config):
+            state.complete(url, 'skipped')
+            pages.append({'url': url, 'depth': depth, 'status': 'skipped', 'reason': 'robots.txt'})
+            return
+
+        await politeness.wait(urlsplit(url).hostname)
+
+        # Discover links first so the frontier grows while the audits run
+        if depth < config.max_depth:
+            links = await loop.run_in_executor(None, _discover_links, client, url)
+            candidates = {normalize_url(link) for link in links}
+            new_urls = [link for link in candidates if link and _in_scope(link, config)]
+            state.add(new_urls, depth + 1, url)
+
+        per_url = await run_batch(
+            [url], config.tools, len(config.tools), config.tool_timeout, incremental=config.incremental
+        )
+        results = {tool: _compact(result) for tool, result in per_url[url].items()}
+        status = 'done' if any(r.get('status') == 'ok' for r in results.values()) else 'failed'
+        state.complete(url, status, results)
+        pages.append({
+            'url': url,
+            'depth': depth,
+            'status': status,
+            'unchanged': all(result.get('stale') for result in results.values()),
+            'metrics': _page_metrics(results)
+        })
+        logger.info(f"[crawl {len(pages)}/{config.max_pages}] {url}: {status}")
+
+    tasks: set[asyncio.Task] = set()
+    started = 0
+    while True:
+        room = min(config.concurrency - len(tasks), config.max_pages - started)
+        for url, depth in (state.claim(room) if room > 0 else []):
+            started += 1
+            tasks.add(asyncio.create_task(process(url, depth)))
+
+        if not tasks:
+            break
+
+        done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+
+    return pages
+
+
+def _compact(result: dict[str, Any]) -> dict[str, Any]:
+    """Drop raw tool output before persisting a result."""
+    return {key: value for key, value in result.items() if key != 'raw'}
+
+
+def _page_metrics(results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Pick the headline number from each tool for the page listing."""
+    metrics: dict[str, Any] = {}
+    for tool, result in results.items():
+        if result.get('status') != 'ok':
+            metrics[tool] = 'error'
+        elif 'securityScore' in result:
+            metrics[tool] = result['securityScore']
+        elif 'violationsCount' in result:
+            metrics[tool] = result['violationsCount']
+        elif 'performance_score' in result:
+            metrics[tool] = result['performance_score']
+        elif 'categoryScores' in result:
+            metrics[tool] = result['categoryScores']
+        else:
+            metrics[tool] = 'ok'
+    return metrics
+
+
+def _site_report(state: CrawlState, budgets: dict[str, Any] | None) -> dict[str, Any]:
+    """Merge every audited page so far into one site-level report."""
+    items = [
+        result
+        for _, results in state.iter_results()
+        for result in results.values()
+        if result.get('status') == 'ok'
+    ]
+    if not items:
+        return {'status': 'error', 'error': 'No successful page audits yet'}
+
+    merged = report_merge(items, budgets)
+    return {
+        key: merged.get(key)
+        for key in ('status', 'score', 'budgets', 'summary', 'jsonReportPath', 'htmlReportPath', 'error')
+        if key in merged
+    }
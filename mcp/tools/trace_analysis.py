@@ -0,0 +1,498 @@
+"""
+Streaming analysis of Chrome trace files (cdp_trace output).
+
+Traces can be hundreds of MB, so events are decoded one at a time from the
+file's ``traceEvents`` array (or a bare event array) and folded into
+per-thread aggregates; the whole document is never held in memory.
+
+Per thread the analyzer keeps a stack of open events to compute self time,
+then reports for the renderer main thread:
+
+- Time by task group (script, style/layout, paint/composite, parse HTML, GC)
+- Top-level task count and long tasks (>= 50 ms by default)
+- Script, layout and paint time per frame, split at BeginMainThreadFrame
+- Top self-time functions from the sampled CPU profile (ProfileChunk), or
+  from FunctionCall events when the trace has no samples
+
+Events on a thread are expected in start order (as Chrome writes them);
+events that start before the enclosing open event are counted in
+``outOfOrderEvents`` and skipped. Malformed events in the array are skipped
+and counted in ``malformedEvents``.
+"""
+
+import codecs
+import gzip
+import heapq
+import json
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Largest single event buffered while looking for its end
+MAX_EVENT_SIZE = 64 * 1024 * 1024
+
+# Characters that matter when scanning past a malformed event
+_STRUCTURAL = re.compile(r'[\\"{}\[\],]')
+
+LONG_TASK_MS = 50.0
+
+TASK_GROUPS: dict[str, set[str]] = {
+    'scriptEvaluation': {
+        'EventDispatch', 'EvaluateScript', 'v8.evaluateModule', 'FunctionCall', 'TimerFire',
+        'FireIdleCallback', 'FireAnimationFrame', 'RunMicrotasks', 'V8.Execute'
+    },
+    'scriptParseCompile': {
+        'v8.compile', 'v8.compileModule', 'v8.parseOnBackground', 'v8.produceCache',
+        'v8.produceModuleCache', 'v8.deserializeOnBackground'
+    },
+    'styleLayout': {
+        'ScheduleStyleRecalculation', 'UpdateLayoutTree', 'RecalculateStyles', 'InvalidateLayout', 'Layout'
+    },
+    'paintCompositeRender': {
+        'Animation', 'RequestMainThreadFrame', 'ActivateLayerTree', 'DrawFrame', 'HitTest', 'PaintSetup',
+        'Paint', 'PaintImage', 'PrePaint', 'Rasterize', 'RasterTask', 'UpdateLayer', 'UpdateLayerTree',
+        'CompositeLayers', 'Layerize', 'Commit'
+    },
+    'parseHTML': {'ParseHTML', 'ParseAuthorStyleSheet'},
+    'garbageCollection': {
+        'GCEvent', 'MinorGC', 'MajorGC', 'BlinkGC.AtomicPhase', 'ThreadState::performIdleLazySweep',
+        'ThreadState::completeSweep', 'V8.GCScavenger', 'V8.GCFinalizeMC', 'V8.GCCompactor', 'V8.GCIncrementalMarking'
+    }
+}
+GROUP_OF = {name: group for group, names in TASK_GROUPS.items() for name in names}
+
+# Per-frame buckets: index into a frame's [start, script, layout, paint]
+FRAME_BUCKETS = {
+    'scriptEvaluation': 1,
+    'scriptParseCompile': 1,
+    'styleLayout': 2,
+    'paintCompositeRender': 3
+}
+FRAME_START_EVENTS = {'BeginMainThreadFrame', 'BeginFrame'}
+
+# CPU profile nodes that are not JavaScript
+NON_FUNCTION_NODES = {'(root)', '(idle)', '(program)'}
+
+
+def iter_trace_events(
+    path: str | Path,
+    chunk_size: int = CHUNK_SIZE,
+    stats: dict[str, int] | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield trace events one by one from a JSON (or .gz) trace file.
+
+    Accepts the object form ({"traceEvents": [...], ...}) and the bare array
+    form. Memory use is bounded by the largest single event plus one chunk.
+    A malformed event is skipped up to the next separator in the array and
+    counted in stats['malformedEvents'].
+
+    Raises:
+        ValueError: If the file has no event array, ends mid-event or has an
+            event larger than MAX_EVENT_SIZE
+    """
+    path = Path(path)
+    opener = gzip.open if path.name.endswith('.gz') else open
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+
+    with opener(path, 'rb') as f:
+        buffer = ''
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += text.decode(chunk, final=eof)
+            return not eof
+
+        # Find the start of the event array
+        pos = None
+        while pos is None:
+            stripped = buffer.lstrip()
+            if stripped.startswith('['):
+                pos = len(buffer) - len(stripped) + 1
+            elif stripped.startswith('{'):
+                key = buffer.find('"traceEvents"')
+                bracket = buffer.find('[', key) if key >= 0 else -1
+                if bracket >= 0:
+                    pos = bracket + 1
+            if pos is None and not fill():
+                raise ValueError(f"No traceEvents array in {path.name}")
+
+        while True:
+            # Skip separators between events
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    break
+            if pos >= len(buffer):
+                raise ValueError(f"Trace {path.name} ends before the traceEvents array closes")
+            if buffer[pos] == ']':
+                return
+
+            try:
+                event, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                end = _value_end(buffer, pos)
+                if end is None:
+                    # Event split across chunks: read more and retry
+                    if len(buffer) - pos > MAX_EVENT_SIZE:
+                        raise ValueError(f"Trace {path.name} has an event over {MAX_EVENT_SIZE} bytes") from None
+                    if not fill():
+                        raise ValueError(f"Trace {path.name} ends mid-event") from None
+                    continue
+                # Complete but malformed: resync at the next separator
+                logger.warning(f"Skipping malformed event in {path.name}: {e.msg}")
+                if stats is not None:
+                    stats['malformedEvents'] = stats.get('malformedEvents', 0) + 1
+                pos = end
+                continue
+            pos = end
+            if isinstance(event, dict):
+                yield event
+
+            # Drop consumed text so the buffer stays around one chunk
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def _value_end(buffer: str, pos: int) -> int | None:
+    """
+    Index of the separator (',' or the closing ']') after the array element at pos.
+
+    Returns None when the element runs past the end of the buffer.
+    """
+    depth = 0
+    in_string = False
+    escaped_until = -1
+    for match in _STRUCTURAL.finditer(buffer, pos):
+        index = match.start()
+        if index < escaped_until:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_until = index + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            if depth == 0:
+                return index
+            depth -= 1
+        elif depth == 0:
+            return index
+    return None
+
+
+@dataclass
+class _OpenEvent:
+    name: str
+    group: str
+    start: float
+    end: float | None
+    frame: int | None
+    child_time: float = 0.0
+    function: tuple[str, str, int] | None = None
+
+
+@dataclass
+class _ThreadStats:
+    name: str | None = None
+    stack: list[_OpenEvent] = field(default_factory=list)
+    groups: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    tasks: int = 0
+    task_time: float = 0.0
+    long_task_count: int = 0
+    long_task_time: float = 0.0
+    # Min-heap of (duration, start, sequence, groups) for the longest tasks
+    long_tasks: list[tuple[float, float, int, dict[str, float]]] = field(default_factory=list)
+    task_groups: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    frames: list[list[float]] = field(default_factory=list)
+    function_calls: dict[tuple[str, str, int], float] = field(default_factory=lambda: defaultdict(float))
+    out_of_order: int = 0
+
+
+class TraceAnalyzer:
+    """Folds trace events into per-thread aggregates; call feed() per event, then summary()."""
+
+    def __init__(self, long_task_ms: float = LONG_TASK_MS, top: int = 20):
+        self.long_task_us = long_task_ms * 1000
+        self.top = top
+        self.events = 0
+        self.start_ts: float | None = None
+        self.end_ts: float = 0.0
+        self._threads: dict[tuple[Any, Any], _ThreadStats] = defaultdict(_ThreadStats)
+        # CPU profile state, keyed by (pid, profile id)
+        self._nodes: dict[tuple[Any, Any], dict[int, tuple[str, str, int]]] = defaultdict(dict)
+        self._last_sample: dict[tuple[Any, Any], int] = {}
+        self._profile_threads: dict[tuple[Any, Any], tuple[Any, Any]] = {}
+        self._samples: dict[tuple[Any, Any], dict[tuple[str, str, int], float]] = defaultdict(lambda: defaultdict(float))
+
+    def feed(self, event: dict[str, Any]):
+        self.events += 1
+        phase = event.get('ph')
+        name = event.get('name', '')
+        key = (event.get('pid'), event.get('tid'))
+
+        if phase == 'M':
+            if name == 'thread_name':
+                self._threads[key].name = (event.get('args') or {}).get('name')
+            return
+        if phase == 'P' or name in ('Profile', 'ProfileChunk'):
+            self._profile(key, name, event)
+            return
+
+        ts = event.get('ts')
+        if not isinstance(ts, (int, float)):
+            return
+        if self.start_ts is None or ts < self.start_ts:
+            self.start_ts = ts
+        self.end_ts = max(self.end_ts, ts + (event.get('dur') or 0))
+
+        thread = self._threads[key]
+        if name in FRAME_START_EVENTS:
+            self._close_until(thread, ts)
+            thread.frames.append([ts, 0.0, 0.0, 0.0])
+            return
+
+        if phase == 'E':
+            self._end(thread, ts)
+            return
+        if phase not in ('X', 'B'):
+            return
+
+        self._close_until(thread, ts)
+        if thread.stack and ts < thread.stack[-1].start:
+            thread.out_of_order += 1
+            return
+
+        group = GROUP_OF.get(name, 'other')
+        function = None
+        if name == 'FunctionCall':
+            data = (event.get('args') or {}).get('data') or {}
+            function = (data.get('functionName') or '(anonymous)', data.get('url', ''), data.get('lineNumber', 0))
+        end = ts + event['dur'] if phase == 'X' and isinstance(event.get('dur'), (int, float)) else None
+        frame = len(thread.frames) - 1 if thread.frames else None
+        thread.stack.append(_OpenEvent(name, group, ts, end, frame, function=function))
+
+    def summary(self) -> dict[str, Any]:
+        """Compact summary of the renderer main thread (plus trace-wide counts)."""
+        for thread in self._threads.values():
+            self._close_until(thread, float('inf'))
+
+        main_key = self._main_thread()
+        result: dict[str, Any] = {
+            'events': self.events,
+            'durationMs': _ms((self.end_ts - self.start_ts) if self.start_ts is not None else 0),
+            'threads': len(self._threads),
+            'mainThread': None
+        }
+        if main_key is None:
+            return result
+
+        thread = self._threads[main_key]
+        long_tasks = sorted(thread.long_tasks, reverse=True)
+        result['mainThread'] = {
+            'pid': main_key[0],
+            'tid': main_key[1],
+            'name': thread.name,
+            'busyMs': _ms(sum(thread.groups.values())),
+            'groups': {group: _ms(time) for group, time in sorted(thread.groups.items(), key=lambda item: -item[1])},
+            'tasks': {
+                'count': thread.tasks,
+                'totalMs': _ms(thread.task_time),
+                'longTaskCount': thread.long_task_count,
+                'longTaskMs': _ms(thread.long_task_time),
+                # Time beyond the threshold per long task, as in Total Blocking Time
+                'blockingMs': _ms(thread.long_task_time - thread.long_task_count * self.long_task_us)
+            },
+            'longTasks': [
+                {
+                    'startMs': _ms(start - self.start_ts),
+                    'durationMs': _ms(duration),
+                    'groups': {group: _ms(time) for group, time in sorted(groups.items(), key=lambda item: -item[1]) if time}
+                }
+                for duration, start, _, groups in long_tasks
+            ],
+            'frames': self._frame_summary(thread),
+            'topFunctions': self._top_functions(main_key, thread),
+            'outOfOrderEvents': thread.out_of_order
+        }
+        return result
+
+    def _profile(self, key: tuple[Any, Any], name: str, event: dict[str, Any]):
+        profile = (event.get('pid'), event.get('id'))
+        if name == 'Profile':
+            self._profile_threads[profile] = key
+            return
+        if name != 'ProfileChunk':
+            return
+
+        data = (event.get('args') or {}).get('data') or {}
+        cpu_profile = data.get('cpuProfile') or {}
+        nodes = self._nodes[profile]
+        for node in cpu_profile.get('nodes') or []:
+            frame = node.get('callFrame') or {}
+            nodes[node['id']] = (frame.get('functionName') or '(anonymous)', frame.get('url', ''), frame.get('lineNumber', 0))
+
+        # Each delta is the time since the previous sample, so it belongs to that sample's node
+        totals = self._samples[profile]
+        last = self._last_sample.get(profile)
+        for node_id, delta in zip(cpu_profile.get('samples') or [], data.get('timeDeltas') or [], strict=False):
+            if last is not None and delta > 0:
+                totals[nodes.get(last, ('(unknown)', '', 0))] += delta
+            last = node_id
+        if last is not None:
+            self._last_sample[profile] = last
+
+    def _end(self, thread: _ThreadStats, ts: float):
+        """Close the innermost open B event (and anything that ended before it)."""
+        self._close_until(thread, ts)
+        for index in range(len(thread.stack) - 1, -1, -1):
+            if thread.stack[index].end is None:
+                # Events still open inside the B event are cut off at its end
+                while len(thread.stack) > index + 1:
+                    self._finish(thread, ts)
+                self._finish(thread, ts)
+                return
+
+    def _close_until(self, thread: _ThreadStats, ts: float):
+        """Finish open events that ended at or before ts."""
+        while thread.stack:
+            top = thread.stack[-1]
+            if top.end is None:
+                if ts != float('inf'):
+                    return
+                # Unterminated B event at the end of the trace: close it at the last timestamp
+                top.end = max(top.start, self.end_ts)
+            elif top.end > ts:
+                return
+            self._finish(thread, top.end)
+
+    def _finish(self, thread: _ThreadStats, end: float):
+        event = thread.stack.pop()
+        duration = max(0.0, end - event.start)
+        self_time = max(0.0, duration - event.child_time)
+        thread.groups[event.group] += self_time
+        thread.task_groups[event.group] += self_time
+        if event.function:
+            thread.function_calls[event.function] += self_time
+        bucket = FRAME_BUCKETS.get(event.group)
+        if bucket and event.frame is not None:
+            thread.frames[event.frame][bucket] += self_time
+
+        if thread.stack:
+            thread.stack[-1].child_time += duration
+            return
+
+        # Top-level task
+        thread.tasks += 1
+        thread.task_time += duration
+        groups, thread.task_groups = thread.task_groups, defaultdict(float)
+        if duration >= self.long_task_us:
+            thread.long_task_count += 1
+            thread.long_task_time += duration
+            entry = (duration, event.start, thread.tasks, dict(groups))
+            if len(thread.long_tasks) < self.top:
+                heapq.heappush(thread.long_tasks, entry)
+            else:
+                heapq.heappushpop(thread.long_tasks, entry)
+
+    def _main_thread(self) -> tuple[Any, Any] | None:
+        """The busiest CrRendererMain thread, or the busiest thread when none is named."""
+        busy = {key: sum(thread.groups.values()) for key, thread in self._threads.items()}
+        renderers = [key for key, thread in self._threads.items() if thread.name == 'CrRendererMain']
+        candidates = renderers or [key for key, time in busy.items() if time > 0]
+        return max(candidates, key=lambda key: busy[key], default=None)
+
+    def _frame_summary(self, thread: _ThreadStats) -> dict[str, Any]:
+        frames = thread.frames
+        summary: dict[str, Any] = {'count': len(frames)}
+        if not frames:
+            return summary
+        for index, bucket in enumerate(('script', 'layout', 'paint'), start=1):
+            values = sorted(frame[index] for frame in frames)
+            summary[bucket] = {
+                'avgMs': _ms(sum(values) / len(values)),
+                'p95Ms': _ms(values[min(len(values) - 1, int(len(values) * 0.95))]),
+                'maxMs': _ms(values[-1])
+            }
+        slowest = heapq.nlargest(min(self.top, 10), frames, key=lambda frame: frame[1] + frame[2] + frame[3])
+        summary['slowest'] = [
+            {
+                'startMs': _ms(frame[0] - self.start_ts),
+                'scriptMs': _ms(frame[1]),
+                'layoutMs': _ms(frame[2]),
+                'paintMs': _ms(frame[3])
+            }
+            for frame in slowest
+        ]
+        return summary
+
+    def _top_functions(self, main_key: tuple[Any, Any], thread: _ThreadStats) -> dict[str, Any]:
+        totals: dict[tuple[str, str, int], float] = defaultdict(float)
+        for profile, samples in self._samples.items():
+            # Profiles without a Profile event are assumed to belong to the main thread's process
+            owner = self._profile_threads.get(profile)
+            if owner == main_key or (owner is None and profile[0] == main_key[0]):
+                for function, time in samples.items():
+                    totals[function] += time
+
+        source = 'samples'
+        if not totals:
+            source, totals = 'trace-events', thread.function_calls
+        top = heapq.nlargest(
+            self.top,
+            ((function, time) for function, time in totals.items() if function[0] not in NON_FUNCTION_NODES),
+            key=lambda item: item[1]
+        )
+        return {
+            'source': source,
+            'functions': [
+                {'function': name, 'url': url, 'line': line, 'selfMs': _ms(time)}
+                for (name, url, line), time in top
+            ]
+        }
+
+
+def analyze_trace(path: str | Path, long_task_ms: float = LONG_TASK_MS, top: int = 20) -> dict[str, Any]:
+    """
+    Stream a Chrome trace file and summarize its main-thread activity.
+
+    Args:
+        path: Trace JSON file (optionally gzip-compressed)
+        long_task_ms: Minimum duration of a long task
+        top: Number of long tasks, frames and functions to list
+
+    Returns:
+        Compact summary dict (see TraceAnalyzer.summary)
+    """
+    analyzer = TraceAnalyzer(long_task_ms, top)
+    stats: dict[str, int] = {}
+    for event in iter_trace_events(path, stats=stats):
+        analyzer.feed(event)
+    summary = analyzer.summary()
+    summary['malformedEvents'] = stats.get('malformedEvents', 0)
+    return summary
+
+
+def _ms(microseconds: float) -> float:
+    return round(microseconds / 1000, 2)
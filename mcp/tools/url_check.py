@@ -1,14 +1,60 @@
 """
-URL connectivity check tool
+URL connectivity check tool and shared URL helpers
 """
 
 import logging
 from typing import Any
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
 
-import requests
+import httpx
+
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Query parameters that never change page content
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga'}
+
+
+def normalize_url(url: str, base: str | None = None) -> str | None:
+    """
+    Canonicalize a URL so equivalent addresses compare equal.
+
+    Resolves it against base, drops the fragment, lowercases scheme and host,
+    removes default ports and tracking parameters and sorts the query.
+    Returns None for anything that is not an http(s) URL.
+    """
+    if base:
+        url = urljoin(base, url)
+    url, _ = urldefrag(url.strip())
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    port = parts.port
+    netloc = host if port is None or (scheme, port) in (('http', 80), ('https', 443)) else f"{host}:{port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+
+def probe_url(
+    url: str,
+    method: str = "HEAD",
+    headers: dict[str, str] | None = None,
+    timeout: float = 5
+) -> httpx.Response:
+    """Send the lightweight request used to check a URL before auditing it."""
+    return get_http_client().request(method, url, headers=headers, timeout=timeout)
+
+
 def url_check(url: str) -> dict[str, Any]:
     """
     Check if a URL is reachable before running audits.
@@ -26,7 +72,7 @@ def url_check(url: str) -> dict[str, Any]:
         logger.info(f"Checking connectivity to {url}")
 
         # Quick HEAD request with short timeout
-        response = requests.head(url, timeout=5, allow_redirects=True)
+        response = probe_url(url)
 
         return {
             'status': 'ok',
@@ -34,11 +80,11 @@ def url_check(url: str) -> dict[str, Any]:
             'reachable': True,
             'status_code': response.status_code,
             'headers': dict(response.headers),
-            'final_url': response.url,
+            'final_url': str(response.url),
             'message': f"Server is reachable (HTTP {response.status_code})"
         }
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return {
             'status': 'error',
             'url': url,
@@ -53,7 +99,7 @@ def url_check(url: str) -> dict[str, Any]:
                 'php -S localhost:3000'
             ]
         }
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         return {
             'status': 'error',
             'url': url,
@@ -1,16 +1,13 @@
 """
-WAVE API integration with asyncio fix.
+WAVE API integration.
 """
 
-import asyncio
-import json
 import logging
 import os
-from datetime import datetime
-from pathlib import Path
 from typing import Any, Literal
 
-import httpx
+from .artifact_store import get_artifact_store
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -47,12 +44,9 @@ def scan_wave(
         if api_options is None:
             api_options = {}
 
-        try:
-            asyncio.get_running_loop()
-            logger.info("Using sync HTTP client")
-            return _run_sync(url, report_type, api_options, api_key, api_base)
-        except RuntimeError:
-            return asyncio.run(_run_async(url, report_type, api_options, api_key, api_base))
+        # The shared sync client keeps its connections across scans; a loop per
+        # scan would get a new async client with a cold pool every time
+        return _run_sync(url, report_type, api_options, api_key, api_base)
 
     except Exception as e:
         logger.error(f"WAVE scan failed: {e}")
@@ -61,18 +55,9 @@ def scan_wave(
 
 def _run_sync(url: str, report_type: str, api_options: dict, api_key: str, api_base: str) -> dict:
     params = {'key': api_key, 'url': url, 'format': 'json', **api_options}
-    with httpx.Client(timeout=120.0) as client:
-        response = client.get(f"{api_base}/request", params=params)
-        response.raise_for_status()
-        return _process(response.json(), url, report_type)
-
-
-async def _run_async(url: str, report_type: str, api_options: dict, api_key: str, api_base: str) -> dict:
-    params = {'key': api_key, 'url': url, 'format': 'json', **api_options}
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.get(f"{api_base}/request", params=params)
-        response.raise_for_status()
-        return _process(response.json(), url, report_type)
+    response = get_http_client().get(f"{api_base}/request", params=params, timeout=120.0)
+    response.raise_for_status()
+    return _process(response.json(), url, report_type)
 
 
 def _process(raw_data: dict, url: str, report_type: str) -> dict:
@@ -83,14 +68,7 @@ def _process(raw_data: dict, url: str, report_type: str) -> dict:
 
     score = max(0, 100 - ((errors + alerts) / 50 * 100))
 
-    artifacts_dir = Path(__file__).parent.parent.parent / "artifacts"
-    artifacts_dir.mkdir(exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = artifacts_dir / f"wave-{timestamp}.json"
-
-    with open(report_path, 'w') as f:
-        json.dump(raw_data, f, indent=2)
+    report = get_artifact_store().put_json(raw_data, kind="wave", meta={'url': url})
 
     return {
         'status': 'ok',
@@ -101,5 +79,5 @@ def _process(raw_data: dict, url: str, report_type: str) -> dict:
             'alerts': alerts,
             'features': categories.get('feature', {}).get('count', 0)
         },
-        'report_path': str(report_path)
+        'report_path': report['path']
     }
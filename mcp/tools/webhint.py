@@ -4,43 +4,24 @@ Webhint scanning tool for web best practices.
 
 import json
 import logging
-import os
-import shutil
 import subprocess
 from typing import Any
 
-logger = logging.getLogger(__name__)
-
-def _resolve_npx_command() -> str | None:
-    """Return platform-appropriate npx executable path."""
-    candidates = ["npx"]
-    if os.name == "nt":
-        candidates = ["npx.cmd", "npx"]
-
-    for candidate in candidates:
-        path = shutil.which(candidate)
-        if path:
-            return path
-    return None
+from .orchestrator import job_time_left
+from .runner_registry import get_runner_registry
 
+logger = logging.getLogger(__name__)
 
 def _resolve_webhint_runner() -> tuple[list[str], bool] | None:
-    """Resolve executable for running webhint."""
-    hint_cmd = shutil.which("hint.cmd") if os.name == "nt" else shutil.which("hint")
-    if hint_cmd:
-        return ([hint_cmd], False)
-
-    npx_cmd = _resolve_npx_command()
-    if npx_cmd:
-        return ([npx_cmd, "-y", "hint"], True)
-
-    return None
+    """Resolve executable for running webhint (cached by the runner registry)."""
+    info = get_runner_registry().resolve("webhint")
+    return (list(info.command), info.uses_npx) if info.command else None
 
 
 def _check_webhint_available() -> dict[str, Any]:
     """Check if webhint is available and provide installation instructions."""
-    runner = _resolve_webhint_runner()
-    if not runner:
+    info = get_runner_registry().resolve("webhint")
+    if not info.command:
         return {
             "available": False,
             "error": "webhint executable not found. Node.js is required.",
@@ -51,21 +32,10 @@ def _check_webhint_available() -> dict[str, Any]:
             }
         }
 
-    # Try to check if hint is accessible
-    try:
-        base_cmd, uses_npx = runner
-        version_cmd = base_cmd + (["--", "--version"] if uses_npx else ["--version"])
-        result = subprocess.run(
-            version_cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode == 0:
-            return {"available": True, "version": result.stdout.strip()}
-    except Exception as e:
-        logger.debug(f"Webhint check failed: {e}")
+    if info.available:
+        return {"available": True, "version": info.version}
 
+    logger.debug(f"Webhint check failed: {info.error}")
     return {
         "available": False,
         "error": "Webhint CLI (hint) is not accessible from PATH",
@@ -115,7 +85,7 @@ def webhint_scan(url: str) -> dict[str, Any]:
         cmd += [url, "--formatters", "json"]
 
         logger.info(f"Running webhint scan for {url}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=90)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=job_time_left(90))
 
         # Webhint may return non-zero exit code even on successful scans with issues
         if result.returncode != 0 and not result.stdout:
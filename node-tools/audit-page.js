@@ -0,0 +1,189 @@
+#!/usr/bin/env node
+/**
+ * Single-navigation page audit using Playwright
+ *
+ * Loads the page once per viewport and runs every requested check against
+ * that loaded page: security headers from the main response, axe, overflow
+ * and tap-target checks, and a full-page screenshot.
+ */
+
+const { AxeBuilder } = require('@axe-core/playwright');
+const { DEVICE_PROFILES } = require('./axe-playwright');
+const { storeScreenshot } = require('./lib/artifacts');
+const { acquireBrowser } = require('./lib/browser');
+const { summarizeViewport } = require('./lib/layout-checks');
+const { navigate } = require('./lib/navigation');
+const { buildHeaderAnalysis } = require('./security-headers');
+
+const ALL_CHECKS = ['headers', 'axe', 'responsive'];
+const VIEWPORT_PATTERN = /^\d+x\d+$/;
+
+/**
+ * The lightest interception profile that still serves every requested check.
+ */
+function pickInterception(checks) {
+  if (checks.includes('responsive')) {
+    return 'layout';
+  }
+  return checks.includes('axe') ? 'a11y-minimal' : 'headers-only';
+}
+
+/**
+ * Pick the viewport axe runs on: the narrowest for mobile, the widest for desktop.
+ */
+function pickAxeViewport(viewports, device) {
+  const byWidth = [...viewports].sort((a, b) => Number(a.split('x')[0]) - Number(b.split('x')[0]));
+  return device === 'desktop' ? byWidth[byWidth.length - 1] : byWidth[0];
+}
+
+async function runPageAudit(
+  url,
+  { viewports, checks = ALL_CHECKS, device = 'mobile', waitFor, interception } = {},
+  { browser: sharedBrowser } = {}
+) {
+  const profile = DEVICE_PROFILES[device] || DEVICE_PROFILES.mobile;
+  if (!viewports || viewports.length === 0) {
+    const { width, height } = profile.viewport;
+    viewports = [`${width}x${height}`];
+  }
+
+  for (const viewport of viewports) {
+    if (!VIEWPORT_PATTERN.test(viewport)) {
+      throw new Error(`Invalid viewport format: ${viewport}. Use format: 360x640`);
+    }
+  }
+
+  const axeViewport = checks.includes('axe') ? pickAxeViewport(viewports, device) : null;
+  interception = interception || pickInterception(checks);
+  const results = {
+    url: url,
+    timestamp: new Date().toISOString(),
+    checks: checks,
+    interception: interception,
+    navigations: [],
+  };
+  if (checks.includes('responsive')) {
+    results.responsive = { url: url, timestamp: results.timestamp, summaries: [] };
+  }
+
+  // Connect to the pooled browser or launch a private one
+  const browser = sharedBrowser || (await acquireBrowser());
+
+  try {
+    for (const viewport of viewports) {
+      const [width, height] = viewport.split('x').map(Number);
+      const isAxeViewport = viewport === axeViewport;
+      const context = await browser.newContext({
+        viewport: { width, height },
+        ...(isAxeViewport ? { userAgent: profile.userAgent } : {}),
+      });
+      const page = await context.newPage();
+      const started = Date.now();
+
+      try {
+        // Navigate once; every check below reuses this loaded page
+        const { response, navigation } = await navigate(page, url, { waitFor, interception });
+        results.navigations.push({ viewport, ...navigation });
+
+        if (checks.includes('headers') && !results.securityHeaders) {
+          results.securityHeaders = buildHeaderAnalysis(url, response ? response.headers() : {});
+        }
+
+        if (checks.includes('responsive')) {
+          const { path: screenshotPath } = await storeScreenshot(page, width, height);
+          results.responsive.summaries.push(
+            await summarizeViewport(page, { viewport, width, height, screenshotPath })
+          );
+        }
+
+        if (isAxeViewport) {
+          results.axe = await new AxeBuilder({ page }).analyze();
+          results.axeViewport = viewport;
+        }
+      } catch (error) {
+        results.navigations.push({ viewport, ms: Date.now() - started, error: error.message });
+        if (checks.includes('responsive')) {
+          results.responsive.summaries.push({
+            viewport: viewport,
+            width: width,
+            height: height,
+            error: error.message,
+          });
+        }
+      } finally {
+        await context.close().catch(() => {});
+      }
+    }
+
+    return results;
+  } finally {
+    if (!sharedBrowser) {
+      await browser.close();
+    }
+  }
+}
+
+function main() {
+  // Parse command line arguments
+  const args = process.argv.slice(2);
+  const options = { viewports: [] };
+  let url;
+
+  for (const arg of args) {
+    if (arg.startsWith('--checks=')) {
+      options.checks = arg.slice('--checks='.length).split(',').filter(Boolean);
+    } else if (arg.startsWith('--device=')) {
+      options.device = arg.slice('--device='.length);
+    } else if (arg.startsWith('--wait-for=')) {
+      options.waitFor = arg.slice('--wait-for='.length);
+    } else if (arg.startsWith('--interception=')) {
+      options.interception = arg.slice('--interception='.length);
+    } else if (!url) {
+      url = arg;
+    } else {
+      options.viewports.push(arg);
+    }
+  }
+
+  if (!url) {
+    console.error(
+      JSON.stringify({
+        error:
+          'Usage: node audit-page.js <url> [--checks=headers,axe,responsive] [--device=mobile] [--wait-for=networkidle] [--interception=layout] [viewport...]',
+        example: 'node audit-page.js https://example.com --checks=headers,axe 360x640 1280x800',
+      })
+    );
+    process.exit(1);
+  }
+
+  // Validate URL
+  if (!url.startsWith('http://') && !url.startsWith('https://')) {
+    console.error(
+      JSON.stringify({
+        error: 'URL must start with http:// or https://',
+      })
+    );
+    process.exit(1);
+  }
+
+  runPageAudit(url, options)
+    .then((results) => {
+      // Output results as JSON
+      console.log(JSON.stringify(results, null, 2));
+    })
+    .catch((error) => {
+      console.error(
+        JSON.stringify({
+          error: error.message,
+          stack: error.stack,
+        })
+      );
+      process.exit(1);
+    });
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = { runPageAudit };
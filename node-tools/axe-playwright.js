@@ -3,80 +3,110 @@
  * Axe accessibility scanning using Playwright
  */
 
-const { chromium } = require('playwright');
+const { acquireBrowser } = require('./lib/browser');
+const { navigate } = require('./lib/navigation');
 const { AxeBuilder } = require('@axe-core/playwright');
 
-async function runAxeScan(url, device = 'mobile') {
-  let browser;
+const DEVICE_PROFILES = {
+  mobile: {
+    viewport: { width: 375, height: 667 },
+    userAgent: 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15',
+  },
+  desktop: {
+    viewport: { width: 1280, height: 800 },
+    userAgent: 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+  },
+};
+
+/**
+ * Run an axe scan and return the raw axe results.
+ * Pages load with the a11y-minimal interception profile unless
+ * `navigation.interception` names another one.
+ * When a shared browser is passed only the scan's own context is closed.
+ */
+async function runAxeScan(url, device = 'mobile', { browser: sharedBrowser, navigation = {} } = {}) {
+  // Connect to the pooled browser or launch a private one
+  const browser = sharedBrowser || (await acquireBrowser());
+  let context;
 
   try {
-    // Launch browser
-    browser = await chromium.launch({ headless: true });
-    const context = await browser.newContext({
-      viewport: device === 'mobile' ? { width: 375, height: 667 } : { width: 1280, height: 800 },
-      userAgent:
-        device === 'mobile'
-          ? 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15'
-          : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    });
+    context = await browser.newContext(
+      device === 'mobile' ? DEVICE_PROFILES.mobile : DEVICE_PROFILES.desktop
+    );
 
     const page = await context.newPage();
 
     // Navigate to URL
-    await page.goto(url, { waitUntil: 'networkidle', timeout: 30000 });
+    const { navigation: nav } = await navigate(page, url, {
+      ...navigation,
+      interception: navigation.interception || 'a11y-minimal',
+    });
 
     // Run accessibility scan with AxeBuilder
     const results = await new AxeBuilder({ page }).analyze();
+    return { ...results, navigation: nav };
+  } finally {
+    if (context) {
+      await context.close().catch(() => {});
+    }
+    if (!sharedBrowser) {
+      await browser.close();
+    }
+  }
+}
 
-    // Output results as JSON
-    console.log(JSON.stringify(results, null, 2));
-  } catch (error) {
+function main() {
+  // Parse command line arguments
+  const args = process.argv.slice(2);
+  const waitFlag = args.find((arg) => arg.startsWith('--wait-for='));
+  const interceptionFlag = args.find((arg) => arg.startsWith('--interception='));
+  const positional = args.filter((arg) => !arg.startsWith('--'));
+  if (positional.length < 1) {
     console.error(
       JSON.stringify({
-        error: error.message,
-        stack: error.stack,
+        error: 'Usage: node axe-playwright.js <url> [device] [--wait-for=networkidle] [--interception=a11y-minimal]',
+        example: 'node axe-playwright.js https://example.com mobile',
       })
     );
     process.exit(1);
-  } finally {
-    if (browser) {
-      await browser.close();
-    }
   }
-}
 
-// Parse command line arguments
-const args = process.argv.slice(2);
-if (args.length < 1) {
-  console.error(
-    JSON.stringify({
-      error: 'Usage: node axe-playwright.js <url> [device]',
-      example: 'node axe-playwright.js https://example.com mobile',
-    })
-  );
-  process.exit(1);
-}
+  const url = positional[0];
+  const device = positional[1] || 'mobile';
 
-const url = args[0];
-const device = args[1] || 'mobile';
+  // Validate URL
+  if (!url.startsWith('http://') && !url.startsWith('https://')) {
+    console.error(
+      JSON.stringify({
+        error: 'URL must start with http:// or https://',
+      })
+    );
+    process.exit(1);
+  }
 
-// Validate URL
-if (!url.startsWith('http://') && !url.startsWith('https://')) {
-  console.error(
-    JSON.stringify({
-      error: 'URL must start with http:// or https://',
+  // Run the scan
+  const navigation = {
+    waitFor: waitFlag ? waitFlag.split('=')[1] : undefined,
+    interception: interceptionFlag ? interceptionFlag.split('=')[1] : undefined,
+  };
+  runAxeScan(url, device, { navigation })
+    .then((results) => {
+      // Output results as JSON
+      console.log(JSON.stringify(results, null, 2));
     })
-  );
-  process.exit(1);
+    .catch((error) => {
+      console.error(
+        JSON.stringify({
+          error: error.message,
+          stack: error.stack,
+        })
+      );
+      process.exit(1);
+    });
 }
 
-// Run the scan
-runAxeScan(url, device).catch((error) => {
-  console.error(
-    JSON.stringify({
-      error: error.message,
-      stack: error.stack,
-    })
-  );
-  process.exit(1);
-});
+if (require.main === module) {
+  main();
+}
+
+module.exports = { DEVICE_PROFILES, runAxeScan };
@@ -0,0 +1,47 @@
+#!/usr/bin/env node
+/**
+ * Long-lived Chromium server used by the Python browser pool
+ *
+ * Prints a single JSON line with the WebSocket endpoint, then keeps the
+ * browser warm until stdin is closed or the process is terminated.
+ */
+
+const { chromium } = require('playwright');
+
+async function startBrowserServer() {
+  const server = await chromium.launchServer({ headless: true });
+  const browserProcess = server.process();
+
+  console.log(
+    JSON.stringify({
+      wsEndpoint: server.wsEndpoint(),
+      pid: browserProcess ? browserProcess.pid : null,
+    })
+  );
+
+  let closing = false;
+  const shutdown = async () => {
+    if (closing) {
+      return;
+    }
+    closing = true;
+    await server.close().catch(() => {});
+    process.exit(0);
+  };
+
+  // The pool closes stdin to request shutdown; this also covers a dead parent
+  process.stdin.on('end', shutdown);
+  process.stdin.resume();
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+}
+
+startBrowserServer().catch((error) => {
+  console.error(
+    JSON.stringify({
+      error: error.message,
+      stack: error.stack,
+    })
+  );
+  process.exit(1);
+});
@@ -0,0 +1,74 @@
+/**
+ * Artifact paths shared by the Node tools
+ *
+ * Screenshots go into the content-addressed artifact store shared with the
+ * Python tools (mcp/tools/artifact_store.py): objects/ab/cd/<sha256>.<ext>
+ * plus one manifest.jsonl line per write. Retention runs on the Python side.
+ */
+
+const crypto = require('node:crypto');
+const path = require('node:path');
+const fs = require('node:fs');
+
+const ARTIFACTS_DIR = path.join(__dirname, '..', '..', 'artifacts');
+const STORE_DIR = process.env.ARTIFACT_STORE_DIR || path.join(ARTIFACTS_DIR, 'store');
+
+// Create artifacts directory on first use
+function ensureArtifactsDir() {
+  if (!fs.existsSync(ARTIFACTS_DIR)) {
+    fs.mkdirSync(ARTIFACTS_DIR, { recursive: true });
+  }
+  return ARTIFACTS_DIR;
+}
+
+/**
+ * Store content by hash; identical content is written once.
+ *
+ * @param {Buffer} data
+ * @param {object} options
+ * @param {string} options.kind - e.g. 'screenshot'
+ * @param {string} options.ext - file extension without dot
+ * @param {object} [options.meta] - extra manifest fields
+ * @returns {Promise<{id: string, path: string, bytes: number, storedBytes: number, deduplicated: boolean}>}
+ */
+async function storeArtifact(data, { kind, ext, meta = {} }) {
+  const id = crypto.createHash('sha256').update(data).digest('hex');
+  const relative = path.posix.join('objects', id.slice(0, 2), id.slice(2, 4), `${id}.${ext}`);
+  const target = path.join(STORE_DIR, relative);
+
+  let deduplicated = true;
+  try {
+    const now = new Date();
+    await fs.promises.utimes(target, now, now);
+  } catch {
+    deduplicated = false;
+    await fs.promises.mkdir(path.dirname(target), { recursive: true });
+    const tmp = `${target}.${process.pid}.${crypto.randomBytes(4).toString('hex')}.tmp`;
+    await fs.promises.writeFile(tmp, data);
+    await fs.promises.rename(tmp, target);
+  }
+
+  const entry = {
+    id,
+    kind,
+    name: null,
+    path: relative,
+    bytes: data.length,
+    storedBytes: data.length,
+    createdAt: new Date().toISOString(),
+    ...meta,
+  };
+  await fs.promises.appendFile(path.join(STORE_DIR, 'manifest.jsonl'), `${JSON.stringify(entry)}\n`);
+
+  return { id, path: target, bytes: data.length, storedBytes: data.length, deduplicated };
+}
+
+/**
+ * Full-page screenshot written through the artifact store.
+ */
+async function storeScreenshot(page, width, height) {
+  const data = await page.screenshot({ fullPage: true });
+  return storeArtifact(data, { kind: 'screenshot', ext: 'png', meta: { width, height } });
+}
+
+module.exports = { ensureArtifactsDir, storeArtifact, storeScreenshot };
@@ -0,0 +1,26 @@
+/**
+ * Shared browser acquisition for the Playwright-based tools
+ */
+
+const { chromium } = require('playwright');
+
+/**
+ * Connect to a pooled browser server when an endpoint is available,
+ * otherwise launch a private headless Chromium.
+ *
+ * Calling close() on a connected browser only closes the contexts this
+ * process created and disconnects, so the pooled instance stays warm.
+ */
+async function acquireBrowser(wsEndpoint = process.env.PLAYWRIGHT_WS_ENDPOINT) {
+  if (wsEndpoint) {
+    try {
+      return await chromium.connect(wsEndpoint, { timeout: 10000 });
+    } catch (error) {
+      console.error(`Pooled browser unavailable (${error.message}), launching a private one`);
+    }
+  }
+
+  return chromium.launch({ headless: true });
+}
+
+module.exports = { acquireBrowser };
@@ -0,0 +1,117 @@
+/**
+ * Request interception profiles for audit navigations
+ *
+ * Each tool loads pages with a named profile that decides, per request,
+ * whether it is allowed through, blocked, or answered with a stub. Most
+ * audits do not need third-party fonts, video, ads or tracking scripts, and
+ * loading them dominates page-load time.
+ *
+ * Profiles:
+ *   full          - everything except tracker/ad hosts
+ *   layout        - full minus audio/video (responsive checks need fonts and images)
+ *   a11y-minimal  - no media or fonts, images stubbed with a 1x1 GIF (axe reads
+ *                   attributes and computed styles, not pixels)
+ *   headers-only  - the main document only (security header checks)
+ *
+ * Tracker scripts are stubbed with an empty script rather than aborted so
+ * pages do not take their error paths; other tracker requests are aborted.
+ */
+
+const { domains: TRACKER_DOMAINS } = require('./tracker-domains.json');
+
+const TRACKERS = new Set(TRACKER_DOMAINS);
+
+// Smallest transparent GIF
+const PIXEL_GIF = Buffer.from('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7', 'base64');
+
+const PROFILES = {
+  full: { blockTypes: [], stubTypes: [] },
+  layout: { blockTypes: ['media'], stubTypes: [] },
+  'a11y-minimal': { blockTypes: ['media', 'font'], stubTypes: ['image'] },
+  'headers-only': { allowTypes: ['document'], blockTypes: [], stubTypes: [] },
+};
+
+/**
+ * Whether a URL's host is (a subdomain of) a blocklisted tracker host.
+ */
+function isTrackerUrl(url) {
+  const labels = url.hostname.split('.');
+  for (let i = 0; i < labels.length - 1; i++) {
+    if (TRACKERS.has(labels.slice(i).join('.'))) {
+      return true;
+    }
+  }
+  return false;
+}
+
+function decide(profile, request, blockTrackers) {
+  const type = request.resourceType();
+  if (blockTrackers && isTrackerUrl(new URL(request.url()))) {
+    return type === 'script' ? 'stub' : 'block';
+  }
+  if (profile.allowTypes && !profile.allowTypes.includes(type)) {
+    return 'block';
+  }
+  if (profile.blockTypes.includes(type)) {
+    return 'block';
+  }
+  if (profile.stubTypes.includes(type)) {
+    return 'stub';
+  }
+  return 'allow';
+}
+
+function stubResponse(type) {
+  if (type === 'image') {
+    return { status: 200, contentType: 'image/gif', body: PIXEL_GIF };
+  }
+  if (type === 'script') {
+    return { status: 200, contentType: 'application/javascript', body: '' };
+  }
+  if (type === 'stylesheet') {
+    return { status: 200, contentType: 'text/css', body: '' };
+  }
+  return { status: 204, body: '' };
+}
+
+/**
+ * Route a page's requests through a profile.
+ *
+ * Allowed requests fall back to other handlers (e.g. a context-level
+ * network cache). The returned counts keep updating while the page is open.
+ *
+ * @param {import('playwright').Page} page
+ * @param {string} name - profile name
+ * @param {object} [options]
+ * @param {boolean} [options.blockTrackers=true]
+ * @returns {Promise<{profile: string, allowed: number, blocked: number, stubbed: number, interceptedByType: object}>}
+ */
+async function applyInterception(page, name = 'full', { blockTrackers = true } = {}) {
+  const profile = PROFILES[name];
+  if (!profile) {
+    throw new Error(`Unknown interception profile: ${name}. Use one of: ${Object.keys(PROFILES).join(', ')}`);
+  }
+
+  const counts = { profile: name, allowed: 0, blocked: 0, stubbed: 0, interceptedByType: {} };
+  await page.route('**/*', (route) => {
+    const request = route.request();
+    const decision = decide(profile, request, blockTrackers);
+
+    if (decision === 'allow') {
+      counts.allowed += 1;
+      return route.fallback();
+    }
+
+    const type = request.resourceType();
+    counts.interceptedByType[type] = (counts.interceptedByType[type] || 0) + 1;
+    if (decision === 'stub') {
+      counts.stubbed += 1;
+      return route.fulfill(stubResponse(type));
+    }
+    counts.blocked += 1;
+    return route.abort('blockedbyclient');
+  });
+  return counts;
+}
+
+module.exports = { PROFILES, applyInterception, isTrackerUrl };
@@ -0,0 +1,161 @@
+/**
+ * In-page layout checks shared by the responsive and page audits
+ *
+ * analyzeLayout is passed to page.evaluate() and runs in the browser, so it
+ * must not reference anything outside its own body.
+ */
+
+/* eslint-env browser */
+
+/**
+ * Find horizontally overflowing elements and undersized tap targets in one
+ * walk of the element tree.
+ *
+ * Phases (each timed):
+ * - layout: force the pending layout once, before any measurement
+ * - collect: pre-order walk of rendered elements, recording subtree extents;
+ *   no geometry is read here
+ * - measure: read every element's box back to back (the page is never
+ *   written to, so layout is not recomputed between reads). Subtrees without
+ *   a box (display: none) or inside a collapsed clipping container are
+ *   skipped, and descendants of a clipping container cannot overflow the page
+ * - report: serialize the first `limit` findings of each kind
+ */
+function analyzeLayout({ minTapSize = 44, limit = 5 } = {}) {
+  const SKIP_TAGS = new Set(['head', 'script', 'style', 'link', 'meta', 'noscript', 'template', 'title']);
+  const CLIPPING = new Set(['hidden', 'clip', 'auto', 'scroll']);
+  const CLICKABLE =
+    'a, button, input[type="button"], input[type="submit"], [onclick], [role="button"]';
+  const now = () => performance.now();
+  const timings = {};
+  const started = now();
+
+  let phase = now();
+  document.documentElement.getBoundingClientRect();
+  timings.layout = now() - phase;
+
+  // Pre-order element list; end[i] is the index just past element i's subtree
+  phase = now();
+  const elements = [];
+  const parent = [];
+  const end = [];
+  const stack = [{ element: document.documentElement, parent: -1 }];
+  while (stack.length > 0) {
+    const item = stack.pop();
+    if (item.exit !== undefined) {
+      end[item.exit] = elements.length;
+      continue;
+    }
+    const index = elements.length;
+    elements.push(item.element);
+    parent.push(item.parent);
+    stack.push({ exit: index });
+    // SVG internals are measured through their <svg> root
+    if (item.element.localName === 'svg') {
+      continue;
+    }
+    const children = item.element.children;
+    for (let i = children.length - 1; i >= 0; i--) {
+      if (!SKIP_TAGS.has(children[i].localName)) {
+        stack.push({ element: children[i], parent: index });
+      }
+    }
+  }
+  const clickable = new Set(document.querySelectorAll(CLICKABLE));
+  timings.collect = now() - phase;
+
+  phase = now();
+  const viewportWidth = window.innerWidth;
+  const insideClip = new Uint8Array(elements.length);
+  const clips = new Uint8Array(elements.length);
+  const overflowing = [];
+  const smallTargets = [];
+  let measured = 0;
+  let pruned = 0;
+
+  for (let i = 0; i < elements.length; ) {
+    const element = elements[i];
+    const rect = element.getBoundingClientRect();
+    measured += 1;
+
+    const p = parent[i];
+    insideClip[i] = p >= 0 && (insideClip[p] || clips[p]) ? 1 : 0;
+
+    // No box at all: display: none hides the whole subtree (display: contents does not)
+    if (rect.width === 0 && rect.height === 0 && element.getClientRects().length === 0) {
+      if (getComputedStyle(element).display === 'none') {
+        pruned += end[i] - i - 1;
+        i = end[i];
+        continue;
+      }
+    }
+
+    // Only elements whose content exceeds their box can clip; check style for those alone
+    if (element.scrollWidth > element.clientWidth && CLIPPING.has(getComputedStyle(element).overflowX)) {
+      clips[i] = 1;
+      if (rect.width === 0 || rect.height === 0) {
+        // Collapsed container (closed menu, zero-height accordion): nothing inside is visible
+        pruned += end[i] - i - 1;
+        i = end[i];
+        continue;
+      }
+    }
+
+    if (!insideClip[i] && rect.width > viewportWidth) {
+      overflowing.push(element);
+    }
+    if (clickable.has(element) && (rect.width < minTapSize || rect.height < minTapSize)) {
+      smallTargets.push({ element, width: rect.width, height: rect.height });
+    }
+    i += 1;
+  }
+  timings.measure = now() - phase;
+
+  phase = now();
+  const describe = (element) => ({
+    tagName: element.tagName,
+    className: typeof element.className === 'string' ? element.className : element.getAttribute('class') || '',
+    id: element.id,
+  });
+  const overflowElements = overflowing.slice(0, limit).map(describe);
+  const smallTapTargets = smallTargets
+    .slice(0, limit)
+    .map(({ element, width, height }) => ({ ...describe(element), width, height }));
+  timings.report = now() - phase;
+
+  timings.total = now() - started;
+  for (const key of Object.keys(timings)) {
+    timings[key] = Math.round(timings[key] * 10) / 10;
+  }
+
+  return {
+    overflowCount: overflowing.length,
+    overflowElements,
+    badTapTargets: smallTargets.length,
+    smallTapTargets,
+    stats: { elements: elements.length, measured, pruned },
+    timings,
+  };
+}
+
+/**
+ * Run the layout analysis and build the per-viewport summary used by responsive_audit.
+ */
+async function summarizeViewport(page, { viewport, width, height, screenshotPath }) {
+  const layout = await page.evaluate(analyzeLayout, { limit: 5 });
+
+  return {
+    viewport: viewport,
+    width: width,
+    height: height,
+    screenshotPath: screenshotPath,
+    overflowCount: layout.overflowCount,
+    overflowElements: layout.overflowElements, // Limited to first 5
+    badTapTargets: layout.badTapTargets,
+    smallTapTargets: layout.smallTapTargets, // Limited to first 5
+    layoutStats: layout.stats,
+    layoutTimings: layout.timings,
+  };
+}
+
+module.exports = { analyzeLayout, summarizeViewport };
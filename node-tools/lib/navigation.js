@@ -0,0 +1,160 @@
+/**
+ * Navigation wait strategies shared by the Playwright-based tools
+ *
+ * page.goto() only waits for `load` (or `domcontentloaded`); any further
+ * settling — network idle, LCP settled, DOM mutations quiet — is bounded
+ * by a short settle timeout and never fails the navigation, so pages with
+ * beacons or long-polling are audited as soon as the settle window ends
+ * instead of hanging until the navigation timeout. Requests go through an
+ * interception profile (lib/interception.js); analytics and ad hosts are
+ * blocked by default.
+ *
+ * Strategies:
+ *   load, domcontentloaded  - the corresponding page event only
+ *   networkidle             - no requests for 500 ms (Playwright's definition)
+ *   lcp                     - no new largest-contentful-paint entry for quietMs
+ *   dom-quiet               - no DOM mutations for quietMs
+ */
+
+/* eslint-env browser */
+
+const { applyInterception } = require('./interception');
+
+const WAIT_STRATEGIES = ['load', 'domcontentloaded', 'networkidle', 'lcp', 'dom-quiet'];
+
+function defaults() {
+  return {
+    waitFor: process.env.NAVIGATION_WAIT || 'networkidle',
+    timeout: 30000,
+    settleTimeout: Number(process.env.NAVIGATION_SETTLE_TIMEOUT_MS) || 5000,
+    quietMs: Number(process.env.NAVIGATION_QUIET_MS) || 500,
+    blockTrackers: process.env.NAVIGATION_BLOCK_TRACKERS !== 'false',
+    interception: 'full',
+  };
+}
+
+// Runs in the page
+function waitForLcpSettled({ quietMs, maxMs }) {
+  return new Promise((resolve) => {
+    const start = performance.now();
+    let last = start;
+    let observer;
+    try {
+      observer = new PerformanceObserver(() => {
+        last = performance.now();
+      });
+      observer.observe({ type: 'largest-contentful-paint', buffered: true });
+    } catch {
+      resolve(true);
+      return;
+    }
+
+    const check = () => {
+      const now = performance.now();
+      if (now - last >= quietMs || now - start >= maxMs) {
+        observer.disconnect();
+        resolve(now - last >= quietMs);
+      } else {
+        setTimeout(check, Math.min(100, quietMs));
+      }
+    };
+    check();
+  });
+}
+
+// Runs in the page
+function waitForDomQuiet({ quietMs, maxMs }) {
+  return new Promise((resolve) => {
+    const start = performance.now();
+    let last = start;
+    const observer = new MutationObserver(() => {
+      last = performance.now();
+    });
+    observer.observe(document.documentElement, {
+      subtree: true,
+      childList: true,
+      attributes: true,
+      characterData: true,
+    });
+
+    const check = () => {
+      const now = performance.now();
+      if (now - last >= quietMs || now - start >= maxMs) {
+        observer.disconnect();
+        resolve(now - last >= quietMs);
+      } else {
+        setTimeout(check, Math.min(100, quietMs));
+      }
+    };
+    check();
+  });
+}
+
+async function settle(page, waitFor, { settleTimeout, quietMs }) {
+  try {
+    if (waitFor === 'networkidle') {
+      await page.waitForLoadState('networkidle', { timeout: settleTimeout });
+      return true;
+    }
+    if (waitFor === 'lcp') {
+      return await page.evaluate(waitForLcpSettled, { quietMs, maxMs: settleTimeout });
+    }
+    if (waitFor === 'dom-quiet') {
+      return await page.evaluate(waitForDomQuiet, { quietMs, maxMs: settleTimeout });
+    }
+    return true;
+  } catch {
+    // Settle timeout or the page navigated away mid-wait: audit what is loaded
+    return false;
+  }
+}
+
+/**
+ * Navigate and wait according to a strategy.
+ *
+ * @param {import('playwright').Page} page
+ * @param {string} url
+ * @param {object} [options]
+ * @param {string} [options.waitFor] - one of WAIT_STRATEGIES (default NAVIGATION_WAIT or networkidle)
+ * @param {number} [options.timeout] - navigation timeout in ms
+ * @param {number} [options.settleTimeout] - upper bound for the settle phase in ms
+ * @param {number} [options.quietMs] - quiet window for lcp and dom-quiet
+ * @param {boolean} [options.blockTrackers] - block/stub requests to analytics/ad hosts
+ * @param {string} [options.interception] - interception profile (full, layout, a11y-minimal, headers-only)
+ * @returns {Promise<{response: import('playwright').Response|null, navigation: object}>}
+ */
+async function navigate(page, url, options = {}) {
+  const config = { ...defaults() };
+  for (const [key, value] of Object.entries(options)) {
+    if (value !== undefined && value !== null) {
+      config[key] = value;
+    }
+  }
+  if (!WAIT_STRATEGIES.includes(config.waitFor)) {
+    throw new Error(`Unknown wait strategy: ${config.waitFor}. Use one of: ${WAIT_STRATEGIES.join(', ')}`);
+  }
+
+  const requests = await applyInterception(page, config.interception, { blockTrackers: config.blockTrackers });
+
+  const started = Date.now();
+  const response = await page.goto(url, {
+    waitUntil: config.waitFor === 'domcontentloaded' ? 'domcontentloaded' : 'load',
+    timeout: config.timeout,
+  });
+  const loadedMs = Date.now() - started;
+  const settled = await settle(page, config.waitFor, config);
+
+  return {
+    response,
+    navigation: {
+      waitFor: config.waitFor,
+      loadMs: loadedMs,
+      ms: Date.now() - started,
+      settled,
+      // Live counts: they keep updating until the tool serializes its result
+      requests,
+    },
+  };
+}
+
+module.exports = { WAIT_STRATEGIES, navigate };
@@ -0,0 +1,68 @@
+/**
+ * In-memory subresource cache shared by the browser contexts of one audit
+ *
+ * Each viewport renders in its own context, and contexts do not share
+ * Chrome's HTTP cache. Routing static GET requests through this cache
+ * means stylesheets, scripts, images and fonts are downloaded once per
+ * audit. Concurrent requests for the same URL wait on the first fetch.
+ */
+
+const CACHEABLE_TYPES = new Set(['stylesheet', 'script', 'image', 'font']);
+
+const DEFAULT_MAX_BYTES = 64 * 1024 * 1024;
+
+function createNetworkCache({ maxBytes = DEFAULT_MAX_BYTES } = {}) {
+  const entries = new Map();
+  const stats = { hits: 0, misses: 0, bytes: 0 };
+
+  async function fetchEntry(route) {
+    const response = await route.fetch();
+    const body = await response.body();
+    return { status: response.status(), headers: response.headers(), body };
+  }
+
+  async function handle(route) {
+    const request = route.request();
+    if (request.method() !== 'GET' || !CACHEABLE_TYPES.has(request.resourceType())) {
+      await route.fallback();
+      return;
+    }
+
+    const key = request.url();
+    let pending = entries.get(key);
+    if (pending) {
+      stats.hits += 1;
+    } else {
+      stats.misses += 1;
+      pending = fetchEntry(route);
+      entries.set(key, pending);
+    }
+
+    let entry;
+    try {
+      entry = await pending;
+    } catch {
+      entries.delete(key);
+      await route.fallback().catch(() => {});
+      return;
+    }
+
+    const cacheControl = entry.headers['cache-control'] || '';
+    if (entry.status !== 200 || cacheControl.includes('no-store') || stats.bytes + entry.body.length > maxBytes) {
+      entries.delete(key);
+    } else if (!entry.counted) {
+      entry.counted = true;
+      stats.bytes += entry.body.length;
+    }
+
+    await route.fulfill({ status: entry.status, headers: entry.headers, body: entry.body });
+  }
+
+  return {
+    /** Route a context's static requests through the cache. */
+    attach: (context) => context.route('**/*', handle),
+    stats: () => ({ ...stats, entries: entries.size }),
+  };
+}
+
+module.exports = { createNetworkCache };
@@ -0,0 +1,25 @@
+/**
+ * Bounded parallelism for per-viewport work
+ */
+
+/**
+ * Map items through an async function with at most `limit` calls in flight.
+ * Results keep the order of the input.
+ */
+async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+
+  async function worker() {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  }
+
+  const workers = Math.max(1, Math.min(limit || 1, items.length));
+  await Promise.all(Array.from({ length: workers }, worker));
+  return results;
+}
+
+module.exports = { mapWithConcurrency };
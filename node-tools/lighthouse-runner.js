@@ -0,0 +1,234 @@
+/**
+ * Lighthouse runner using the Node API
+ *
+ * Imports Lighthouse once and returns only the categories and selected
+ * audits; the full LHR is written to disk only when a report path is given
+ * (gzip-compressed when the path ends in .gz).
+ * Lighthouse keeps process-global state, so runs in one process are
+ * serialized. Runs against an already running Chrome (port) audit a page in
+ * a new browser context, so cookies, cache, service workers and storage from
+ * earlier runs in that Chrome are not visible.
+ */
+
+const fs = require('node:fs');
+const path = require('node:path');
+const { pipeline } = require('node:stream/promises');
+const zlib = require('node:zlib');
+const { ensureArtifactsDir } = require('./lib/artifacts');
+
+const KEY_AUDITS = [
+  'first-contentful-paint',
+  'largest-contentful-paint',
+  'cumulative-layout-shift',
+  'total-blocking-time',
+  'speed-index',
+];
+
+const SKIPPED_AUDITS = {
+  full: ['unused-javascript', 'unused-css-rules', 'largest-contentful-paint-element', 'screenshot-thumbnails'],
+  fast: ['screenshot-thumbnails', 'final-screenshot', 'full-page-screenshot'],
+};
+
+let lighthouseModule;
+let desktopConfig;
+let chromeLauncher;
+let puppeteer;
+let queue = Promise.resolve();
+
+// Lighthouse and chrome-launcher are ESM-only; import them once per process
+function loadLighthouse() {
+  if (!lighthouseModule) {
+    lighthouseModule = import('lighthouse').then((module) => module.default);
+  }
+  return lighthouseModule;
+}
+
+function loadDesktopConfig() {
+  if (!desktopConfig) {
+    desktopConfig = import('lighthouse/core/config/desktop-config.js').then((module) => module.default);
+  }
+  return desktopConfig;
+}
+
+function loadChromeLauncher() {
+  if (!chromeLauncher) {
+    chromeLauncher = import('chrome-launcher');
+  }
+  return chromeLauncher;
+}
+
+// Use the puppeteer-core Lighthouse depends on, so pages match its version
+function loadPuppeteer() {
+  if (!puppeteer) {
+    const lighthouseDir = path.join(__dirname, 'node_modules', 'lighthouse');
+    puppeteer = require(require.resolve('puppeteer-core', { paths: [lighthouseDir] }));
+  }
+  return puppeteer;
+}
+
+/**
+ * Open a page in a fresh browser context of the Chrome listening on port.
+ * close() disposes of the context and its storage.
+ */
+async function openIsolatedPage(port) {
+  const browser = await loadPuppeteer().connect({ browserURL: `http://127.0.0.1:${port}`, defaultViewport: null });
+  try {
+    const context = browser.createBrowserContext
+      ? await browser.createBrowserContext()
+      : await browser.createIncognitoBrowserContext();
+    const page = await context.newPage();
+    return {
+      page,
+      close: async () => {
+        await context.close().catch(() => {});
+        await browser.disconnect();
+      },
+    };
+  } catch (error) {
+    await browser.disconnect();
+    throw error;
+  }
+}
+
+function serialize(job) {
+  const run = queue.then(job, job);
+  queue = run.catch(() => {});
+  return run;
+}
+
+function pickAudit(audit) {
+  if (!audit) {
+    return {};
+  }
+  const { id, title, description, score, scoreDisplayMode, displayValue, numericValue, numericUnit } = audit;
+  return { id, title, description, score, scoreDisplayMode, displayValue, numericValue, numericUnit };
+}
+
+/**
+ * Keep the sections the Python tools use from a full LHR.
+ */
+function summarizeLhr(lhr, audits = KEY_AUDITS) {
+  const categories = {};
+  for (const [id, category] of Object.entries(lhr.categories || {})) {
+    categories[id] = { id, title: category.title, score: category.score };
+  }
+
+  const selected = {};
+  for (const id of audits) {
+    selected[id] = pickAudit(lhr.audits?.[id]);
+  }
+
+  return {
+    lighthouseVersion: lhr.lighthouseVersion,
+    requestedUrl: lhr.requestedUrl,
+    finalUrl: lhr.finalDisplayedUrl || lhr.finalUrl,
+    fetchTime: lhr.fetchTime,
+    runtimeError: lhr.runtimeError,
+    runWarnings: lhr.runWarnings,
+    categories,
+    audits: selected,
+  };
+}
+
+async function writeReport(reportPath, lhr) {
+  const json = JSON.stringify(lhr);
+  if (!reportPath.endsWith('.gz')) {
+    await fs.promises.writeFile(reportPath, json);
+    return;
+  }
+  await pipeline(
+    async function* source() {
+      yield json;
+    },
+    zlib.createGzip({ level: 6 }),
+    fs.createWriteStream(reportPath)
+  );
+}
+
+function defaultReportPath(url) {
+  const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
+  const host = new URL(url).hostname.replace(/[^a-z0-9.-]/gi, '_');
+  return path.join(ensureArtifactsDir(), `lighthouse-${host}-${timestamp}.json`);
+}
+
+/**
+ * Run Lighthouse against a URL.
+ *
+ * @param {string} url
+ * @param {object} options
+ * @param {'mobile'|'desktop'} options.device
+ * @param {'full'|'fast'} options.mode - fast audits performance only
+ * @param {boolean} options.localhost - use provided throttling and skip slow audits
+ * @param {number} [options.port] - debugging port of a running Chrome (audited in a new browser context); launched when absent
+ * @param {string[]} [options.chromeFlags] - flags for a launched Chrome
+ * @param {boolean|string} [options.saveReport] - write the full LHR (to this path, or artifacts/; .gz paths are compressed)
+ * @param {string[]} [options.audits] - audit ids to return
+ */
+async function runLighthouse(url, options = {}) {
+  const {
+    device = 'mobile',
+    mode = 'full',
+    localhost = false,
+    port,
+    chromeFlags = [],
+    saveReport = false,
+    audits = KEY_AUDITS,
+  } = options;
+
+  return serialize(async () => {
+    const lighthouse = await loadLighthouse();
+    const config = device === 'desktop' ? await loadDesktopConfig() : undefined;
+
+    let chrome;
+    let isolated;
+    let debuggingPort = port;
+    if (debuggingPort) {
+      isolated = await openIsolatedPage(debuggingPort);
+    } else {
+      const { launch } = await loadChromeLauncher();
+      chrome = await launch({ chromeFlags });
+      debuggingPort = chrome.port;
+    }
+
+    // Storage reset is skipped only where the browser state is fresh anyway
+    const flags = { port: debuggingPort, output: 'json', logLevel: 'error' };
+    if (mode === 'fast') {
+      Object.assign(flags, {
+        onlyCategories: ['performance'],
+        throttlingMethod: 'provided',
+        disableStorageReset: true,
+        skipAudits: SKIPPED_AUDITS.fast,
+      });
+    } else if (localhost) {
+      Object.assign(flags, {
+        throttlingMethod: 'provided',
+        disableStorageReset: true,
+        skipAudits: SKIPPED_AUDITS.full,
+      });
+    }
+
+    try {
+      const runnerResult = await lighthouse(url, flags, config, isolated?.page);
+      if (!runnerResult?.lhr) {
+        throw new Error('Lighthouse returned no result');
+      }
+
+      const summary = summarizeLhr(runnerResult.lhr, audits);
+      if (saveReport) {
+        const reportPath = typeof saveReport === 'string' ? saveReport : defaultReportPath(url);
+        await writeReport(reportPath, runnerResult.lhr);
+        summary.reportPath = reportPath;
+      }
+      return summary;
+    } finally {
+      if (isolated) {
+        await isolated.close();
+      }
+      if (chrome) {
+        await chrome.kill();
+      }
+    }
+  });
+}
+
+module.exports = { KEY_AUDITS, runLighthouse, summarizeLhr };
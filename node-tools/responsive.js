@@ -3,185 +3,162 @@
  * Responsive design audit using Playwright
  */
 
-const { chromium } = require('playwright');
-const path = require('node:path');
-const fs = require('node:fs');
+const { storeScreenshot } = require('./lib/artifacts');
+const { acquireBrowser } = require('./lib/browser');
+const { summarizeViewport } = require('./lib/layout-checks');
+const { navigate } = require('./lib/navigation');
+const { createNetworkCache } = require('./lib/network-cache');
+const { mapWithConcurrency } = require('./lib/parallel');
 
-async function runResponsiveAudit(url, viewports) {
-  let browser;
+const VIEWPORT_PATTERN = /^\d+x\d+$/;
+
+const DEFAULT_MAX_PARALLEL = Number(process.env.RESPONSIVE_MAX_PARALLEL) || 3;
+
+/**
+ * Load the page in its own context at one viewport and summarize it.
+ */
+async function auditViewport(browser, url, viewport, networkCache, navigation) {
+  const [width, height] = viewport.split('x').map(Number);
+  const started = Date.now();
+
+  const context = await browser.newContext({
+    viewport: { width, height },
+  });
 
   try {
-    // Launch browser
-    browser = await chromium.launch({ headless: true });
+    if (networkCache) {
+      await networkCache.attach(context);
+    }
+    const page = await context.newPage();
 
-    const results = {
-      url: url,
-      timestamp: new Date().toISOString(),
-      summaries: [],
+    // Navigate to URL
+    const { navigation: nav } = await navigate(page, url, {
+      ...navigation,
+      interception: navigation.interception || 'layout',
+    });
+
+    // Take screenshot
+    const { path: screenshotPath } = await storeScreenshot(page, width, height);
+
+    // Check overflow and tap targets, then add summary for this viewport
+    const summary = await summarizeViewport(page, { viewport, width, height, screenshotPath });
+    return { ...summary, navigation: nav, ms: Date.now() - started };
+  } catch (error) {
+    return {
+      viewport: viewport,
+      width: width,
+      height: height,
+      error: error.message,
+      ms: Date.now() - started,
     };
+  } finally {
+    await context.close();
+  }
+}
 
-    // Create artifacts directory
-    const artifactsDir = path.join(__dirname, '..', 'artifacts');
-    if (!fs.existsSync(artifactsDir)) {
-      fs.mkdirSync(artifactsDir, { recursive: true });
+/**
+ * Audit each viewport and return per-viewport summaries.
+ * Viewports render in parallel contexts of one browser, at most
+ * `maxParallel` at a time; with `shareCache` they download each static
+ * resource once. `navigation` holds navigate() options (waitFor,
+ * interception, ...); pages load with the layout profile by default.
+ * When a shared browser is passed it is left open for the caller.
+ */
+async function runResponsiveAudit(
+  url,
+  viewports,
+  { browser: sharedBrowser, maxParallel = DEFAULT_MAX_PARALLEL, shareCache = true, navigation = {} } = {}
+) {
+  // Validate viewports before paying for a browser
+  for (const viewport of viewports) {
+    if (!VIEWPORT_PATTERN.test(viewport)) {
+      throw new Error(`Invalid viewport format: ${viewport}. Use format: 360x640`);
     }
+  }
 
-    // Test each viewport
-    for (const viewport of viewports) {
-      const [width, height] = viewport.split('x').map(Number);
-
-      if (!width || !height) {
-        console.error(`Invalid viewport format: ${viewport}. Use format: 360x640`);
-        continue;
-      }
-
-      const context = await browser.newContext({
-        viewport: { width, height },
-      });
-
-      const page = await context.newPage();
-
-      try {
-        // Navigate to URL
-        await page.goto(url, { waitUntil: 'networkidle', timeout: 30000 });
-
-        // Take screenshot
-        const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
-        const screenshotPath = path.join(
-          artifactsDir,
-          `screenshot-${width}x${height}-${timestamp}.png`
-        );
-        await page.screenshot({ path: screenshotPath, fullPage: true });
-
-        // Check for horizontal overflow
-        const overflowElements = await page.evaluate(() => {
-          /* eslint-env browser */
-          const elements = document.querySelectorAll('*');
-          const overflowing = [];
-
-          for (const element of elements) {
-            const rect = element.getBoundingClientRect();
-            if (rect.width > window.innerWidth) {
-              overflowing.push({
-                tagName: element.tagName,
-                className: element.className,
-                id: element.id,
-              });
-            }
-          }
-
-          return overflowing;
-        });
-
-        // Check tap target sizes
-        const smallTapTargets = await page.evaluate(() => {
-          /* eslint-env browser */
-          const minTapSize = 44; // 44px minimum recommended
-          const clickableSelectors =
-            'a, button, input[type="button"], input[type="submit"], [onclick], [role="button"]';
-          const clickableElements = document.querySelectorAll(clickableSelectors);
-          const smallTargets = [];
-
-          for (const element of clickableElements) {
-            const rect = element.getBoundingClientRect();
-            if (rect.width < minTapSize || rect.height < minTapSize) {
-              smallTargets.push({
-                tagName: element.tagName,
-                className: element.className,
-                id: element.id,
-                width: rect.width,
-                height: rect.height,
-              });
-            }
-          }
-
-          return smallTargets;
-        });
-
-        // Add summary for this viewport
-        results.summaries.push({
-          viewport: viewport,
-          width: width,
-          height: height,
-          screenshotPath: screenshotPath,
-          overflowCount: overflowElements.length,
-          overflowElements: overflowElements.slice(0, 5), // Limit to first 5
-          badTapTargets: smallTapTargets.length,
-          smallTapTargets: smallTapTargets.slice(0, 5), // Limit to first 5
-        });
-      } catch (error) {
-        results.summaries.push({
-          viewport: viewport,
-          width: width,
-          height: height,
-          error: error.message,
-        });
-      } finally {
-        await context.close();
-      }
-    }
+  // Connect to the pooled browser or launch a private one
+  const browser = sharedBrowser || (await acquireBrowser());
+  const started = Date.now();
 
-    // Output results as JSON
-    console.log(JSON.stringify(results, null, 2));
-  } catch (error) {
-    console.error(
-      JSON.stringify({
-        error: error.message,
-        stack: error.stack,
-      })
+  try {
+    const networkCache = shareCache ? createNetworkCache() : null;
+    const summaries = await mapWithConcurrency(viewports, maxParallel, (viewport) =>
+      auditViewport(browser, url, viewport, networkCache, navigation)
     );
-    process.exit(1);
+
+    return {
+      url: url,
+      timestamp: new Date().toISOString(),
+      summaries: summaries,
+      elapsedMs: Date.now() - started,
+      maxParallel: maxParallel,
+      networkCache: networkCache ? networkCache.stats() : null,
+    };
   } finally {
-    if (browser) {
+    if (!sharedBrowser) {
       await browser.close();
     }
   }
 }
 
-// Parse command line arguments
-const args = process.argv.slice(2);
-if (args.length < 2) {
-  console.error(
-    JSON.stringify({
-      error: 'Usage: node responsive.js <url> <viewport1> [viewport2] [viewport3] ...',
-      example: 'node responsive.js https://example.com 360x640 768x1024 1280x800',
-    })
-  );
-  process.exit(1);
-}
-
-const url = args[0];
-const viewports = args.slice(1);
-
-// Validate URL
-if (!url.startsWith('http://') && !url.startsWith('https://')) {
-  console.error(
-    JSON.stringify({
-      error: 'URL must start with http:// or https://',
-    })
-  );
-  process.exit(1);
-}
+function main() {
+  // Parse command line arguments
+  const flags = process.argv.slice(2).filter((arg) => arg.startsWith('--'));
+  const args = process.argv.slice(2).filter((arg) => !arg.startsWith('--'));
+  if (args.length < 2) {
+    console.error(
+      JSON.stringify({
+        error:
+          'Usage: node responsive.js <url> <viewport1> [viewport2] ... [--max-parallel=N] [--no-shared-cache] [--wait-for=lcp] [--interception=layout]',
+        example: 'node responsive.js https://example.com 360x640 768x1024 1280x800',
+      })
+    );
+    process.exit(1);
+  }
 
-// Validate viewports
-for (const viewport of viewports) {
-  if (!/^\d+x\d+$/.test(viewport)) {
+  const url = args[0];
+  const viewports = args.slice(1);
+  const parallelFlag = flags.find((flag) => flag.startsWith('--max-parallel='));
+  const waitFlag = flags.find((flag) => flag.startsWith('--wait-for='));
+  const interceptionFlag = flags.find((flag) => flag.startsWith('--interception='));
+  const options = {
+    maxParallel: parallelFlag ? Number(parallelFlag.split('=')[1]) || 1 : DEFAULT_MAX_PARALLEL,
+    shareCache: !flags.includes('--no-shared-cache'),
+    navigation: {
+      waitFor: waitFlag ? waitFlag.split('=')[1] : undefined,
+      interception: interceptionFlag ? interceptionFlag.split('=')[1] : undefined,
+    },
+  };
+
+  // Validate URL
+  if (!url.startsWith('http://') && !url.startsWith('https://')) {
     console.error(
       JSON.stringify({
-        error: `Invalid viewport format: ${viewport}. Use format: 360x640`,
+        error: 'URL must start with http:// or https://',
       })
     );
     process.exit(1);
   }
-}
 
-// Run the audit
-runResponsiveAudit(url, viewports).catch((error) => {
-  console.error(
-    JSON.stringify({
-      error: error.message,
-      stack: error.stack,
+  // Run the audit
+  runResponsiveAudit(url, viewports, options)
+    .then((results) => {
+      // Output results as JSON
+      console.log(JSON.stringify(results, null, 2));
     })
-  );
-  process.exit(1);
-});
+    .catch((error) => {
+      console.error(
+        JSON.stringify({
+          error: error.message,
+          stack: error.stack,
+        })
+      );
+      process.exit(1);
+    });
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = { runResponsiveAudit };
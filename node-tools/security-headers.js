@@ -3,15 +3,50 @@
  * Security headers analysis using Playwright
  */
 
-const { chromium } = require('playwright');
+const { acquireBrowser } = require('./lib/browser');
+const { navigate } = require('./lib/navigation');
 
-async function analyzeSecurityHeaders(url) {
-  let browser;
+/**
+ * Score the presence of the main security headers in a response.
+ */
+function buildHeaderAnalysis(url, responseHeaders) {
+  const analysis = {
+    url: url,
+    timestamp: new Date().toISOString(),
+    headers: responseHeaders,
+    security: {
+      'content-security-policy': !!responseHeaders['content-security-policy'],
+      'strict-transport-security': !!responseHeaders['strict-transport-security'],
+      'x-frame-options': !!responseHeaders['x-frame-options'],
+      'x-content-type-options': !!responseHeaders['x-content-type-options'],
+      'referrer-policy': !!responseHeaders['referrer-policy'],
+      'permissions-policy': !!(
+        responseHeaders['permissions-policy'] || responseHeaders['feature-policy']
+      ),
+    },
+  };
+
+  // Calculate security score
+  const securityChecks = Object.values(analysis.security);
+  const passedChecks = securityChecks.filter(Boolean).length;
+  analysis.securityScore = (passedChecks / securityChecks.length) * 100;
+
+  return analysis;
+}
+
+/**
+ * Load the page and analyze the main document's response headers.
+ * Only the document is fetched (headers-only interception profile) unless
+ * `interception` names another profile.
+ * When a shared browser is passed only the analysis context is closed.
+ */
+async function analyzeSecurityHeaders(url, { browser: sharedBrowser, interception = 'headers-only' } = {}) {
+  // Connect to the pooled browser or launch a private one
+  const browser = sharedBrowser || (await acquireBrowser());
+  let context;
 
   try {
-    // Launch browser
-    browser = await chromium.launch({ headless: true });
-    const context = await browser.newContext();
+    context = await browser.newContext();
     const page = await context.newPage();
 
     let responseHeaders = {};
@@ -23,78 +58,65 @@ async function analyzeSecurityHeaders(url) {
       }
     });
 
-    // Navigate to URL
-    await page.goto(url, { waitUntil: 'domcontentloaded', timeout: 30000 });
+    // Navigate to URL; only the main document's headers are needed
+    const { navigation } = await navigate(page, url, { waitFor: 'domcontentloaded', interception });
 
     // Analyze security headers
-    const analysis = {
-      url: url,
-      timestamp: new Date().toISOString(),
-      headers: responseHeaders,
-      security: {
-        'content-security-policy': !!responseHeaders['content-security-policy'],
-        'strict-transport-security': !!responseHeaders['strict-transport-security'],
-        'x-frame-options': !!responseHeaders['x-frame-options'],
-        'x-content-type-options': !!responseHeaders['x-content-type-options'],
-        'referrer-policy': !!responseHeaders['referrer-policy'],
-        'permissions-policy': !!(
-          responseHeaders['permissions-policy'] || responseHeaders['feature-policy']
-        ),
-      },
-    };
-
-    // Calculate security score
-    const securityChecks = Object.values(analysis.security);
-    const passedChecks = securityChecks.filter(Boolean).length;
-    analysis.securityScore = (passedChecks / securityChecks.length) * 100;
-
-    // Output results as JSON
-    console.log(JSON.stringify(analysis, null, 2));
-  } catch (error) {
+    return { ...buildHeaderAnalysis(url, responseHeaders), navigation };
+  } finally {
+    if (context) {
+      await context.close().catch(() => {});
+    }
+    if (!sharedBrowser) {
+      await browser.close();
+    }
+  }
+}
+
+function main() {
+  // Parse command line arguments
+  const interceptionFlag = process.argv.slice(2).find((arg) => arg.startsWith('--interception='));
+  const args = process.argv.slice(2).filter((arg) => !arg.startsWith('--'));
+  if (args.length < 1) {
     console.error(
       JSON.stringify({
-        error: error.message,
-        stack: error.stack,
+        error: 'Usage: node security-headers.js <url> [--interception=headers-only]',
       })
     );
     process.exit(1);
-  } finally {
-    if (browser) {
-      await browser.close();
-    }
   }
-}
 
-// Parse command line arguments
-const args = process.argv.slice(2);
-if (args.length < 1) {
-  console.error(
-    JSON.stringify({
-      error: 'Usage: node security-headers.js <url>',
-    })
-  );
-  process.exit(1);
-}
+  const url = args[0];
 
-const url = args[0];
+  // Validate URL
+  if (!url.startsWith('http://') && !url.startsWith('https://')) {
+    console.error(
+      JSON.stringify({
+        error: 'URL must start with http:// or https://',
+      })
+    );
+    process.exit(1);
+  }
 
-// Validate URL
-if (!url.startsWith('http://') && !url.startsWith('https://')) {
-  console.error(
-    JSON.stringify({
-      error: 'URL must start with http:// or https://',
+  // Run the analysis
+  analyzeSecurityHeaders(url, { interception: interceptionFlag ? interceptionFlag.split('=')[1] : undefined })
+    .then((analysis) => {
+      // Output results as JSON
+      console.log(JSON.stringify(analysis, null, 2));
     })
-  );
-  process.exit(1);
+    .catch((error) => {
+      console.error(
+        JSON.stringify({
+          error: error.message,
+          stack: error.stack,
+        })
+      );
+      process.exit(1);
+    });
 }
 
-// Run the analysis
-analyzeSecurityHeaders(url).catch((error) => {
-  console.error(
-    JSON.stringify({
-      error: error.message,
-      stack: error.stack,
-    })
-  );
-  process.exit(1);
-});
+if (require.main === module) {
+  main();
+}
+
+module.exports = { analyzeSecurityHeaders, buildHeaderAnalysis };
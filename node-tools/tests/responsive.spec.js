@@ -29,6 +29,8 @@ describe('responsive audit runner', () => {
         expect(summary).toHaveProperty('screenshotPath');
         expect(summary).toHaveProperty('overflowCount');
         expect(summary).toHaveProperty('badTapTargets');
+        expect(summary.layoutTimings).toHaveProperty('measure');
+        expect(summary.layoutStats.measured).toBeGreaterThan(0);
 
         // Check if screenshot was created
         if (summary.screenshotPath && !summary.error) {
@@ -46,6 +48,38 @@ describe('responsive audit runner', () => {
     }
   }, 120000);
 
+  it('renders viewports in parallel with a shared network cache', () => {
+    try {
+      const output = execSync(
+        'node responsive.js https://example.com 360x640 768x1024 1280x800 --max-parallel=3',
+        {
+          cwd: join(process.cwd()),
+          stdio: ['ignore', 'pipe', 'pipe'],
+          timeout: 120000,
+          encoding: 'utf8',
+        }
+      );
+
+      const result = JSON.parse(output);
+      expect(result.maxParallel).toBe(3);
+      expect(result.summaries.map((summary) => summary.viewport)).toEqual(['360x640', '768x1024', '1280x800']);
+      expect(result.networkCache).toHaveProperty('hits');
+
+      // Parallel viewports take about as long as the slowest one, not the sum
+      const slowest = Math.max(...result.summaries.map((summary) => summary.ms));
+      const total = result.summaries.reduce((sum, summary) => sum + summary.ms, 0);
+      expect(result.elapsedMs).toBeLessThan(total);
+      expect(result.elapsedMs).toBeGreaterThanOrEqual(slowest);
+    } catch (error) {
+      if (error.stdout) {
+        const result = JSON.parse(error.stdout);
+        expect(result).toHaveProperty('error');
+      } else {
+        throw error;
+      }
+    }
+  }, 120000);
+
   it('handles invalid URL gracefully', () => {
     try {
       execSync('node responsive.js invalid-url 360x640', {
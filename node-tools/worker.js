@@ -0,0 +1,143 @@
+#!/usr/bin/env node
+/**
+ * Persistent worker for the Playwright and Lighthouse tools
+ *
+ * Loads the tool modules once and serves JSON-RPC 2.0 jobs framed as one
+ * JSON object per line. Jobs run concurrently and responses are matched to
+ * requests by id, so responses may arrive out of order.
+ *
+ * Usage:
+ *   node worker.js                  # serve over stdin/stdout
+ *   node worker.js --socket <path>  # serve over a Unix socket
+ */
+
+// stdout carries the protocol; keep stray logging from corrupting frames
+console.log = (...args) => console.error(...args);
+
+const net = require('node:net');
+const readline = require('node:readline');
+const { chromium } = require('playwright');
+const { runPageAudit } = require('./audit-page');
+const { runAxeScan } = require('./axe-playwright');
+const { acquireBrowser } = require('./lib/browser');
+const { runLighthouse } = require('./lighthouse-runner');
+const { runResponsiveAudit } = require('./responsive');
+const { analyzeSecurityHeaders } = require('./security-headers');
+
+const LOCAL_BROWSER_KEY = 'local';
+
+// Browser connections keyed by pool endpoint, reused across jobs
+const browsers = new Map();
+
+function getBrowser(wsEndpoint) {
+  const key = wsEndpoint || LOCAL_BROWSER_KEY;
+  if (!browsers.has(key)) {
+    const pending = (wsEndpoint ? chromium.connect(wsEndpoint, { timeout: 10000 }) : acquireBrowser(''))
+      .then((browser) => {
+        browser.on('disconnected', () => browsers.delete(key));
+        return browser;
+      })
+      .catch((error) => {
+        browsers.delete(key);
+        throw error;
+      });
+    browsers.set(key, pending);
+  }
+  return browsers.get(key);
+}
+
+const methods = {
+  ping: async () => ({ pid: process.pid, browsers: browsers.size }),
+
+  axe: async ({ url, device = 'mobile', waitFor, interception, wsEndpoint }) =>
+    runAxeScan(url, device, { browser: await getBrowser(wsEndpoint), navigation: { waitFor, interception } }),
+
+  responsive: async ({ url, viewports, maxParallel, shareCache, waitFor, interception, wsEndpoint }) =>
+    runResponsiveAudit(url, viewports, {
+      browser: await getBrowser(wsEndpoint),
+      maxParallel,
+      shareCache,
+      navigation: { waitFor, interception },
+    }),
+
+  securityHeaders: async ({ url, interception, wsEndpoint }) =>
+    analyzeSecurityHeaders(url, { browser: await getBrowser(wsEndpoint), interception }),
+
+  auditPage: async ({ url, viewports, checks, device, waitFor, interception, wsEndpoint }) =>
+    runPageAudit(
+      url,
+      { viewports, checks, device, waitFor, interception },
+      { browser: await getBrowser(wsEndpoint) }
+    ),
+
+  lighthouse: async ({ url, ...options }) => runLighthouse(url, options),
+};
+
+async function handleMessage(line, send) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (error) {
+    send({ jsonrpc: '2.0', id: null, error: { code: -32700, message: `Parse error: ${error.message}` } });
+    return;
+  }
+
+  const { id, method, params = {} } = request;
+  const handler = methods[method];
+  if (!handler) {
+    send({ jsonrpc: '2.0', id, error: { code: -32601, message: `Unknown method: ${method}` } });
+    return;
+  }
+
+  try {
+    const result = await handler(params);
+    send({ jsonrpc: '2.0', id, result });
+  } catch (error) {
+    send({
+      jsonrpc: '2.0',
+      id,
+      error: { code: -32000, message: error.message, data: { stack: error.stack } },
+    });
+  }
+}
+
+function serveStream(input, output) {
+  const send = (message) => output.write(`${JSON.stringify(message)}\n`);
+  const lines = readline.createInterface({ input, crlfDelay: Number.POSITIVE_INFINITY });
+  lines.on('line', (line) => {
+    if (line.trim()) {
+      handleMessage(line, send);
+    }
+  });
+  return lines;
+}
+
+async function shutdown() {
+  const pending = [...browsers.values()];
+  browsers.clear();
+  await Promise.all(pending.map((p) => p.then((browser) => browser.close()).catch(() => {})));
+  process.exit(0);
+}
+
+function main() {
+  const socketIndex = process.argv.indexOf('--socket');
+
+  if (socketIndex !== -1) {
+    const socketPath = process.argv[socketIndex + 1];
+    if (!socketPath) {
+      console.error(JSON.stringify({ error: 'Usage: node worker.js --socket <path>' }));
+      process.exit(1);
+    }
+
+    const server = net.createServer((socket) => serveStream(socket, socket));
+    server.listen(socketPath, () => console.error(`Worker listening on ${socketPath}`));
+  } else {
+    // The parent closes stdin to stop the worker
+    serveStream(process.stdin, process.stdout).on('close', shutdown);
+  }
+
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+}
+
+main();
@@ -2,7 +2,24 @@
 Smoke tests for MCP Auditor Local tools.
 """
 
+import asyncio
+import base64
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import struct
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
@@ -10,11 +27,54 @@ import pytest
 # Add mcp directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "mcp"))
 
+from tools import (
+    artifact_store,
+    batch_audit,
+    browser_pool,
+    cdp_gateway,
+    chrome_pool,
+    http_client,
+    lighthouse_runner,
+    orchestrator,
+    report_store,
+    result_cache,
+    screenshots,
+    site_crawler,
+)
+from tools.artifact_store import ArtifactStore, ArtifactStoreConfig
+from tools.audit_page import audit_page
 from tools.axe_playwright import scan_axe
+from tools.batch_audit import audit_batch, plan_jobs, summarize_batch
+from tools.browser_pool import BrowserPool, PoolConfig, _launch_browser_server
+from tools.cdp_gateway import (
+    ChromeMCPClient,
+    ChromeMCPError,
+    ChromeMCPSessionConfig,
+    ChromeMCPSessionPool,
+    cdp_emulate,
+    cdp_open,
+    cdp_screenshot,
+    cdp_trace,
+)
+from tools.change_detection import ChangeDetector, incremental_tool
+from tools.chrome_pool import ChromePool, ChromePoolConfig, WarmChrome
+from tools.header_grading import csp_report, grade_headers
+from tools.http_client import HttpClientConfig, HttpClients
 from tools.lighthouse import audit_lighthouse
+from tools.lighthouse_runner import _lighthouse_worker, close_lighthouse_workers
+from tools.navigation import apply_interception, is_tracker_url, navigate
+from tools.node_worker import NodeWorkerClient, NodeWorkerError
+from tools.orchestrator import ToolJob, job_time_left, run_tools_sync
+from tools.quick_audit import quick_audit
 from tools.report_merge import report_merge
 from tools.responsive import responsive_audit
+from tools.result_cache import CacheConfig, ResultCache, cached_tool
+from tools.runner_registry import RunnerRegistry, RunnerSpec
+from tools.screenshots import image_size, image_variants, store_base64_image
 from tools.security_headers import security_headers
+from tools.site_crawler import CrawlState, _LinkExtractor, crawl_audit
+from tools.trace_analysis import analyze_trace, iter_trace_events
+from tools.url_check import normalize_url, url_check
 from tools.wave_api import scan_wave
 from tools.webhint import webhint_scan
 from tools.zap_simple import zap_baseline_simple
@@ -121,6 +181,242 @@ class TestSecurityHeaders:
         assert result["status"] == "error"
         assert "error" in result
 
+    def test_http_fast_path_follows_redirects(self):
+        """Headers come from the final response of a direct fetch, no browser involved."""
+
+        class Handler(SimpleHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/old":
+                    self.send_response(301)
+                    self.send_header("Location", "/new")
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Security-Policy", "default-src 'self'")
+                    self.send_header("X-Content-Type-Options", "nosniff")
+                    self.send_header("Set-Cookie", "a=1; Secure")
+                    self.send_header("Set-Cookie", "b=2; HttpOnly")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = security_headers(f"http://127.0.0.1:{server.server_address[1]}/old", mode="http")
+        finally:
+            server.shutdown()
+
+        assert result["status"] == "ok"
+        assert result["mode"] == "http"
+        assert result["headers"]["csp"] and result["headers"]["xcto"]
+        assert not result["headers"]["hsts"]
+        assert result["securityScore"] == round(2 / 6 * 100, 1)
+        assert result["raw"]["fetch"]["redirects"][0]["status"] == 301
+        assert result["raw"]["headers"]["set-cookie"] == "a=1; Secure\nb=2; HttpOnly"
+
+    def test_connection_refused_without_browser(self):
+        """A refused connection is reported straight from the direct fetch."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SimpleHTTPRequestHandler)
+        port = server.server_address[1]
+        server.server_close()
+
+        result = security_headers(f"http://127.0.0.1:{port}/")
+        assert result["status"] == "error"
+        assert result["code"] == "CONNECTION_REFUSED"
+
+
+class TestHeaderGrading:
+    """Test CSP/HSTS/cookie/CORS grading of security headers."""
+
+    def test_csp_weaknesses(self):
+        """unsafe-inline, wildcards and missing object-src/base-uri are flagged."""
+        report = csp_report("default-src 'self'; script-src 'self' 'unsafe-inline' https:")
+        ids = {finding["id"] for finding in report["findings"]}
+        assert ids == {"csp-unsafe-inline", "csp-wildcard", "csp-object-src", "csp-no-base-uri"}
+
+        strict = csp_report(
+            "script-src 'nonce-abc' 'strict-dynamic' 'unsafe-inline'; object-src 'none'; base-uri 'none'"
+        )
+        assert strict["findings"] == []
+
+    def test_csp_findings_need_every_policy(self):
+        """A second enforced policy can close a gap left by the first."""
+        report = csp_report("script-src 'self', object-src 'none'; script-src 'self'; base-uri 'self'")
+        assert [finding["id"] for finding in report["findings"]] == []
+
+    def test_csp_parse_is_memoized(self):
+        """Repeated header values are parsed once."""
+        value = "default-src 'none'; base-uri 'self'"
+        assert csp_report(value) is csp_report(value)
+
+    def test_grade_headers(self):
+        """HSTS, cookies, CORS and isolation headers feed one grade."""
+        headers = {
+            "strict-transport-security": "max-age=300; preload",
+            "set-cookie": "sessionid=1; Path=/\n__Host-id=2; Secure; Path=/; SameSite=Lax; HttpOnly",
+            "access-control-allow-origin": "*",
+            "access-control-allow-credentials": "true",
+            "cross-origin-opener-policy": "same-origin",
+            "cross-origin-embedder-policy": "require-corp",
+        }
+        result = grade_headers(headers, "https://example.com/")
+        ids = {finding["id"] for finding in result["findings"]}
+
+        assert {"hsts-short", "hsts-preload-ineligible", "cors-wildcard-credentials"} <= ids
+        assert {"csp-missing", "cookie-no-secure", "cookie-no-httponly"} <= ids
+        assert "cookie-prefix" not in ids
+        assert result["hsts"]["maxAge"] == 300 and not result["hsts"]["preloadReady"]
+        assert result["isolation"]["crossOriginIsolated"] is True
+        assert result["grade"] == "F" and 0 <= result["score"] < 60
+
+        plain = grade_headers({}, "http://example.com/")
+        assert "no-https" in {finding["id"] for finding in plain["findings"]}
+
+
+class TestHttpClient:
+    """Test the shared HTTP clients."""
+
+    def test_clients_are_shared(self):
+        """One sync client per process, one async client per event loop."""
+        clients = HttpClients(HttpClientConfig())
+        assert clients.sync_client() is clients.sync_client()
+
+        async def pair():
+            return clients.async_client(), clients.async_client()
+
+        first, second = asyncio.run(pair())
+        assert first is second
+        assert asyncio.run(pair())[0] is not first
+        clients.close()
+
+    def test_released_async_client_is_closed(self):
+        """release_async_client closes the loop's client and drops it from the set."""
+        clients = HttpClients(HttpClientConfig())
+
+        async def use_and_release():
+            client = clients.async_client()
+            await clients.release_async_client()
+            return client
+
+        client = asyncio.run(use_and_release())
+        assert client.is_closed
+        assert clients.stats()["asyncClients"] == 0
+
+    def test_proxy_environment_is_honoured(self, monkeypatch):
+        """HTTPS_PROXY mounts a proxy transport on the shared client."""
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+        clients = HttpClients(HttpClientConfig())
+        try:
+            mounts = clients.sync_client()._mounts
+        finally:
+            clients.close()
+        assert any(pattern.scheme == "https" and transport is not None for pattern, transport in mounts.items())
+
+    def test_url_check_uses_shared_client(self):
+        """url_check reports reachability and the final URL."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SimpleHTTPRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = url_check(f"http://127.0.0.1:{server.server_address[1]}/")
+        finally:
+            server.shutdown()
+
+        assert result["status"] == "ok"
+        assert result["reachable"] is True
+        assert isinstance(result["final_url"], str)
+
+
+class TestNavigation:
+    """Test navigation wait strategies and the tracker blocklist."""
+
+    class FakePage:
+        """Records Playwright calls; network idle never arrives."""
+
+        def __init__(self):
+            self.calls = []
+            self.routes = []
+
+        async def route(self, matcher, handler):
+            self.routes.append(matcher)
+
+        async def goto(self, url, wait_until, timeout):
+            self.calls.append(("goto", wait_until))
+            return "response"
+
+        async def wait_for_load_state(self, state, timeout):
+            self.calls.append(("wait", state, timeout))
+            raise TimeoutError("beacons keep the network busy")
+
+    def test_tracker_blocklist_matches_subdomains_only(self):
+        """Blocklisted hosts match with subdomains, not lookalikes."""
+        assert is_tracker_url("https://region1.google-analytics.com/g/collect")
+        assert not is_tracker_url("https://example.com/google-analytics.com.js")
+        assert not is_tracker_url("https://notgoogle-analytics.com/")
+
+    def test_networkidle_settle_is_bounded(self):
+        """A page that never goes idle is audited after the settle timeout."""
+        page = self.FakePage()
+        response, navigation = asyncio.run(navigate(page, "https://example.com", "networkidle", settle_timeout=50))
+
+        assert response == "response"
+        assert page.calls == [("goto", "load"), ("wait", "networkidle", 50)]
+        assert navigation["settled"] is False
+        assert len(page.routes) == 1
+
+    def test_unknown_strategy(self):
+        """Unknown strategies are rejected before navigating."""
+        with pytest.raises(ValueError):
+            asyncio.run(navigate(self.FakePage(), "https://example.com", "forever"))
+
+    def test_interception_profile_decisions(self):
+        """a11y-minimal stubs images, drops fonts and stubs tracker scripts."""
+
+        class FakeRoute:
+            def __init__(self, url, resource_type):
+                self.request = type("Request", (), {"url": url, "resource_type": resource_type})()
+                self.outcome = None
+
+            async def fallback(self):
+                self.outcome = "allow"
+
+            async def fulfill(self, **kwargs):
+                self.outcome = "stub"
+
+            async def abort(self, reason):
+                self.outcome = "block"
+
+        page = self.FakePage()
+        handlers = []
+
+        async def route(matcher, handler):
+            handlers.append(handler)
+
+        page.route = route
+
+        async def run():
+            counts = await apply_interception(page, "a11y-minimal")
+            routes = [
+                FakeRoute("https://example.com/", "document"),
+                FakeRoute("https://example.com/logo.png", "image"),
+                FakeRoute("https://fonts.example.com/a.woff2", "font"),
+                FakeRoute("https://www.google-analytics.com/analytics.js", "script"),
+            ]
+            for item in routes:
+                await handlers[0](item)
+            return counts, [item.outcome for item in routes]
+
+        counts, outcomes = asyncio.run(run())
+        assert outcomes == ["allow", "stub", "block", "stub"]
+        assert (counts["allowed"], counts["blocked"], counts["stubbed"]) == (1, 1, 2)
+
+    def test_unknown_interception_profile(self):
+        """Tools reject unknown profiles before starting a browser."""
+        result = scan_axe("https://example.com", interception_profile="everything")
+        assert result["status"] == "error"
+        assert "interception profile" in result["error"]
+
 
 class TestResponsive:
     """Test responsive audit tool."""
@@ -143,6 +439,12 @@ class TestResponsive:
         assert result["status"] == "error"
         assert "error" in result
 
+    def test_responsive_invalid_max_parallel(self):
+        """Test responsive audit rejects a parallelism below one."""
+        result = responsive_audit("https://example.com", ["360x640"], max_parallel=0)
+        assert result["status"] == "error"
+        assert "max_parallel" in result["error"]
+
     def test_responsive_default_viewports(self):
         """Test responsive audit with default viewports."""
         result = responsive_audit("https://example.com")
@@ -150,6 +452,1015 @@ class TestResponsive:
             assert len(result["summaries"]) == 3  # Default viewports
 
 
+class TestAuditPage:
+    """Test the single-navigation page audit."""
+
+    @pytest.mark.e2e
+    def test_audit_page_example_com(self):
+        """Test combined audit against example.com."""
+        result = audit_page("https://example.com", viewports=["360x640", "1280x800"])
+
+        assert result["status"] == "ok"
+        results = result["results"]
+        assert results["security_headers"]["status"] == "ok"
+        assert "securityScore" in results["security_headers"]
+        assert "violations" in results["scan_axe"]
+        assert len(results["responsive_audit"]["summaries"]) == 2
+
+        merged = report_merge(list(results.values()))
+        assert merged["status"] == "ok"
+
+    def test_audit_page_invalid_url(self):
+        """Test page audit with invalid URL."""
+        result = audit_page("not-a-url")
+        assert result["status"] == "error"
+        assert "error" in result
+
+    def test_audit_page_unknown_tool(self):
+        """Test page audit rejects tools it cannot run on a shared page."""
+        result = audit_page("https://example.com", tools=["audit_lighthouse"])
+        assert result["status"] == "error"
+        assert "audit_lighthouse" in result["error"]
+
+
+def _sleepy_tool(seconds: float) -> dict:
+    time.sleep(seconds)
+    return {'status': 'ok', 'slept': seconds}
+
+
+class TestOrchestrator:
+    """Test concurrent tool execution."""
+
+    def test_tools_run_concurrently(self):
+        """Wall time tracks the slowest tool, not the sum."""
+        jobs = [ToolJob(f"tool{i}", _sleepy_tool, (0.3,)) for i in range(3)]
+        started = time.monotonic()
+        results = run_tools_sync(jobs, per_tool_timeout=5)
+        elapsed = time.monotonic() - started
+
+        assert all(result["status"] == "ok" for result in results.values())
+        assert elapsed < 0.8
+
+    def test_timeout_is_reported(self):
+        """A slow tool is reported as timed out without holding up the rest."""
+        jobs = [ToolJob("slow", _sleepy_tool, (1.0,)), ToolJob("fast", _sleepy_tool, (0.01,))]
+        results = run_tools_sync(jobs, per_tool_timeout=5, deadline=0.2)
+
+        assert results["slow"]["status"] == "error"
+        assert results["slow"]["timedOut"] is True
+        assert results["fast"]["status"] == "ok"
+
+    def test_timeout_starts_when_tool_runs(self, monkeypatch):
+        """Time spent waiting for a pool thread does not count against a tool's timeout."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(orchestrator, "_executor", executor)
+        jobs = [ToolJob(f"tool{i}", _sleepy_tool, (0.3,)) for i in range(2)]
+        try:
+            results = run_tools_sync(jobs, per_tool_timeout=0.5)
+        finally:
+            executor.shutdown()
+
+        assert [result["status"] for result in results.values()] == ["ok", "ok"]
+
+    def test_job_time_left(self):
+        """Blocking calls inside a job see its remaining budget; outside a job the default is kept."""
+        jobs = [ToolJob("budget", lambda: {"status": "ok", "left": job_time_left(60)})]
+        left = run_tools_sync(jobs, per_tool_timeout=5)["budget"]["left"]
+
+        assert 4 < left <= 5
+        assert job_time_left(60) == 60
+
+
+class TestQuickAudit:
+    """Test quick audit tool."""
+
+    def test_quick_audit_invalid_url(self):
+        """Test quick audit with invalid URL."""
+        result = quick_audit("not-a-url")
+        assert result["status"] == "error"
+        assert "error" in result
+
+    def test_quick_audit_unknown_extra_tool(self):
+        """Test quick audit rejects slow or unknown extra tools."""
+        result = quick_audit("https://example.com", extra_tools=["audit_lighthouse"])
+        assert result["status"] == "error"
+        assert "audit_lighthouse" in result["error"]
+
+
+class TestAuditBatch:
+    """Test batch multi-URL audits."""
+
+    def test_audit_batch_empty_urls(self):
+        """Test batch audit with no URLs."""
+        result = audit_batch([])
+        assert result["status"] == "error"
+        assert "error" in result
+
+    def test_audit_batch_invalid_concurrency(self):
+        """Test batch audit rejects an unbounded pool."""
+        result = audit_batch(["https://example.com"], concurrency=0)
+        assert result["status"] == "error"
+
+    def test_concurrency_capped_at_pool_size(self, monkeypatch):
+        """Concurrency above the tool pool size is clamped; batches get separate progress files."""
+        monkeypatch.setattr(batch_audit, "MAX_WORKERS", 2)
+        first = audit_batch(["http://127.0.0.1:9/"], tools=["url_check"], concurrency=32, tool_timeout=10)
+        second = audit_batch(["http://127.0.0.1:9/"], tools=["url_check"], concurrency=1, tool_timeout=10)
+
+        assert (first["concurrency"], second["concurrency"]) == (2, 1)
+        assert first["progressPath"] != second["progressPath"]
+        for result in (first, second):
+            Path(result["progressPath"]).unlink()
+
+    def test_browser_checks_share_one_page_load(self):
+        """Several browser checks for a URL become one audit_page job."""
+        jobs = plan_jobs("https://example.com", ["security_headers", "scan_axe", "lighthouse_fast"])
+        names = [job.name for job in jobs]
+        assert names == ["audit_page", "lighthouse_fast"]
+        assert jobs[0].kwargs["tools"] == ["security_headers", "scan_axe"]
+
+    def test_summarize_batch_merges_per_url(self):
+        """Each URL gets its own merged report and failures are kept apart."""
+        headers_ok = {"status": "ok", "securityScore": 50.0, "headers": {"csp": False}}
+        summary = summarize_batch({
+            "https://a.example": {"security_headers": headers_ok},
+            "https://b.example": {"security_headers": {"status": "error", "error": "boom"}}
+        })
+
+        assert summary["succeeded"] == 1
+        assert summary["failed"] == 1
+        by_url = {entry["url"]: entry for entry in summary["results"]}
+        assert by_url["https://a.example"]["score"]["security"] == 50.0
+        assert by_url["https://b.example"]["errors"] == {"security_headers": "boom"}
+        assert summary["aggregate"]["status"] == "ok"
+
+
+class TestCrawlAudit:
+    """Test the site crawler."""
+
+    def test_crawl_audit_invalid_url(self):
+        """Test crawl audit with invalid URL."""
+        result = crawl_audit("not-a-url")
+        assert result["status"] == "error"
+        assert "error" in result
+
+    def test_normalize_url(self):
+        """Equivalent URLs normalize to the same frontier key."""
+        assert normalize_url("HTTPS://Example.com:443#top") == "https://example.com/"
+        assert normalize_url("https://example.com/a?b=2&a=1&utm_source=x") == "https://example.com/a?a=1&b=2"
+        assert normalize_url("../b", base="https://example.com/x/y") == "https://example.com/b"
+        assert normalize_url("mailto:team@example.com") is None
+
+    def test_link_extractor_skips_nofollow(self):
+        """Links resolve against <base> and nofollow links are ignored."""
+        extractor = _LinkExtractor("https://example.com/docs/")
+        extractor.feed('<base href="/root/"><a href="a">A</a><a rel="nofollow" href="b">B</a>')
+        assert extractor.links == ["https://example.com/root/a"]
+
+    def test_frontier_dedupes_and_resumes(self, tmp_path):
+        """Known URLs are not re-added and interrupted pages are requeued."""
+        state = CrawlState(tmp_path / "crawl.sqlite")
+        assert state.add(["https://example.com/", "https://example.com/a"], 0, "start") == 2
+        assert state.add(["https://example.com/a"], 1, "https://example.com/") == 0
+
+        claimed = state.claim(1)
+        assert claimed == [("https://example.com/", 0)]
+        assert state.requeue_interrupted() == 1
+        assert state.counts() == {"pending": 2}
+        state.close()
+
+    @pytest.fixture
+    def site(self, tmp_path, monkeypatch):
+        root = tmp_path / "site"
+        root.mkdir()
+        (root / "index.html").write_text('<a href="/a.html">A</a>')
+        (root / "a.html").write_text("<h1>A</h1>")
+        monkeypatch.setattr(site_crawler, "CRAWLS_DIR", tmp_path / "crawls")
+
+        handler = functools.partial(SimpleHTTPRequestHandler, directory=str(root))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}/index.html"
+        server.shutdown()
+
+    def test_crawl_inside_running_loop(self, site):
+        """The crawl state works when the crawl loop runs on a helper thread (as under FastMCP)."""
+        async def call():
+            return crawl_audit(site, tools=["url_check"], max_pages=5, delay=0, respect_robots=False)
+
+        result = asyncio.run(call())
+
+        assert result["status"] == "ok", result.get("error")
+        assert result["pagesAudited"] == 2
+        assert result["complete"] is True
+
+    def test_scope_changes_do_not_resume(self, site):
+        """Different crawl settings get their own crawl; reusing a crawl_id with them is refused."""
+        options = {"tools": ["url_check"], "max_pages": 1, "delay": 0, "respect_robots": False}
+        shallow = crawl_audit(site, max_depth=0, **options)
+        deep = crawl_audit(site, max_depth=1, **options)
+        assert shallow["crawlId"] != deep["crawlId"]
+
+        mismatch = crawl_audit(site, max_depth=2, crawl_id=shallow["crawlId"], **options)
+        assert mismatch["status"] == "error"
+        assert "restart=True" in mismatch["error"]
+
+        state_path = Path(shallow["statePath"])
+        Path(f"{state_path}-wal").write_bytes(b"stale")
+        restarted = crawl_audit(site, max_depth=2, crawl_id=shallow["crawlId"], restart=True, **options)
+        assert restarted["status"] == "ok", restarted.get("error")
+        assert restarted["frontier"] == {"done": 1, "pending": 1}
+
+    def test_page_error_does_not_abort_crawl(self, site, monkeypatch):
+        """An unexpected error on one page marks it failed and the crawl carries on."""
+        real_run_batch = site_crawler.run_batch
+
+        async def flaky_run_batch(urls, *args, **kwargs):
+            if urls[0].endswith("/a.html"):
+                raise RuntimeError("boom")
+            return await real_run_batch(urls, *args, **kwargs)
+
+        monkeypatch.setattr(site_crawler, "run_batch", flaky_run_batch)
+        result = crawl_audit(site, tools=["url_check"], max_pages=5, delay=0, respect_robots=False)
+
+        assert result["status"] == "ok", result.get("error")
+        statuses = {page["url"].rsplit("/", 1)[-1]: page["status"] for page in result["pages"]}
+        assert statuses == {"index.html": "done", "a.html": "failed"}
+        assert result["frontier"] == {"done": 1, "failed": 1}
+
+
+class TestResultCache:
+    """Test the tool result cache."""
+
+    @staticmethod
+    def _counting_tool():
+        calls = []
+
+        def fake_audit(url: str, device: str = "mobile") -> dict:
+            calls.append(url)
+            return {"status": "ok", "url": url, "device": device}
+
+        return fake_audit, calls
+
+    def test_repeat_call_is_served_from_cache(self, tmp_path):
+        """Equivalent calls hit the cache; force_refresh re-runs the tool."""
+        tool, calls = self._counting_tool()
+        cached = cached_tool(tool, ResultCache(CacheConfig(directory=tmp_path)))
+
+        first = cached("https://Example.com")
+        second = cached("https://example.com/", device="mobile")
+        assert len(calls) == 1
+        assert "cache" not in first
+        assert second["cache"]["hit"] is True
+
+        cached("https://example.com", force_refresh=True)
+        assert len(calls) == 2
+
+    def test_errors_are_not_cached(self, tmp_path):
+        """Failed results always re-run."""
+        calls = []
+
+        def failing(url: str) -> dict:
+            calls.append(url)
+            return {"status": "error", "error": "boom"}
+
+        cached = cached_tool(failing, ResultCache(CacheConfig(directory=tmp_path)))
+        cached("https://example.com")
+        cached("https://example.com")
+        assert len(calls) == 2
+
+    def test_ttl_and_lru_eviction(self, tmp_path):
+        """Expired entries miss and the least recently used entry is evicted."""
+        cache = ResultCache(CacheConfig(directory=tmp_path, max_entries=2))
+        cache.put("a", "tool", {"status": "ok"})
+        cache.put("b", "tool", {"status": "ok"})
+        assert cache.get("a") is not None
+        cache.put("c", "tool", {"status": "ok"})
+        assert cache.get("b") is None
+        assert cache.stats()["entries"] == 2
+
+        cache.config.ttl = 0
+        assert cache.get("a") is None
+
+    def test_wrapper_exposes_force_refresh(self, tmp_path):
+        """The wrapped signature keeps the tool's parameters for registration."""
+        tool, _ = self._counting_tool()
+        params = inspect.signature(cached_tool(tool)).parameters
+        assert list(params) == ["url", "device", "force_refresh"]
+
+    def test_key_locks_are_released(self, tmp_path):
+        """Per-key locks are dropped once no call holds them."""
+        cache = ResultCache(CacheConfig(directory=tmp_path))
+        tool, _ = self._counting_tool()
+        cached = cached_tool(tool, cache)
+        for page in ("a", "b", "c"):
+            cached(f"https://example.com/{page}")
+        assert cache._key_locks == {}
+
+    def test_version_tracks_node_script(self, tmp_path, monkeypatch):
+        """Editing the Node script a tool runs changes its version."""
+        (tmp_path / "lib").mkdir()
+        script = tmp_path / "axe-playwright.js"
+        script.write_text("module.exports = 1;")
+        monkeypatch.setattr(result_cache, "NODE_TOOLS_DIR", tmp_path)
+        tool, _ = self._counting_tool()
+
+        before = result_cache.tool_version.__wrapped__("scan_axe", tool)
+        script.write_text("module.exports = 2;")
+        assert result_cache.tool_version.__wrapped__("scan_axe", tool) != before
+
+
+class TestReportStore:
+    """Test compressed report storage and JSON-pointer slices."""
+
+    @pytest.fixture
+    def stored_report(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(artifact_store, "_store", ArtifactStore(ArtifactStoreConfig(directory=tmp_path)))
+        report_id, path = report_store.new_report("lighthouse", "https://example.com/page")
+        lhr = {
+            "categories": {"performance": {"score": 0.91}},
+            "audits": {"a/b": {"score": 1}, "big": {"details": "x" * 5000}},
+            "runWarnings": ["first", "second"]
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(lhr, f)
+        report_store.store_report(report_id, path)
+        return report_id
+
+    def test_slices_by_json_pointer(self, stored_report):
+        """Pointers resolve through objects, arrays and escaped keys."""
+        result = report_store.report_slice(
+            stored_report,
+            ["/categories/performance/score", "/runWarnings/1", "/audits/a~1b", "/audits/missing"]
+        )
+        assert result["status"] == "ok"
+        assert result["slices"]["/categories/performance/score"] == 0.91
+        assert result["slices"]["/runWarnings/1"] == "second"
+        assert result["slices"]["/audits/a~1b"] == {"score": 1}
+        assert "/audits/missing" in result["errors"]
+
+    def test_large_slices_are_outlined(self, stored_report):
+        """Slices over max_bytes return their shape instead of their content."""
+        result = report_store.report_slice(stored_report, ["/audits/big"], max_bytes=1000)
+        assert result["slices"]["/audits/big"]["truncated"] is True
+        assert "details" in result["slices"]["/audits/big"]["outline"]
+
+        outline = report_store.report_slice(stored_report)["outline"]
+        assert set(outline) == {"categories", "audits", "runWarnings"}
+
+    def test_rejects_unknown_and_unsafe_ids(self, stored_report):
+        """Report ids cannot escape the report directory."""
+        assert report_store.report_slice("../secrets")["status"] == "error"
+        assert report_store.report_slice("lighthouse-missing")["status"] == "error"
+
+
+
+class TestArtifactStore:
+    """Test the content-addressed artifact store."""
+
+    def test_identical_content_is_stored_once(self, tmp_path):
+        """Same bytes map to one sharded object; the manifest records both writes."""
+        store = ArtifactStore(ArtifactStoreConfig(directory=tmp_path))
+        first = store.put_bytes(b"png-bytes", kind="screenshot", ext="png")
+        second = store.put_bytes(b"png-bytes", kind="screenshot", ext="png")
+
+        assert first["path"] == second["path"]
+        assert second["deduplicated"] is True
+        assert Path(first["path"]).relative_to(tmp_path / "objects").parts[:2] == (first["id"][:2], first["id"][2:4])
+        assert len(store.entries()) == 2
+
+    def test_json_is_compressed(self, tmp_path):
+        """JSON round-trips through gzip and can be looked up by name."""
+        store = ArtifactStore(ArtifactStoreConfig(directory=tmp_path))
+        ref = store.put_json({"items": list(range(200))}, kind="wave", name="wave-1")
+
+        assert ref["path"].endswith(".json.gz")
+        assert ref["storedBytes"] < ref["bytes"]
+        assert json.loads(store.read("wave-1")) == {"items": list(range(200))}
+
+    def test_retention_by_size_and_age(self, tmp_path):
+        """Expired objects go first, then the oldest beyond the size cap."""
+        store = ArtifactStore(ArtifactStoreConfig(directory=tmp_path, max_bytes=20, max_age_days=1))
+        refs = [store.put_bytes(bytes([index]) * 10, kind="screenshot", ext="png") for index in range(3)]
+        os.utime(refs[0]["path"], (0, 0))
+        os.utime(refs[1]["path"], (time.time() - 60, time.time() - 60))
+
+        assert store.enforce_retention()["removed"] == 1
+        assert not Path(refs[0]["path"]).exists()
+
+        store.config.max_bytes = 10
+        store.enforce_retention()
+        assert [Path(ref["path"]).exists() for ref in refs] == [False, False, True]
+        assert [entry["id"] for entry in store.entries()] == [refs[2]["id"]]
+
+
+class TestChangeDetection:
+    """Test incremental audits that skip unchanged pages."""
+
+    @pytest.fixture
+    def site(self, tmp_path):
+        """Serve a small page with one stylesheet from a local HTTP server."""
+        root = tmp_path / "site"
+        root.mkdir()
+        (root / "index.html").write_text('<link rel="stylesheet" href="/style.css"><h1>Hi</h1>')
+        (root / "style.css").write_text("h1 { color: black; }")
+
+        handler = functools.partial(SimpleHTTPRequestHandler, directory=str(root))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield root, f"http://127.0.0.1:{server.server_address[1]}/index.html"
+        server.shutdown()
+
+    def test_unchanged_page_reuses_result(self, site, tmp_path):
+        """Unchanged pages return the stored result; subresource edits trigger a re-run."""
+        root, url = site
+        calls = []
+
+        def fake_audit(url: str) -> dict:
+            calls.append(url)
+            return {"status": "ok", "url": url, "run": len(calls)}
+
+        tool = incremental_tool("fake_audit", fake_audit, ChangeDetector(tmp_path / "snapshots"))
+
+        first = tool(url, incremental=True)
+        assert first["incremental"]["changed"] is True
+
+        second = tool(url, incremental=True)
+        assert len(calls) == 1
+        assert second["stale"] is True
+        assert second["run"] == 1
+
+        # Last-Modified has one-second resolution
+        time.sleep(1.1)
+        (root / "style.css").write_text("h1 { color: white; }")
+        third = tool(url, incremental=True)
+        assert len(calls) == 2
+        assert third["incremental"]["reason"] == "content changed"
+
+    def test_incremental_is_opt_in(self, site, tmp_path):
+        """Without incremental=True the tool always runs."""
+        _, url = site
+        calls = []
+        tool = incremental_tool("fake_audit", lambda url: calls.append(url) or {"status": "ok"},
+                                ChangeDetector(tmp_path / "snapshots"))
+        tool(url)
+        tool(url)
+        assert len(calls) == 2
+
+
+class TestChromePool:
+    """Test the warm Chrome pool used by Lighthouse."""
+
+    def test_disabled_pool_yields_no_port(self):
+        """A disabled pool lets Lighthouse launch its own Chrome."""
+        pool = ChromePool(ChromePoolConfig(enabled=False))
+        with pool.lease() as port:
+            assert port is None
+
+    def test_pool_caps_concurrent_runs(self):
+        """Runs beyond the pool size wait for a slot and time out."""
+        pool = ChromePool(ChromePoolConfig(enabled=False, size=1, lease_timeout=0.2))
+        with pool.lease():
+            with pytest.raises(TimeoutError):
+                with pool.lease():
+                    pass
+        with pool.lease() as port:
+            assert port is None
+
+    def test_dead_launches_fall_back(self, monkeypatch):
+        """Chromes that exit right after launch are retried a bounded number of times."""
+        launches = []
+
+        def launch_dead_chrome(startup_timeout):
+            process = subprocess.Popen([sys.executable, "-c", "pass"])
+            process.wait()
+            launches.append(process)
+            return WarmChrome(process=process, port=9, profile_dir=tempfile.mkdtemp())
+
+        monkeypatch.setattr(chrome_pool, "_launch_chrome", launch_dead_chrome)
+        pool = ChromePool(ChromePoolConfig())
+        with pool.lease() as port:
+            assert port is None
+
+        assert len(launches) == chrome_pool.LAUNCH_ATTEMPTS
+        assert pool.health_check()["stats"]["fallbacks"] == 1
+        assert pool.enabled is False
+
+
+class TestRunnerRegistry:
+    """Test memoized runner discovery."""
+
+    def test_version_probed_once(self):
+        """Repeated lookups reuse the cached probe."""
+        registry = RunnerRegistry({"python": RunnerSpec("python", (Path(sys.executable).name,), probe_timeout=5)})
+        first = registry.resolve("python")
+        second = registry.resolve("python")
+
+        assert first.available
+        assert first.version
+        assert second is first
+        assert registry.describe()["stats"] == {"hits": 1, "probes": 1}
+
+    def test_path_change_invalidates(self, monkeypatch):
+        """A different PATH triggers a new probe."""
+        registry = RunnerRegistry({"python": RunnerSpec("python", (Path(sys.executable).name,), probe_timeout=5)})
+        registry.resolve("python")
+        monkeypatch.setenv("PATH", str(Path(sys.executable).parent) + os.pathsep + os.environ["PATH"])
+        registry.resolve("python")
+        assert registry.describe()["stats"]["probes"] == 2
+
+    def test_missing_runner(self):
+        """Unknown executables are reported unavailable without a subprocess."""
+        registry = RunnerRegistry({"ghost": RunnerSpec("ghost", ("definitely-not-installed-tool",))})
+        info = registry.resolve("ghost")
+        assert not info.available
+        assert info.command == []
+        assert "not found" in info.error
+
+
+class TestBrowserPool:
+    """Test the shared browser pool."""
+
+    def test_disabled_pool_yields_no_endpoint(self):
+        """A pool of size 0 lets tools launch their own browser."""
+        pool = BrowserPool(PoolConfig(size=0))
+        with pool.lease() as ws_endpoint:
+            assert ws_endpoint is None
+
+    def test_health_check_reports_limits(self):
+        """Health check exposes pool configuration and stats."""
+        pool = BrowserPool(PoolConfig(size=0, max_contexts=3))
+        health = pool.health_check()
+        assert health["enabled"] is False
+        assert health["maxContextsPerBrowser"] == 3
+        assert health["browsers"] == []
+        assert "stats" in health
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+    def test_unexpected_output_stops_server(self, tmp_path, monkeypatch):
+        """A server that prints something other than its endpoint is stopped, not orphaned."""
+        script = tmp_path / "browser-server.js"
+        script.write_text(
+            "require('node:fs').writeFileSync('pid', String(process.pid));\n"
+            "console.log('(node) DeprecationWarning: something changed');\n"
+            "process.stdin.on('end', () => process.exit(0)).resume();\n"
+        )
+        monkeypatch.setattr(browser_pool, "BROWSER_SERVER_SCRIPT", script)
+        monkeypatch.chdir(tmp_path)
+
+        with pytest.raises(RuntimeError, match="DeprecationWarning"):
+            _launch_browser_server(5)
+        with pytest.raises(ProcessLookupError):
+            os.kill(int((tmp_path / "pid").read_text()), 0)
+
+
+ECHO_WORKER = """
+const rl = require('node:readline').createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+  const { id, params } = JSON.parse(line);
+  setTimeout(() => {
+    const reply = params.fail ? { error: { message: 'boom' } } : { result: params };
+    process.stdout.write(JSON.stringify({ jsonrpc: '2.0', id, ...reply }) + '\\n');
+  }, params.delay || 0);
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+class TestNodeWorker:
+    """Test the persistent Node worker client."""
+
+    def test_concurrent_calls_are_matched_by_id(self, tmp_path):
+        """Out-of-order responses reach the right caller."""
+        script = tmp_path / "worker.js"
+        script.write_text(ECHO_WORKER)
+        client = NodeWorkerClient(script)
+        results = {}
+
+        def call(name, delay):
+            results[name] = client.call("echo", {"name": name, "delay": delay}, timeout=10)
+
+        try:
+            threads = [threading.Thread(target=call, args=(name, delay)) for name, delay in [("slow", 300), ("fast", 10)]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            client.close()
+
+        assert results["slow"]["name"] == "slow"
+        assert results["fast"]["name"] == "fast"
+
+    def test_job_error_is_raised(self, tmp_path):
+        """Errors reported by the worker surface as NodeWorkerError."""
+        script = tmp_path / "worker.js"
+        script.write_text(ECHO_WORKER)
+        client = NodeWorkerClient(script)
+        try:
+            with pytest.raises(NodeWorkerError, match="boom"):
+                client.call("echo", {"fail": True}, timeout=10)
+        finally:
+            client.close()
+
+    def test_lighthouse_runs_get_their_own_worker(self, tmp_path, monkeypatch):
+        """Concurrent Lighthouse runs use separate workers; a timed-out worker is killed before reuse."""
+        script = tmp_path / "worker.js"
+        script.write_text(ECHO_WORKER)
+        monkeypatch.setattr(lighthouse_runner, "NodeWorkerClient", functools.partial(NodeWorkerClient, script))
+        monkeypatch.setattr(lighthouse_runner, "_workers", [])
+        monkeypatch.setattr(lighthouse_runner, "_all_workers", [])
+        try:
+            with _lighthouse_worker() as first, _lighthouse_worker() as second:
+                assert first is not second
+
+            with pytest.raises(TimeoutError):
+                with _lighthouse_worker() as worker:
+                    worker.call("echo", {"delay": 5000}, timeout=0.2)
+            assert worker.status()["running"] is False
+            assert worker.call("echo", {"name": "next"}, timeout=10) == {"name": "next"}
+        finally:
+            close_lighthouse_workers()
+
+
+FAKE_CHROME_MCP = """
+const rl = require('node:readline').createInterface({ input: process.stdin });
+const send = (message) => process.stdout.write(JSON.stringify({ jsonrpc: '2.0', ...message }) + '\\n');
+rl.on('line', (line) => {
+  const { id, method, params } = JSON.parse(line);
+  if (id === undefined) {
+    return;
+  }
+  send({ method: 'notifications/message', params: { data: `got ${method}` } });
+  setTimeout(() => {
+    send(params.fail ? { id, error: { code: -32000, message: 'boom' } } : { id, result: { method, ...params } });
+  }, params.delay || 0);
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+class TestChromeMCPClient:
+    """Test request multiplexing in the chrome-devtools-mcp client."""
+
+    def test_concurrent_requests_overlap(self, tmp_path):
+        """In-flight requests are matched by id and notifications reach the handler."""
+        script = tmp_path / "fake-mcp.js"
+        script.write_text(FAKE_CHROME_MCP)
+        notifications = []
+        client = ChromeMCPClient(["node", str(script)], lambda method, params: notifications.append(params))
+        client.request("warmup")
+
+        async def run():
+            started = time.monotonic()
+            results = await asyncio.gather(
+                client.request_async("slow", {"delay": 400}),
+                client.request_async("fast", {"delay": 400}),
+            )
+            return results, time.monotonic() - started
+
+        try:
+            (slow, fast), elapsed = asyncio.run(run())
+            with pytest.raises(ChromeMCPError, match="boom"):
+                client.request("broken", {"fail": True})
+            with pytest.raises(TimeoutError):
+                client.request("hang", {"delay": 1000}, timeout=0.2)
+            assert client.request("after-timeout")["method"] == "after-timeout"
+        finally:
+            client.close()
+
+        assert slow["method"] == "slow" and fast["method"] == "fast"
+        assert elapsed < 0.8
+        assert {"data": "got fast"} in notifications
+
+    def test_ready_after_handshake(self, tmp_path):
+        """Startup waits for the initialize answer instead of a fixed sleep."""
+        script = tmp_path / "fake-mcp.js"
+        script.write_text(FAKE_CHROME_MCP)
+        client = ChromeMCPClient(["node", str(script)])
+        try:
+            assert client.start() is True
+            status = client.status()
+        finally:
+            client.close()
+
+        assert status["running"] is True
+        assert status["startupMs"] < 2000
+        assert status["protocolVersion"] == "2024-11-05"
+
+    def test_failed_start_backs_off(self, tmp_path):
+        """A child that exits during startup is retried only after a backoff."""
+        script = tmp_path / "crash.js"
+        script.write_text("process.exit(3);")
+        client = ChromeMCPClient(["node", str(script)])
+
+        with pytest.raises(RuntimeError, match="failed to start"):
+            client.request("tools/list")
+        with pytest.raises(RuntimeError, match="retrying in"):
+            client.request("tools/list")
+        assert client.status()["consecutiveFailures"] == 1
+
+
+FAKE_MCP_TOOLS = """
+const fs = require('node:fs');
+const rl = require('node:readline').createInterface({ input: process.stdin });
+const send = (message) => process.stdout.write(JSON.stringify({ jsonrpc: '2.0', ...message }) + '\\n');
+const reply = (id, ...content) => send({ id, result: { content } });
+rl.on('line', (line) => {
+  const { id, method, params } = JSON.parse(line);
+  if (id === undefined) {
+    return;
+  }
+  if (method !== 'tools/call') {
+    send({ id, result: { protocolVersion: '2024-11-05', tools: [] } });
+    return;
+  }
+  const args = params.arguments;
+  if (params.name === 'take_screenshot' && process.env.FAKE_INLINE_IMAGE) {
+    reply(id, { type: 'text', text: 'Took a screenshot.' }, { type: 'image', data: process.env.FAKE_PNG, mimeType: 'image/png' });
+  } else if (params.name === 'take_screenshot') {
+    fs.writeFileSync(args.filePath, Buffer.from(process.env.FAKE_PNG, 'base64'));
+    reply(id, { type: 'text', text: `Saved screenshot of ${args.uid || 'the viewport'} to ${args.filePath}.` });
+  } else if (params.name === 'performance_stop_trace') {
+    fs.copyFileSync(process.env.FAKE_TRACE, args.filePath);
+    reply(id, { type: 'text', text: 'The performance trace has been stopped.' });
+  } else {
+    const text = `${params.name} ${JSON.stringify(args)}`;
+    send({ id, result: { content: [{ type: 'text', text }], isError: params.name === 'resize_page' && args.width > 5000 } });
+  }
+});
+"""
+
+
+@pytest.fixture
+def tools_server(tmp_path, monkeypatch):
+    script = tmp_path / "fake-mcp.js"
+    script.write_text(FAKE_MCP_TOOLS)
+    pool = ChromeMCPSessionPool(ChromeMCPSessionConfig(), ["node", str(script)])
+    monkeypatch.setattr(cdp_gateway, "_sessions", pool)
+    yield pool
+    pool.close_all()
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+class TestChromeMCPTools:
+    """Test that the cdp_* tools go through MCP tools/call."""
+
+    def test_open_calls_navigate_page(self, tools_server):
+        """Arguments go in tools/call and text content comes back unwrapped."""
+        result = cdp_open("https://example.com")
+        assert result["status"] == "ok"
+        assert result["result"]["text"] == 'navigate_page {"url":"https://example.com"}'
+
+    def test_tool_error_is_reported(self, tools_server):
+        """isError results surface as tool errors."""
+        assert cdp_emulate("desktop")["result"]["text"].startswith("resize_page")
+        result = cdp_emulate("custom", width=6000, height=100)
+        assert result["status"] == "error"
+        assert "resize_page" in result["error"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+class TestChromeMCPSessions:
+    """Test session affinity, capacity and idle eviction in the chrome-devtools-mcp pool."""
+
+    def test_sessions_get_their_own_child(self, tmp_path):
+        """The same session id reuses its child; other ids get isolated ones."""
+        script = tmp_path / "fake-mcp.js"
+        script.write_text(FAKE_CHROME_MCP)
+        pool = ChromeMCPSessionPool(ChromeMCPSessionConfig(max_sessions=2), ["node", str(script)])
+        try:
+            with pool.lease("a") as first:
+                first.request("tools/list")
+                pid = first.status()["pid"]
+            with pool.lease("a") as again:
+                assert again is first and again.status()["pid"] == pid
+            with pool.lease() as default:
+                default.request("tools/list")
+                assert default.status()["pid"] != pid
+        finally:
+            pool.close_all()
+
+        assert first.command[-1] == "--isolated"
+        assert default.command == ["node", str(script)]
+
+    def test_capacity_evicts_least_recently_used(self, tmp_path):
+        """At the cap, the oldest unleased session is closed; all leased means rejection."""
+        script = tmp_path / "fake-mcp.js"
+        script.write_text(FAKE_CHROME_MCP)
+        pool = ChromeMCPSessionPool(ChromeMCPSessionConfig(max_sessions=1), ["node", str(script)])
+        try:
+            pool.client("a").request("tools/list")
+            with pool.lease("b") as client:
+                client.request("tools/list")
+                with pytest.raises(RuntimeError, match="in use"):
+                    with pool.lease("c"):
+                        pass
+            stats = pool.stats()
+        finally:
+            pool.close_all()
+
+        assert [session["sessionId"] for session in stats["sessions"]] == ["b"]
+        assert stats["stats"]["evictedForCapacity"] == 1
+        assert stats["stats"]["rejected"] == 1
+
+    def test_idle_sessions_are_closed(self, tmp_path):
+        """Sessions unused past the idle timeout are closed on the next pool access."""
+        script = tmp_path / "fake-mcp.js"
+        script.write_text(FAKE_CHROME_MCP)
+        pool = ChromeMCPSessionPool(ChromeMCPSessionConfig(idle_timeout=0.2), ["node", str(script)])
+        try:
+            client = pool.client("a")
+            client.request("tools/list")
+            time.sleep(0.3)
+            assert pool.evict_idle() == 1
+            assert client.status()["running"] is False
+            assert pool.close_session("a") is False
+        finally:
+            pool.close_all()
+
+
+def _png(width, height):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\xff\x00\x00" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+class TestScreenshots:
+    """Test incremental screenshot decoding into the artifact store."""
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        store = ArtifactStore(ArtifactStoreConfig(directory=tmp_path / "store"))
+        monkeypatch.setattr(artifact_store, "_store", store)
+        return store
+
+    def test_decodes_in_slices(self, store, monkeypatch):
+        """Slice-wise decoding writes the same bytes and reports size and hash."""
+        monkeypatch.setattr(screenshots, "DECODE_CHUNK", 8)
+        png = _png(40, 30)
+        stored = store_base64_image(base64.b64encode(png).decode(), kind="cdp-screenshot")
+
+        assert open(stored["path"], "rb").read() == png
+        assert stored["sha256"] == hashlib.sha256(png).hexdigest()
+        assert (stored["width"], stored["height"], stored["format"]) == (40, 30, "png")
+        assert image_size(png[:24]) == (40, 30)
+
+    def test_decodes_wrapped_and_data_url(self, store, monkeypatch):
+        """Line-wrapped base64 and data: URLs decode to the same bytes whatever the slice size."""
+        monkeypatch.setattr(screenshots, "DECODE_CHUNK", 10)
+        png = _png(40, 30)
+        wrapped = base64.encodebytes(png).decode()
+        data_url = "data:image/png;base64," + base64.b64encode(png).decode()
+
+        for data in (wrapped, data_url):
+            stored = store_base64_image(data, kind="cdp-screenshot")
+            assert open(stored["path"], "rb").read() == png
+        with pytest.raises(ValueError):
+            store_base64_image(base64.b64encode(png).decode()[:-1], kind="cdp-screenshot")
+
+    def test_variants_without_pillow(self, store, monkeypatch):
+        """Variants fail with an install hint when Pillow is missing; none requested is a no-op."""
+        monkeypatch.setattr(screenshots, "PIL_AVAILABLE", False)
+        stored = store_base64_image(base64.b64encode(_png(4, 4)).decode(), kind="cdp-screenshot")
+        assert image_variants(stored, "cdp-screenshot") == []
+        with pytest.raises(RuntimeError, match="Pillow"):
+            image_variants(stored, "cdp-screenshot", thumbnail_width=2)
+
+    @pytest.mark.skipif(not screenshots.PIL_AVAILABLE, reason="Pillow not installed")
+    def test_variants(self, store):
+        """Thumbnails keep the aspect ratio; re-encodings keep the size."""
+        stored = store_base64_image(base64.b64encode(_png(40, 30)).decode(), kind="cdp-screenshot")
+        thumbnail, jpeg = image_variants(stored, "cdp-screenshot", thumbnail_width=20, formats=["jpeg"])
+
+        assert (thumbnail["width"], thumbnail["height"]) == (20, 15)
+        assert (jpeg["format"], jpeg["width"]) == ("jpg", 40)
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+    @pytest.mark.parametrize("inline", [False, True])
+    def test_cdp_screenshot_returns_reference(self, store, tools_server, monkeypatch, inline):
+        """Written files and base64 image content both end up stored; the response has no image data."""
+        monkeypatch.setenv("FAKE_PNG", base64.b64encode(_png(16, 8)).decode())
+        if inline:
+            monkeypatch.setenv("FAKE_INLINE_IMAGE", "1")
+        result = cdp_screenshot(uid="1_5")
+
+        assert result["status"] == "ok"
+        assert result["uid"] == "1_5"
+        assert inline or result["result"]["text"].startswith("Saved screenshot of 1_5 ")
+        assert "images" not in result["result"]
+        assert (result["screenshot"]["width"], result["screenshot"]["height"]) == (16, 8)
+        assert result["result"]["screenshotPath"] == result["screenshot"]["path"]
+        assert [entry["kind"] for entry in store.entries()] == ["cdp-screenshot"]
+        assert not any((store.root / "tmp").iterdir())
+
+
+def _trace_events():
+    main = {"pid": 1, "tid": 2}
+    return [
+        {"ph": "M", "name": "thread_name", **main, "args": {"name": "CrRendererMain"}},
+        {"ph": "P", "name": "Profile", "id": "0x1", **main, "ts": 0, "args": {"data": {"startTime": 0}}},
+        {"ph": "I", "name": "BeginMainThreadFrame", **main, "ts": 1000},
+        {"ph": "X", "name": "RunTask", **main, "ts": 1000, "dur": 80000},
+        {"ph": "X", "name": "FunctionCall", **main, "ts": 2000, "dur": 60000,
+         "args": {"data": {"functionName": "render", "url": "https://example.com/app.js", "lineNumber": 10}}},
+        {"ph": "X", "name": "Layout", **main, "ts": 70000, "dur": 5000},
+        {"ph": "I", "name": "BeginMainThreadFrame", **main, "ts": 90000},
+        {"ph": "B", "name": "RunTask", **main, "ts": 90000},
+        {"ph": "X", "name": "Paint", **main, "ts": 91000, "dur": 3000},
+        {"ph": "E", "name": "RunTask", **main, "ts": 95000},
+        {"ph": "P", "name": "ProfileChunk", "id": "0x1", **main, "ts": 95000, "args": {"data": {
+            "cpuProfile": {
+                "nodes": [
+                    {"id": 1, "callFrame": {"functionName": "(root)"}},
+                    {"id": 2, "callFrame": {"functionName": "render", "url": "https://example.com/app.js", "lineNumber": 10}},
+                    {"id": 3, "callFrame": {"functionName": "(idle)"}}
+                ],
+                "samples": [2, 2, 3]
+            },
+            "timeDeltas": [0, 40000, 20000]
+        }}},
+        {"ph": "X", "name": "RunTask", "pid": 1, "tid": 9, "ts": 95000, "dur": 100},
+    ]
+
+
+class TestTraceAnalysis:
+    """Test streaming Chrome trace analysis."""
+
+    def test_streams_events_across_chunks(self, tmp_path):
+        """Events split across small reads decode the same as the whole document."""
+        events = _trace_events()
+        path = tmp_path / "trace.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"metadata": {"note": "[brackets] ü"}, "traceEvents": events}, f)
+
+        assert list(iter_trace_events(path, chunk_size=7)) == events
+
+    def test_skips_malformed_event(self, tmp_path):
+        """A malformed event is skipped at the next separator and the following events still decode."""
+        events = _trace_events()
+        good = [json.dumps(event) for event in events]
+        bad = '{"ph": "X", "name": "Bad \\"}]\\" name", "ts": 5, "dur": }'
+        path = tmp_path / "trace.json"
+        path.write_text("[" + ",".join(good[:3] + [bad] + good[3:]) + "]")
+        stats = {}
+
+        assert list(iter_trace_events(path, chunk_size=7, stats=stats)) == events
+        assert stats == {"malformedEvents": 1}
+        assert analyze_trace(path)["malformedEvents"] == 1
+
+    def test_truncated_trace(self, tmp_path):
+        """A trace cut off mid-event is reported instead of silently summarized."""
+        path = tmp_path / "trace.json"
+        path.write_text(json.dumps(_trace_events())[:-40])
+        with pytest.raises(ValueError, match="ends"):
+            analyze_trace(path)
+
+    def test_main_thread_summary(self, tmp_path):
+        """Self time, long tasks, per-frame buckets and sampled functions come from the main thread."""
+        path = tmp_path / "trace.json"
+        path.write_text(json.dumps(_trace_events()))
+        main = analyze_trace(path)["mainThread"]
+
+        assert main["tid"] == 2
+        assert main["groups"]["scriptEvaluation"] == 60.0
+        assert main["tasks"] == {"count": 2, "totalMs": 85.0, "longTaskCount": 1, "longTaskMs": 80.0, "blockingMs": 30.0}
+        assert main["longTasks"][0]["groups"]["scriptEvaluation"] == 60.0
+        assert [(frame["scriptMs"], frame["layoutMs"], frame["paintMs"]) for frame in main["frames"]["slowest"]] == [
+            (60.0, 5.0, 0.0), (0.0, 0.0, 3.0)
+        ]
+        assert main["topFunctions"]["source"] == "samples"
+        assert main["topFunctions"]["functions"] == [
+            {"function": "render", "url": "https://example.com/app.js", "line": 10, "selfMs": 60.0}
+        ]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Node.js not installed")
+    def test_stop_stores_trace_and_summary(self, tmp_path, tools_server, monkeypatch):
+        """The trace file written by performance_stop_trace is compressed, stored and summarized."""
+        store = ArtifactStore(ArtifactStoreConfig(directory=tmp_path / "store"))
+        monkeypatch.setattr(artifact_store, "_store", store)
+        trace = tmp_path / "trace.json"
+        trace.write_text(json.dumps({"traceEvents": _trace_events()}))
+        monkeypatch.setenv("FAKE_TRACE", str(trace))
+
+        result = cdp_trace("stop")
+
+        assert result["status"] == "ok"
+        assert result["result"]["text"] == "The performance trace has been stopped."
+        assert result["tracePath"].endswith(".json.gz")
+        assert result["summary"]["mainThread"]["tasks"]["longTaskCount"] == 1
+        kinds = {entry["kind"]: entry for entry in store.entries()}
+        assert kinds["cdp-trace-summary"]["trace"] == kinds["cdp-trace"]["id"]
+        assert not any((store.root / "tmp").iterdir())
+
+
 class TestZap:
     """Test ZAP security tool."""
 
@@ -201,6 +1512,36 @@ class TestWave:
         assert result["status"] == "error"
         assert "error" in result
 
+    def test_wave_scans_share_the_sync_client(self, tmp_path, monkeypatch):
+        """Repeated scans reuse the shared sync client and create no per-loop async clients."""
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({"categories": {"error": {"count": 1}}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setenv("WAVE_API_KEY", "test")
+        monkeypatch.setenv("WAVE_API_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.setattr(artifact_store, "_store", ArtifactStore(ArtifactStoreConfig(directory=tmp_path / "store")))
+        clients = HttpClients(HttpClientConfig())
+        monkeypatch.setattr(http_client, "_clients", clients)
+        try:
+            results = [scan_wave("https://example.com") for _ in range(3)]
+        finally:
+            server.shutdown()
+            clients.close()
+
+        assert [result["status"] for result in results] == ["ok"] * 3
+        assert clients.stats()["asyncClients"] == 0
+
 
 class TestReportMerge:
     """Test report merging functionality."""